@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+#
+# The library entry point, for embedding the checks in another service: results are yielded as they're found rather
+# than written to files
+#
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterator
+
+from .progress import ScanProgress
+from .repo import Repo
+from .results import ResultSink, ScanFailure
+
+def scan(
+        repo_path: str,
+        checks: dict | None = None,
+        since_date: datetime | str = None,
+        since_commit: str = None,
+        until_date: datetime | str = None,
+        authors: list[str] | None = None,
+        signoff_dirs: str = 'dco-signoffs,dco_signoffs',
+        jobs: int = 1,
+        timeout: float | None = None,
+        remote=None,
+        sinks: list[ResultSink] | None = None
+        ) -> Iterator[ScanFailure]:
+    """Scans the repo at repo_path ( a GitHub URL or the path of a local clone ), yielding a ScanFailure for each
+    check a commit fails, as the scan finds it. Each failure is also handed to every one of sinks, which are finished
+    once the scan is complete.
+
+    checks is a Repo.checks style dict ( e.g. { 'dco': True, 'email-domain': { 'domains': ["example.com"] } } ),
+    defaulting to just dco; the scan window options are those of Repo.iter_scan(). Nothing is written to disk but the
+    clone of a GitHub repo, made in a temporary directory that's removed once the scan is done or abandoned, and
+    nothing is printed; progress goes to the log. Given a GitHubApi as remote, GitHub repos aren't cloned at all.
+
+        for failure in scan("https://github.com/my-org/my-repo", since_date="2024-01-01"):
+            print(failure.hexsha, failure.author_email, failure.error_type)
+    """
+    repo = Repo(repo_path, clone_progress=False, remote=remote)
+    try:
+        if not repo.git_repo_object and not repo.remote:
+            raise ValueError(f"{repo_path} is neither a GitHub URL nor the path of a git repo")
+        if checks is not None:
+            repo.checks = dict(checks)
+        if repo.checks.get('dco'):
+            repo.load_past_signoffs(signoff_dirs)
+        # no progress bars, and so no rev-list --count to size them, in someone else's service
+        progress = ScanProgress(enabled=False)
+        for failure in repo.iter_scan(since_date, since_commit, progress, jobs=jobs, timeout=timeout, until_date=until_date, authors=authors):
+            for sink in sinks or []:
+                sink.write(failure)
+            yield failure
+        for sink in sinks or []:
+            sink.finish(repo)
+    finally:
+        repo.close()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+#
+# Reads files straight from a repo's object database through one long-lived `git cat-file --batch` process, so
+# config and signoff files can be loaded without a checked out worktree
+#
+
+from __future__ import annotations
+
+import logging
+import subprocess
+import threading
+from typing import Iterator
+
+class GitBlobReader():
+
+    # tree entry modes for regular files ( normal and executable ) and directories
+    FILE_MODES = (b'100644', b'100755')
+    TREE_MODE = b'40000'
+
+    def __init__(self, git_dir: str):
+        self.git_dir = str(git_dir)
+        self.__process = None
+        self.__lock = threading.Lock()
+
+    def read_object(self, spec: str) -> tuple[str, bytes] | None:
+        """Returns the ( type, contents ) of the object named by spec ( e.g. 'HEAD:path/to/file' ), or None if it doesn't exist."""
+        with self.__lock:
+            if self.__process and self.__process.poll() is not None:
+                # it exited since the last read ( killed, or the repo went away ), so start a fresh one
+                self.__discard()
+            if not self.__process:
+                self.__process = subprocess.Popen(
+                    ['git', '--git-dir', self.git_dir, 'cat-file', '--batch'],
+                    stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+                )
+            try:
+                self.__process.stdin.write(spec.encode() + b'\n')
+                self.__process.stdin.flush()
+                line = self.__process.stdout.readline()
+            except OSError as e:
+                # BrokenPipeError included: the process exited before it took the request
+                logging.getLogger().warning("git cat-file in %s failed reading %s: %s", self.git_dir, spec, e)
+                self.__discard()
+                return None
+            if not line:
+                logging.getLogger().warning("git cat-file in %s exited reading %s", self.git_dir, spec)
+                self.__discard()
+                return None
+            header = line.split()
+            # '<object> missing' or '<object> ambiguous' when there's nothing to read
+            if len(header) != 3:
+                return None
+            data = self.__process.stdout.read(int(header[2]))
+            self.__process.stdout.read(1)
+            return header[1].decode(), data
+
+    def read(self, path: str, rev: str = 'HEAD') -> bytes | None:
+        """Returns the contents of the file at path in rev, or None if there is no such file."""
+        obj = self.read_object(f"{rev}:{path}")
+        if not obj or obj[0] != 'blob':
+            return None
+        return obj[1]
+
+    def iter_files(self, directory: str, rev: str = 'HEAD') -> Iterator[tuple[str, bytes]]:
+        """Yields ( path, contents ) for every regular file under directory in rev, recursively."""
+        obj = self.read_object(f"{rev}:{directory}")
+        if not obj or obj[0] != 'tree':
+            return
+        yield from self.__iter_tree(directory, obj[1])
+
+    def __iter_tree(self, directory: str, tree: bytes) -> Iterator[tuple[str, bytes]]:
+        # tree objects are a sequence of '<mode> <name>\0<20 byte binary sha>' entries
+        pos = 0
+        while pos < len(tree):
+            space = tree.index(b' ', pos)
+            nul = tree.index(b'\0', space)
+            mode = tree[pos:space]
+            path = f"{directory}/{tree[space + 1:nul].decode(errors='replace')}"
+            sha = tree[nul + 1:nul + 21].hex()
+            pos = nul + 21
+            if mode in self.FILE_MODES:
+                obj = self.read_object(sha)
+                if obj:
+                    yield path, obj[1]
+            elif mode == self.TREE_MODE:
+                obj = self.read_object(sha)
+                if obj:
+                    yield from self.__iter_tree(path, obj[1])
+
+    def close(self):
+        with self.__lock:
+            self.__discard()
+
+    def __discard(self):
+        if not self.__process:
+            return
+        try:
+            self.__process.stdin.close()
+        except OSError:
+            # closing flushes, and the pipe is already broken if the process is gone
+            pass
+        self.__process.wait()
+        self.__process.stdout.close()
+        self.__process = None
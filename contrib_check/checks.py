@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+#
+# The checks a scan can run over each commit, and the registry Repo.checks names them from
+#
+
+from __future__ import annotations
+
+from .commit import Commit, CommitRecord
+
+CHECKS = {}
+
+def register_check(check_class: type[Check]) -> type[Check]:
+    """Class decorator adding a Check subclass to the registry under its name."""
+    CHECKS[check_class.name] = check_class
+    return check_class
+
+def make_checks(enabled: dict) -> list[Check]:
+    """Builds the checks enabled in a Repo.checks style dict, whose values are True, a dict of keyword arguments
+    for the check's constructor, or False to leave it out."""
+    checks = []
+    for name, options in enabled.items():
+        if not options:
+            continue
+        if name not in CHECKS:
+            raise ValueError(f"Unknown check '{name}'; the available checks are {', '.join(sorted(CHECKS))}")
+        checks.append(CHECKS[name](**options) if isinstance(options, dict) else CHECKS[name]())
+    return checks
+
+class Check():
+    """A check run over batches of commits, all enabled checks sharing the scan's single pass over history.
+
+    Subclasses set name ( the error type in the output ) and description, and implement check(). A check that can
+    say why commits pass or fail, for the scan summary, overrides outcomes() too and lists the outcomes that are
+    failures in failing_outcomes. Instances are pickled to the worker processes of a parallel scan, so hold nothing
+    there that can't be until prepare().
+    """
+
+    name = ''
+    description = ''
+    failing_outcomes = ('failed',)
+
+    def prepare(self, repo) -> None:
+        """Called with the repo being scanned before any batch is checked, in whichever process will check them."""
+
+    def check(self, records: list[CommitRecord]) -> list[bool]:
+        """Returns a verdict for each of records, in order; True if the commit passes."""
+        raise NotImplementedError
+
+    def outcomes(self, records: list[CommitRecord]) -> list[str]:
+        """Returns a name for the outcome for each of records, in order."""
+        return [ 'passed' if passed else 'failed' for passed in self.check(records) ]
+
+@register_check
+class DcoCheck(Check):
+    """Commit.dco_outcome() for each commit, with the per-repo lookups built once rather than per commit."""
+
+    name = 'dco'
+    description = 'The commit did not have a DCO Signoff'
+    failing_outcomes = ('unsigned',)
+
+    def prepare(self, repo) -> None:
+        self.past_signoffs = b'\n'.join(repo.past_signoffs)
+        self.remediations = Commit.remediation_prefixes(repo.remediations)
+
+    def check(self, records: list[CommitRecord]) -> list[bool]:
+        return [ outcome != 'unsigned' for outcome in self.outcomes(records) ]
+
+    def outcomes(self, records: list[CommitRecord]) -> list[str]:
+        return [ Commit.dco_outcome(record, self.past_signoffs, self.remediations) for record in records ]
+
+@register_check
+class EmailDomainCheck(Check):
+    """Author email addresses must be in one of domains, or a subdomain of one."""
+
+    name = 'email-domain'
+    description = 'The commit author email is not in an allowed domain'
+
+    def __init__(self, domains: list[str]):
+        self.domains = tuple(domain.strip().lower().lstrip('@') for domain in domains if domain.strip())
+
+    def check(self, records: list[CommitRecord]) -> list[bool]:
+        suffixes = tuple(f".{domain}" for domain in self.domains)
+        verdicts = []
+        for record in records:
+            domain = record.author.email.rpartition('@')[2].lower()
+            verdicts.append(domain in self.domains or domain.endswith(suffixes))
+        return verdicts
+
+@register_check
+class SignedCheck(Check):
+    """Commits must carry a cryptographic ( GPG, SSH or S/MIME ) signature; whether it verifies isn't checked."""
+
+    name = 'signed'
+    description = 'The commit was not cryptographically signed'
+
+    def check(self, records: list[CommitRecord]) -> list[bool]:
+        return [ record.signed for record in records ]
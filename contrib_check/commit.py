@@ -7,87 +7,209 @@
 #
 # Provides a decorator-esque pattern on the GitPython.Commit object to add the commit inspection capabilities
 
+from __future__ import annotations
+
 import re
 import logging
 
-# third party modules
-import yaml
-import git
+from .identity import IdentityIndex
+
+class CommitAuthor():
+    """Name and email of a commit author, mirroring the GitPython.Actor attributes the checks use."""
+
+    __slots__ = ('name', 'email')
+
+    def __init__(self, name: str, email: str):
+        self.name = name
+        self.email = email
+
+class CommitRecord():
+    """Compact snapshot of the fields the checks need from a commit.
+
+    Duck-types the parts of GitPython.Commit used by Commit, so it can be used in its place without holding on to
+    the GitPython object, its repo or the object database.
+    """
+
+    __slots__ = ('hexsha', 'message', 'author', 'authored_datetime', 'parents', 'signed')
+
+    def __init__(self, hexsha: str, message: str, author: CommitAuthor, authored_datetime, parents: tuple = (), signed: bool = False):
+        self.hexsha = hexsha
+        self.message = message
+        self.author = author
+        self.authored_datetime = authored_datetime
+        self.parents = parents
+        # whether the commit carries a signature, not whether it verifies
+        self.signed = signed
+
+    @classmethod
+    def from_git_commit(cls, git_commit) -> CommitRecord:
+        return cls(
+            git_commit.hexsha,
+            git_commit.message,
+            CommitAuthor(git_commit.author.name, git_commit.author.email),
+            git_commit.authored_datetime,
+            tuple(str(parent) for parent in git_commit.parents),
+            bool(git_commit.gpgsig)
+        )
+
+# remediation commits name commits by abbreviated hash; any shorter than git's default abbreviation could match
+# commits by anyone, so they're ignored
+MIN_REMEDIATION_HASH_LENGTH = 7
 
 class Commit():
 
-    # GitPython.Commit object
-    git_commit_object = None
-    repo_object = None
-    is_merge_commit = False
+    # Per-commit state only; everything shared across commits lives on the class or on the repo
+    __slots__ = (
+        'git_commit_object', 'repo_object', 'is_merge_commit',
+        'allow_remediation_commit_individual', 'allow_remediation_commit_thirdparty', 'remediations', 'identities'
+    )
 
     create_prior_commits_dir = 'dco-signoffs'
 
-    remediation_regex_individual = r"I,\s+(.*?)\s+<(.*?)>,\s+hereby\s+add\s+my\s+Signed-off-by\s+to\s+this\s+commit:\s+([a-f0-9]+)"
-    remediation_regex_thirdparty = r"On\s+behalf\s+of\s+(.*?)\s+<(.*?)>,\s+I,\s+(.*?)\s+<(.*?)>,\s+hereby\s+add\s+my\s+Signed-off-by\s+to\s+this\s+commit:\s+([a-f0-9]+)"
+    signoff_regex = re.compile("Signed-off-by: (.+)")
 
-    allow_remediation_commit_individual = False
-    allow_remediation_commit_thirdparty = False
+    remediation_regex_individual = re.compile(
+        r"I,\s+(.*?)\s+<(.*?)>,\s+hereby\s+add\s+my\s+Signed-off-by\s+to\s+this\s+commit:\s+([a-f0-9]+)",
+        flags=re.I|re.M|re.DOTALL
+    )
+    remediation_regex_thirdparty = re.compile(
+        r"On\s+behalf\s+of\s+(.*?)\s+<(.*?)>,\s+I,\s+(.*?)\s+<(.*?)>,\s+hereby\s+add\s+my\s+Signed-off-by\s+to\s+this\s+commit:\s+([a-f0-9]+)",
+        flags=re.I|re.M|re.DOTALL
+    )
 
-    remediations = []
+    def __init__(self, git_commit_object, repo_object, remediation_config: tuple[bool, bool] | None = None, identities: IdentityIndex | None = None):
+        """git_commit_object is a GitPython.Commit or a CommitRecord.
 
-    def __init__(self, git_commit_object, repo_object):
+        remediation_config is the ( individual, thirdparty ) pair from read_remediation_commit_config(), and identities
+        the IdentityIndex of the repo's .mailmap; pass them in when checking many commits from the same repo so
+        dco.yml and .mailmap are only read once.
+        """
         self.git_commit_object = git_commit_object
         self.repo_object = repo_object
-        self.is_merge_commit = len(git_commit_object.parents) > 1
+        self.is_merge_commit = self.is_merge(git_commit_object)
+        self.remediations = []
+        self.identities = identities
 
-        self.load_remediation_commit_config()
+        if remediation_config is None:
+            self.load_remediation_commit_config()
+        else:
+            self.allow_remediation_commit_individual, self.allow_remediation_commit_thirdparty = remediation_config
 
     def check_dco_signoff(self):
+        # the same rules as dco_outcome(), checked one at a time so the repo's lookups are only built when needed
         if self.is_dco_signoff_required():
             return self.has_dco_signoff() or self.has_dco_past_signoff() or self.has_remediation()
 
         return True
 
+    @classmethod
+    def dco_outcome(cls, record, past_signoffs: bytes, remediations: tuple[str, ...]) -> str:
+        """Returns why record passes the DCO check ( 'merge', 'signed-off', 'past-signed' or 'remediated' ), or
+        'unsigned' if it doesn't.
+
+        past_signoffs is the repo's past signoff files joined by newlines ( a sha can't span one, so one search of
+        them all finds what searching each would ), and remediations comes from remediation_prefixes(); both are
+        built once per repo by callers checking many commits.
+        """
+        if cls.is_merge(record):
+            return 'merge'
+        if cls.is_signed_off(record.message):
+            return 'signed-off'
+        if cls.is_past_signed(record.hexsha, past_signoffs):
+            return 'past-signed'
+        if cls.is_remediated(record.hexsha, remediations):
+            return 'remediated'
+        return 'unsigned'
+
     def is_dco_signoff_required(self):
         return not self.is_merge_commit
 
     def has_dco_signoff(self):
-        return (re.search("Signed-off-by: (.+)",self.git_commit_object.message) != None)
+        return self.is_signed_off(self.git_commit_object.message)
 
     def has_dco_past_signoff(self):
-        for signoff in self.repo_object.past_signoffs:
-            if (re.search(self.git_commit_object.hexsha.encode(),signoff) != None):
-                return True
-
-        return False
+        return self.is_past_signed(self.git_commit_object.hexsha, b'\n'.join(self.repo_object.past_signoffs))
 
     def has_remediation(self):
-        return self.repo_object.git_repo_object.git.rev_parse(self.git_commit_object.hexsha, short="7") in self.remediations
+        return self.is_remediated(self.git_commit_object.hexsha, self.remediation_prefixes(self.repo_object.remediations))
+
+    @staticmethod
+    def is_merge(record) -> bool:
+        return len(record.parents) > 1
+
+    @classmethod
+    def is_signed_off(cls, message: str) -> bool:
+        return cls.signoff_regex.search(message) is not None
+
+    @staticmethod
+    def is_past_signed(hexsha: str, past_signoffs: bytes) -> bool:
+        return hexsha.encode() in past_signoffs
+
+    @staticmethod
+    def is_remediated(hexsha: str, remediations: tuple[str, ...]) -> bool:
+        # remediations name commits by abbreviated hash, so match on prefix rather than shelling out to rev-parse
+        return hexsha.startswith(remediations)
+
+    @staticmethod
+    def remediation_prefixes(remediations) -> tuple[str, ...]:
+        """Returns the remediated hashes long enough to be matched as prefixes of a commit's hash."""
+        return tuple(remediation for remediation in remediations if len(remediation) >= MIN_REMEDIATION_HASH_LENGTH)
+
+    @staticmethod
+    def read_remediation_commit_config(repo_object) -> tuple[bool, bool] | None:
+        """Returns the ( individual, thirdparty ) remediation commit flags from the repo's dco.yml, or None if there isn't one."""
+        import yaml
+
+        contents = repo_object.read_blob(".github/dco.yml")
+        if contents is None:
+            return None
+        config = yaml.safe_load(contents)
+
+        allow = config['allowRemediationCommits'] if config and 'allowRemediationCommits' in config else {}
+        return ( allow.get('individual', False), allow.get('thirdParty', False) )
 
     def load_remediation_commit_config(self):
-        try:
-            with open(self.repo_object.git_repo_object.head.commit.tree[".github/dco.yml"].abspath, 'r') as file:
-                config = yaml.safe_load(file)
-                self.allow_remediation_commit_individual = config['allowRemediationCommits']['individual'] if config and 'allowRemediationCommits' in config and 'individual' in config['allowRemediationCommits'] else False
-                self.allow_remediation_commit_thirdparty = config['allowRemediationCommits']['thirdParty'] if config and 'allowRemediationCommits' in config and 'thirdParty' in config['allowRemediationCommits'] else False
-        except KeyError:
+        self.allow_remediation_commit_individual = False
+        self.allow_remediation_commit_thirdparty = False
+
+        config = self.read_remediation_commit_config(self.repo_object)
+        if config is None:
             return False
-        else:
-            return True
+
+        self.allow_remediation_commit_individual, self.allow_remediation_commit_thirdparty = config
+        return True
 
     def is_remediation_commit(self):
         is_remediation_commit = False
+        # this runs for every commit in the history, so skip building debug messages nobody will see
+        logger = logging.getLogger()
+        debug = logger.isEnabledFor(logging.DEBUG)
+        author = self.git_commit_object.author
+        if ( self.allow_remediation_commit_individual or self.allow_remediation_commit_thirdparty ) and self.identities is None:
+            self.identities = IdentityIndex.read(self.repo_object)
 
         if self.allow_remediation_commit_individual:
-            logging.getLogger().debug(f"Looking for individual remediation commits for commit {self.git_commit_object.hexsha}")
-            for match in re.findall(self.remediation_regex_individual,self.git_commit_object.message,flags=re.I|re.M|re.DOTALL):
-                # ensure it's a valid remediation commit by matching the author with the attestation
-                if ( match[0] == self.git_commit_object.author.name ) and ( match[1] == self.git_commit_object.author.email ):
-                    logging.getLogger().debug(f"Found individual remediation commit {match[2]} in commit {self.git_commit_object.hexsha}")
+            if debug:
+                logger.debug("Looking for individual remediation commits for commit %s", self.git_commit_object.hexsha)
+            for match in self.remediation_regex_individual.findall(self.git_commit_object.message):
+                if len(match[2]) < MIN_REMEDIATION_HASH_LENGTH:
+                    logger.warning("Ignoring remediation of '%s' in commit %s; a remediated hash needs at least %d characters", match[2], self.git_commit_object.hexsha, MIN_REMEDIATION_HASH_LENGTH)
+                # ensure it's a valid remediation commit by matching the author with the attestation, as whoever the .mailmap says they are
+                elif self.identities.same(match[0], match[1], author.name, author.email):
+                    if debug:
+                        logger.debug("Found individual remediation commit %s in commit %s", match[2], self.git_commit_object.hexsha)
                     self.remediations.append(match[2])
                     is_remediation_commit = True
         if self.allow_remediation_commit_thirdparty:
-            logging.getLogger().debug(f"Looking for third party remediation commits for commit {self.git_commit_object.hexsha}")
-            for match in re.findall(self.remediation_regex_thirdparty,self.git_commit_object.message,flags=re.I|re.M|re.DOTALL):
-                # ensure it's a valid remediation commit by matching the author with the attestation
-                if ( match[2] == self.git_commit_object.author.name ) and ( match[3] == self.git_commit_object.author.email ):
-                    logging.getLogger().debug(f"Found third party remediation commit {match[4]} in commit {self.git_commit_object.hexsha}")
+            if debug:
+                logger.debug("Looking for third party remediation commits for commit %s", self.git_commit_object.hexsha)
+            for match in self.remediation_regex_thirdparty.findall(self.git_commit_object.message):
+                if len(match[4]) < MIN_REMEDIATION_HASH_LENGTH:
+                    logger.warning("Ignoring remediation of '%s' in commit %s; a remediated hash needs at least %d characters", match[4], self.git_commit_object.hexsha, MIN_REMEDIATION_HASH_LENGTH)
+                # ensure it's a valid remediation commit by matching the author with the attestation, as whoever the .mailmap says they are
+                elif self.identities.same(match[2], match[3], author.name, author.email):
+                    if debug:
+                        logger.debug("Found third party remediation commit %s in commit %s", match[4], self.git_commit_object.hexsha)
                     self.remediations.append(match[4])
                     is_remediation_commit = True
 
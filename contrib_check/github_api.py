@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+#
+# The one GitHub client an org run shares: REST and GraphQL requests over a single pooled, keep-alive session, with
+# every request counted and timed
+#
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Iterator
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+class GitHubApiError(Exception):
+    """An error response from the GitHub API: its HTTP status, its decoded body and its headers."""
+
+    def __init__(self, status: int, data=None, headers: dict | None = None):
+        super().__init__(f"{status} {data}")
+        self.status = status
+        self.data = data
+        self.headers = headers or {}
+
+class RateLimitError(GitHubApiError):
+    """The API rate limit is used up until the time in the X-RateLimit-Reset header."""
+
+class _MeteredAdapter(HTTPAdapter):
+    """Pooled adapter that reports how long each request took to the client that mounted it."""
+
+    def __init__(self, api: GitHubApi, pool_size: int):
+        # block rather than open throwaway connections when every pooled one is busy
+        super().__init__(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.api = api
+
+    def send(self, request, *args, **kwargs):
+        start_time = time.perf_counter()
+        try:
+            return super().send(request, *args, **kwargs)
+        finally:
+            self.api._record('graphql' if request.url.endswith('/graphql') else 'rest', time.perf_counter() - start_time)
+
+class GitHubApi():
+    """Thread-safe, so one instance can serve every repo an org run scans in parallel.
+
+    Error responses are raised as GitHubApiError ( or RateLimitError ), and network timeouts as TimeoutError, the
+    same as the rest of the code already handles.
+    """
+
+    def __init__(self, token: str | None = None, api_url: str | None = None, timeout: float = 30, pool_size: int = 10):
+        """token defaults to the GITHUB_TOKEN environment variable. api_url is the REST API root, defaulting to the
+        GITHUB_API_URL environment variable ( as GitHub Actions and GitHub Enterprise set it ) or api.github.com;
+        GraphQL requests go to {api_url}/graphql. pool_size is the most connections kept open at once."""
+        self.api_url = (api_url or os.environ.get('GITHUB_API_URL') or 'https://api.github.com').rstrip('/')
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.calls = {}
+        self.seconds = {}
+        self.__lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = _MeteredAdapter(self, pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        token = token or os.environ.get('GITHUB_TOKEN')
+        if token:
+            self.session.headers['Authorization'] = f"bearer {token}"
+        self.session.headers['Accept'] = 'application/vnd.github+json'
+
+    def _record(self, kind: str, seconds: float):
+        with self.__lock:
+            self.calls[kind] = self.calls.get(kind, 0) + 1
+            self.seconds[kind] = self.seconds.get(kind, 0.0) + seconds
+
+    def __request(self, method: str, url: str, **kwargs) -> requests.Response:
+        try:
+            response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+        except requests.exceptions.Timeout as e:
+            raise TimeoutError(f"{method} {url} timed out") from e
+        except requests.exceptions.ConnectionError as e:
+            raise ConnectionError(f"{method} {url} failed: {e}") from e
+        if response.status_code in (403, 429) and response.headers.get('X-RateLimit-Remaining') == '0':
+            raise RateLimitError(response.status_code, _json(response), dict(response.headers))
+        return response
+
+    def graphql(self, query: str, variables: dict | None = None) -> dict:
+        """Runs a GraphQL query, returning its data."""
+        response = self.__request('POST', f"{self.api_url}/graphql", json={ 'query': query, 'variables': variables or {} })
+        body = _json(response)
+        if response.status_code != 200 or not isinstance(body, dict) or body.get('errors'):
+            raise GitHubApiError(response.status_code, body, dict(response.headers))
+        return body['data']
+
+    def get(self, path: str, params: dict | None = None) -> dict | list | None:
+        """GETs a REST API path ( e.g. '/repos/owner/repo' ), returning the decoded JSON, or None if it's not found."""
+        response = self.__request('GET', f"{self.api_url}{quote(path)}", params=params)
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise GitHubApiError(response.status_code, _json(response), dict(response.headers))
+        return response.json()
+
+    def iter_pages(self, path: str, per_page: int = 100) -> Iterator[dict]:
+        """Yields every item of a paginated REST API list, following the Link headers from page to page."""
+        url = f"{self.api_url}{quote(path)}"
+        params = { 'per_page': per_page }
+        while url:
+            response = self.__request('GET', url, params=params)
+            if response.status_code != 200:
+                raise GitHubApiError(response.status_code, _json(response), dict(response.headers))
+            yield from response.json()
+            # the next link carries the query string along with it
+            url = response.links.get('next', {}).get('url')
+            params = None
+
+    def stats(self) -> dict[str, tuple[int, float]]:
+        """Returns { kind: ( calls, total seconds ) } for each kind of request ( 'rest', 'graphql' ) made so far."""
+        with self.__lock:
+            return { kind: (count, self.seconds[kind]) for kind, count in self.calls.items() }
+
+    def log_stats(self):
+        for kind, (count, seconds) in sorted(self.stats().items()):
+            logging.getLogger().info(
+                "GitHub %s API: %d calls, %.1f ms mean latency, %.1f seconds in total", kind, count, seconds / count * 1000, seconds
+            )
+
+    def close(self):
+        self.session.close()
+
+def _json(response: requests.Response):
+    try:
+        return response.json()
+    except ValueError:
+        return response.text
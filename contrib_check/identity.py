@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+#
+# Who's who in a repo, from its .mailmap, so a contributor who has changed name or email ( or just its case ) is
+# still recognised as the same person
+#
+
+from __future__ import annotations
+
+import re
+import unicodedata
+
+# 'Proper Name <proper@email> Commit Name <commit@email>', where all but one name and email are optional
+_MAILMAP_LINE = re.compile(r"\s*([^<#]*?)\s*<([^>]*)>\s*(?:([^<#]*?)\s*<([^>]*)>)?")
+
+def normalize_name(name: str) -> str:
+    """Folds case, Unicode forms and runs of whitespace out of a name, so differently typed names compare equal."""
+    return ' '.join(unicodedata.normalize('NFKC', name).casefold().split())
+
+def normalize_email(email: str) -> str:
+    return email.strip().casefold()
+
+class IdentityIndex():
+    """Maps the names and emails commits were made under to the canonical identity the repo's .mailmap gives them,
+    resolving them as git log's %aN and %aE do, with one dict lookup per identity.
+
+    Emails are compared case-insensitively and names with case, Unicode forms and whitespace folded, both for
+    .mailmap entries and for telling whether two identities are the same person. Without a .mailmap, the index
+    still does that folding.
+    """
+
+    def __init__(self):
+        # normalized commit email -> ( proper name, proper email ), either of which may be None to keep the original
+        self.__by_email = {}
+        # ( normalized commit name, normalized commit email ) -> ( proper name, proper email )
+        self.__by_name_email = {}
+
+    @classmethod
+    def from_mailmap(cls, contents: bytes | str | None) -> IdentityIndex:
+        """Builds the index from the contents of a .mailmap file; None gives an index with no entries."""
+        index = cls()
+        if isinstance(contents, bytes):
+            contents = contents.decode('utf-8', errors='replace')
+        for line in (contents or '').splitlines():
+            if not line.strip() or line.lstrip().startswith('#'):
+                continue
+            match = _MAILMAP_LINE.match(line)
+            if match:
+                index.add(*match.groups())
+        return index
+
+    @classmethod
+    def read(cls, repo) -> IdentityIndex:
+        """Builds the index from the .mailmap at the repo's HEAD."""
+        return cls.from_mailmap(repo.read_blob(".mailmap"))
+
+    def add(self, first_name: str, first_email: str, second_name: str | None = None, second_email: str | None = None):
+        """Adds a .mailmap entry, given the names and emails on its line in order."""
+        if second_email is None:
+            # 'Proper Name <commit@email>' only corrects the name
+            if first_name:
+                self.__merge(self.__by_email, normalize_email(first_email), first_name, None)
+            return
+        proper = (first_name or None, first_email or None)
+        if second_name:
+            self.__by_name_email[(normalize_name(second_name), normalize_email(second_email))] = proper
+        else:
+            self.__merge(self.__by_email, normalize_email(second_email), *proper)
+
+    @staticmethod
+    def __merge(entries: dict, key, name: str | None, email: str | None):
+        # as in git, a later line for the same email fills in or replaces only what it gives
+        old_name, old_email = entries.get(key, (None, None))
+        entries[key] = (name or old_name, email or old_email)
+
+    def canonical(self, name: str, email: str) -> tuple[str, str]:
+        """Returns the ( name, email ) the .mailmap gives the identity, which is the identity itself if it has no entry."""
+        email_key = normalize_email(email)
+        entry = self.__by_name_email.get((normalize_name(name), email_key)) or self.__by_email.get(email_key)
+        if not entry:
+            return name, email
+        return entry[0] or name, entry[1] or email
+
+    def key(self, name: str, email: str) -> tuple[str, str]:
+        """Returns what identifies the person behind an identity: its canonical name and email, normalized."""
+        canonical_name, canonical_email = self.canonical(name, email)
+        return normalize_name(canonical_name), normalize_email(canonical_email)
+
+    def same(self, name: str, email: str, other_name: str, other_email: str) -> bool:
+        """Whether two identities belong to the same person."""
+        return self.key(name, email) == self.key(other_name, other_email)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+#
+# Completion journal for org runs, so an interrupted run can be resumed without rescanning ( or recloning ) the
+# repos it already finished
+#
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+
+class RunJournal():
+    """Append-only record of the repos an org run has completed, one JSON object per line.
+
+    Each entry is flushed and fsynced as it's written, so after a crash the journal holds exactly the repos whose
+    output was complete; a torn final line is ignored when the journal is read back.
+    """
+
+    default_filename = 'contrib-check-journal.jsonl'
+
+    def __init__(self, path: str | os.PathLike, resume: bool = False):
+        self.path = str(path)
+        self.completed = {}
+        self.__lock = threading.Lock()
+
+        if resume:
+            self.__load()
+        # a fresh run starts a fresh journal
+        self.__fh = open(self.path, mode='a' if resume else 'w', encoding='utf-8')
+        if resume and self.__fh.tell() and not self.__ends_with_newline():
+            # don't let the next entry run on from a line torn by the crash
+            self.__fh.write('\n')
+
+    def __ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as fh:
+            fh.seek(-1, os.SEEK_END)
+            return fh.read(1) == b'\n'
+
+    def __load(self):
+        if not os.path.isfile(self.path):
+            return
+        with open(self.path, encoding='utf-8') as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logging.getLogger().warning("Ignoring incomplete journal entry in %s", self.path)
+                    continue
+                self.completed[entry['repo']] = entry
+        logging.getLogger().info("Loaded %d completed repos from journal %s", len(self.completed), self.path)
+
+    def is_complete(self, repo: str) -> bool:
+        return repo in self.completed
+
+    def record(self, repo: str, **details):
+        """Marks repo as complete; call only once all of its output has been written."""
+        entry = { 'repo': repo, 'completed_at': datetime.now(timezone.utc).isoformat(), **details }
+        with self.__lock:
+            self.__fh.write(json.dumps(entry) + '\n')
+            self.__fh.flush()
+            os.fsync(self.__fh.fileno())
+            self.completed[repo] = entry
+
+    def close(self):
+        with self.__lock:
+            if self.__fh:
+                self.__fh.close()
+                self.__fh = None
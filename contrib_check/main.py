@@ -5,19 +5,118 @@
 #
 # encoding=utf8
 
-import shutil
-from argparse import ArgumentParser, FileType, ArgumentDefaultsHelpFormatter
+import csv
+from contextlib import nullcontext
+from argparse import ArgumentParser, ArgumentDefaultsHelpFormatter
 from datetime import datetime
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import time
 from pathlib import Path
 
-# third party modules
-import yaml
-from contrib_check.repo import Repo
-from contrib_check.org import Org
+from contrib_check.checks import CHECKS
+from contrib_check.progress import OrgProgress, ScanProgress
+
+# The scanning modules pull in GitPython, requests and friends, so they are imported only on the code paths that
+# use them; --help, query and local --repo runs don't pay for what they don't need
+
+def query(argv: list[str]):
+    from contrib_check.store import ResultsStore
+
+    parser = ArgumentParser(
+            prog="contrib-check query",
+            description="Query a results database written with --db",
+            formatter_class=ArgumentDefaultsHelpFormatter
+            )
+    parser.add_argument("query", choices=ResultsStore.QUERIES.keys(), help="Query to run")
+    parser.add_argument("--db", required=True, help="Path to the results database")
+    parser.add_argument("--repo", help="Only include results for this repo name")
+    parser.add_argument("--author", help="Only include results for this author email")
+
+    args = parser.parse_args(argv)
+
+    store = ResultsStore(args.db)
+    columns, rows = store.query(args.query, repo=args.repo, author=args.author)
+    store.close()
+
+    writer = csv.writer(sys.stdout)
+    writer.writerow(columns)
+    writer.writerows(rows)
+
+def merge(argv: list[str]):
+    from contrib_check.shard import merge_shards
+
+    parser = ArgumentParser(
+            prog="contrib-check merge",
+            description="Merge the output directories of --shard runs into one org-level report",
+            formatter_class=ArgumentDefaultsHelpFormatter
+            )
+    parser.add_argument("shard_dirs", nargs='+', help="Output directories of the shard runs")
+    parser.add_argument("-o", "--output-dir", type=Path, default=Path.cwd(), help="Output directory")
+
+    args = parser.parse_args(argv)
+
+    metrics = merge_shards(args.shard_dirs, args.output_dir)
+    print(f"Merged {metrics['shards']} shards: {metrics['repos']} repos, {metrics['commits']} commits scanned, "
+          f"errors {metrics['errors']}")
+
+def serve(argv: list[str]):
+    from contrib_check.service import ScanService, make_server
+
+    parser = ArgumentParser(
+            prog="contrib-check serve",
+            description="Keep repos warm and check each push posted to a local HTTP endpoint as it happens",
+            formatter_class=ArgumentDefaultsHelpFormatter
+            )
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument("--preload", action="append", help="URL or path of a repo to load at startup rather than on its first push; may be given more than once")
+    parser.add_argument("--dco-skip", action="store_true", help="Skips DCO checks")
+    parser.add_argument("--check", action="append", choices=sorted(CHECKS),
+                        help="Also run this check on each push; may be given more than once")
+    parser.add_argument("--allowed-email-domains",
+                        help="Comma delimited list of domains commit author emails must be in ( enables the 'email-domain' check )")
+    parser.add_argument("--dco-signoff-dirs",
+                        help="List of directory names, comma delimited, where past signoffs could be in the repo",
+                        default="dco-signoffs,dco_signoffs")
+    parser.add_argument("--clone-timeout", type=float, help="Seconds a clone may take before it's killed")
+    parser.add_argument("-l", "--log", dest="loglevel", default="info",
+                        choices=['debug', 'info', 'warning', 'error', 'critical'], help="Logging level")
+    parser.add_argument("--logfile", default='debug.log', help="Name for the log file")
+
+    args = parser.parse_args(argv)
+    if 'email-domain' in (args.check or []) and not args.allowed_email_domains:
+        parser.error("--check email-domain needs --allowed-email-domains")
+
+    log_listener = setup_logging(args.loglevel, args.logfile)
+    service = ScanService(enabled_checks(args), args.dco_signoff_dirs, args.clone_timeout)
+    try:
+        for repo_path in args.preload or []:
+            service.warm(repo_path)
+        server = make_server(service, args.host, args.port)
+        logging.getLogger().info("Listening for pushes on http://%s:%d/push", *server.server_address[:2])
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+    finally:
+        service.close()
+        log_listener.stop()
+
+def main(argv: list[str] | None = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'query':
+        return query(argv[1:])
+    if argv and argv[0] == 'merge':
+        return merge(argv[1:])
+    if argv and argv[0] == 'serve':
+        return serve(argv[1:])
 
-def main():
     start_time = datetime.now()
 
     parser = ArgumentParser(
@@ -26,15 +125,26 @@ def main():
             )
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument("--repo", dest="repo", help="URL or path to the repo to search")
-    group.add_argument("--org", dest="org", help="URL to GitHub org to search")
+    group.add_argument("--org", dest="org", help="URL to GitHub org to search, or directory to search for repos with --org-type local")
     parser.add_argument(
         "-o", "--output-dir",
         type=Path,
         default=Path.cwd(),
         help="Output directory"
     )
-    parser.add_argument("--org-type", default="github", help="Type of Org")
+    parser.add_argument("--output-compression", choices=['gzip', 'zstd'],
+                        help="Compress each repo's CSV output as it's written, adding .gz or .zst to its name")
+    parser.add_argument("--output-max-size",
+                        help="Start a new part of a repo's CSV output ( name.part2.csv and so on ) once a part holds this much CSV before compression, e.g. 500M")
+    parser.add_argument("--message-column", choices=['full', 'first-line', 'hash'], default='full',
+                        help="What of each commit message to put in the CSV output: all of it, its first line, or its SHA-256 and length")
+    parser.add_argument("--org-type", default="github", choices=['github', 'local'],
+                        help="Type of Org; 'local' scans every git repo found under the --org directory, and needs no GitHub token")
     parser.add_argument("--dco-skip", action="store_true", help="Skips DCO checks")
+    parser.add_argument("--check", action="append", choices=sorted(CHECKS),
+                        help="Also run this check in the same pass over each repo's history; may be given more than once")
+    parser.add_argument("--allowed-email-domains",
+                        help="Comma delimited list of domains commit author emails must be in ( enables the 'email-domain' check )")
     parser.add_argument("--dco-allow-individual-remediation-commits",
                         action="store_true",
                         help="Allow individual remediation commits for DCO signoffs (only needed if not enabled in dco.yml in the repo)")
@@ -48,20 +158,80 @@ def main():
                         help="Start checking for DCO signoffs after the provided date (ISO format or relative date, e.g. '2 weeks ago')")
     parser.add_argument("--dco-start-commit",
                         help="Start checking for DCO signoffs after the provided commit hash")
+    parser.add_argument("--dco-end-date",
+                        help="Stop checking for DCO signoffs at the provided date (ISO format or relative date, e.g. '1 week ago')")
+    parser.add_argument("--dco-author", action="append",
+                        help="Only check commits whose author matches this pattern (as git log --author); may be given more than once")
     org_group = parser.add_mutually_exclusive_group()
     org_group.add_argument("--only-repos",
-                           help="When specifying an org, only include the comma delimited list of repos")
+                           help="When specifying an org, only include the comma delimited list of repos ( for a local org, their paths under the --org directory )")
     org_group.add_argument("--ignore-repos",
-                           help="When specifying an org, do not include the comma delimited list of repos")
+                           help="When specifying an org, do not include the comma delimited list of repos ( for a local org, their paths under the --org directory )")
+    parser.add_argument("--parallel-repos", type=int, default=1,
+                        help="When specifying an org, number of repos to clone and scan at once ( largest first )")
+    parser.add_argument("--remote-scan", action="store_true",
+                        help="Read GitHub repos' history and files through the API instead of cloning them ( best with a recent --dco-start-date )")
+    parser.add_argument("--github-pool-size", type=int, default=10,
+                        help="Connections kept open to the GitHub API, shared by every repo being scanned")
+    parser.add_argument("--clone-timeout", type=float,
+                        help="Seconds a clone may take before it's killed and retried")
+    parser.add_argument("--workdir",
+                        help="Directory to clone repos into, instead of the system temp directory")
+    parser.add_argument("--clone-budget",
+                        help="Most disk space the clones being scanned at once may take, e.g. 20G; clones wait until there's room")
+    parser.add_argument("--scan-timeout", type=float,
+                        help="Seconds a repo's scan may take before it's abandoned")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="Times to retry a failed clone, or a GitHub API request that was rate limited, timed out or lost its connection, with exponential backoff")
+    parser.add_argument("--shard",
+                        help="When specifying an org, only scan shard i of N ( given as i/N ); combine the shards' output with 'contrib-check merge'")
+    parser.add_argument("--resume", action="store_true",
+                        help="When specifying an org, skip repos the journal records as finished by an interrupted run")
+    parser.add_argument("--journal",
+                        help="When specifying an org, file recording the repos finished so far (default: contrib-check-journal.jsonl in the output directory)")
     parser.add_argument("--skip-archived-repos",
                         action="store_true",
                         help="Skip repos marked as Archived")
     parser.add_argument("-l", "--log", dest="loglevel", default="error",
                         choices=['debug', 'info', 'warning', 'error', 'critical'], help="Logging level")
     parser.add_argument("--logfile", default='debug.log', help="Name for the log file")
+    parser.add_argument("--log-each-error", action="store_true",
+                        help="Log a line for every failing commit instead of a summary per repo")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Number of worker processes to split each repo's history across when scanning")
+    parser.add_argument("--db", help="Also record results in this SQLite database ( see 'contrib-check query -h' )")
+    parser.add_argument("--profile", choices=['cpu', 'memory'],
+                        help="Profile each repo's clone and scan with cProfile ( cpu ) or tracemalloc ( memory ), writing the profile and a hotspot summary next to its output")
+    parser.add_argument("--profile-top", type=int, default=20,
+                        help="Number of hotspots listed in each --profile summary")
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    if 'email-domain' in (args.check or []) and not args.allowed_email_domains:
+        parser.error("--check email-domain needs --allowed-email-domains")
+    from contrib_check.workspace import parse_size
+    for option in ('clone_budget', 'output_max_size'):
+        if getattr(args, option):
+            try:
+                setattr(args, option, parse_size(getattr(args, option)))
+            except ValueError as e:
+                parser.error(str(e))
+    if args.profile == 'cpu' and args.parallel_repos > 1:
+        parser.error("--profile cpu profiles the whole process, so it can't tell repos scanned at once apart; use it without --parallel-repos")
+    if args.output_compression == 'zstd':
+        from contrib_check.output import zstd_available
+        if not zstd_available():
+            parser.error("--output-compression zstd needs Python 3.14 or later, or the zstandard package installed")
 
+    log_listener = setup_logging(args.loglevel, args.logfile)
+    try:
+        run(args)
+        logging.getLogger().info("This took {} seconds".format(str(datetime.now() - start_time)))
+    finally:
+        log_listener.stop()
+
+def setup_logging(loglevel: str, logfile: str) -> logging.handlers.QueueListener:
+    """Logs through a queue, so writing to the log file and stdout happens on a background thread instead of
+    blocking the scan. The returned listener must be stopped to flush the queue."""
     levels = {
         'critical': logging.CRITICAL,   # errors that mean an immediate stop
         'error': logging.ERROR,         # general errors that will effect the output
@@ -70,32 +240,186 @@ def main():
         'info': logging.INFO,           # infomational messages
         'debug': logging.DEBUG          # messages to help debug things misbehaving ;-)
     }
-    handlers = [logging.FileHandler(args.logfile,mode="w")]
+    handlers = [logging.FileHandler(logfile,mode="w")]
     handlers.append(logging.StreamHandler(sys.stdout))
+    log_queue = queue.SimpleQueue()
     logging.basicConfig(
-        level=levels.get(args.loglevel.lower()),
+        level=levels.get(loglevel.lower()),
         format="%(asctime)s [%(levelname)s] %(message)s",
-        handlers=handlers
+        handlers=[logging.handlers.QueueHandler(log_queue)]
+    )
+    # Repo announces each clone on a logger of its own, shown here even at the default level of 'error'
+    logging.getLogger('contrib_check.clone').setLevel(logging.INFO)
+    log_listener = logging.handlers.QueueListener(log_queue, *handlers)
+    log_listener.start()
+
+    return log_listener
+
+def run(args):
+    results_store = None
+    if args.db:
+        from contrib_check.store import ResultsStore
+        results_store = ResultsStore(args.db)
+
+    # one client, and so one pool of keep-alive connections, for every GitHub API request the run makes
+    github_api = None
+    if args.remote_scan or (args.org and args.org_type == 'github'):
+        from contrib_check.github_api import GitHubApi
+        github_api = GitHubApi(pool_size=args.github_pool_size)
+
+    # clones go in a directory of the run's own, removed however the run ends
+    from contrib_check.workspace import CloneWorkspace
+    workspace = CloneWorkspace(args.workdir, args.clone_budget)
+
+    try:
+        if args.org:
+            run_org(args, results_store, github_api, workspace)
+
+        if args.repo:
+            from contrib_check.repo import Repo
+            with ScanProgress() as progress, repo_profiler(args, os.path.basename(args.repo.rstrip('/'))) as profiler:
+                repo_obj = Repo(args.repo, clone_timeout=args.clone_timeout, remote=github_api if args.remote_scan else None, workspace=workspace)
+                if profiler:
+                    profiler.name = Path(repo_obj.csv_filename).stem
+                scan_repo(repo_obj, args, progress, results_store)
+    finally:
+        workspace.close()
+        if results_store:
+            results_store.close()
+        if github_api:
+            github_api.log_stats()
+            github_api.close()
+
+def run_org(args, results_store, github_api=None, workspace=None):
+    """Scans every repo in the org, longest estimated scan first, across --parallel-repos workers."""
+    from concurrent.futures import ThreadPoolExecutor
+    from contrib_check.org import Org
+    from contrib_check.journal import RunJournal
+    from contrib_check.schedule import estimate_cost, longest_first, predict_makespan
+    from contrib_check.shard import parse_shard, shard_of
+    from contrib_check.summary import SUMMARY_FILENAME, summarize_journal
+
+    org = Org(
+            org_name = args.org,
+            org_type = args.org_type,
+            only_repos = args.only_repos.split(',') if args.only_repos else None,
+            ignore_repos = args.ignore_repos.split(',') if args.ignore_repos else None,
+            skip_archived = args.skip_archived_repos,
+            load_repos = True,
+            retries = args.retries,
+            github_api = github_api
+            )
+
+    org_repos = org.repos
+    if args.shard:
+        shard_index, shard_count = parse_shard(args.shard)
+        org_repos = [ org_repo for org_repo in org_repos if shard_of(org_repo.name, shard_count) == shard_index ]
+        logging.getLogger().info("Shard %d/%d has %d of %d repos", shard_index, shard_count, len(org_repos), len(org.repos))
+
+    journal = RunJournal(args.journal or Path(args.output_dir) / RunJournal.default_filename, resume=args.resume)
+    unfinished = [ org_repo for org_repo in org_repos if not journal.is_complete(org_repo.html_url) ]
+    if len(unfinished) < len(org_repos):
+        logging.getLogger().info("Resuming; skipping %d repos already finished", len(org_repos) - len(unfinished))
+    org_repos = unfinished
+
+    previous_commit_counts = results_store.commit_counts() if results_store else {}
+    estimates = { org_repo.html_url: estimate_cost(org_repo.size, previous_commit_counts.get(org_repo.name)) for org_repo in org_repos }
+    org_repos = longest_first(org_repos, lambda org_repo: estimates[org_repo.html_url])
+    predicted = predict_makespan((estimates[org_repo.html_url] for org_repo in org_repos), args.parallel_repos)
+
+    remote = github_api if args.remote_scan else None
+    start_time = time.monotonic()
+    failures = []
+    try:
+        # org runs get one aggregated view across repos rather than a bar per repo
+        with OrgProgress(len(org_repos)) as progress, ThreadPoolExecutor(max_workers=args.parallel_repos) as executor:
+            futures = [ executor.submit(scan_org_repo, org_repo, estimates[org_repo.html_url], args, progress, results_store, journal, remote, workspace) for org_repo in org_repos ]
+            for org_repo, future in zip(org_repos, futures):
+                # a repo that can't be scanned is reported at the end rather than stopping the rest of the org
+                try:
+                    future.result()
+                except Exception as e:
+                    logging.getLogger().debug("Scanning repo %s failed", org_repo.name, exc_info=True)
+                    failures.append((org_repo, e))
+    finally:
+        journal.close()
+
+    # the journal includes repos finished by an earlier run being resumed, so the org summary covers them too
+    summarize_journal(journal.completed.values(), args.output_dir).write(Path(args.output_dir) / SUMMARY_FILENAME)
+
+    logging.getLogger().info(
+        "Scanned %d repos with %d workers; predicted makespan %.1f seconds, actual %.1f seconds",
+        len(org_repos), args.parallel_repos, predicted, time.monotonic() - start_time
     )
+    log_failures(failures, len(org_repos))
+    return failures
+
+def log_failures(failures: list, repo_count: int):
+    if not failures:
+        return
+    logging.getLogger().error("Failed to scan %d of %d repos ( rerun with --resume to retry just these ):", len(failures), repo_count)
+    for org_repo, e in failures:
+        logging.getLogger().error("  %s: %s: %s", org_repo.html_url, type(e).__name__, e)
+
+def scan_org_repo(org_repo, estimate: float, args, progress: OrgProgress, results_store, journal=None, github_api=None, workspace=None):
+    from git import GitCommandError
+    from contrib_check.repo import Repo
+    from contrib_check.retry import retry_call
+
+    start_time = time.monotonic()
+    # named as Repo.file_stem will name it, since the clone can fail before there's a Repo to ask
+    with repo_profiler(args, org_repo.name.replace('/', '-')) as profiler:
+        # clones fail on network trouble that often clears up, so they get retried; scans fail the same way every time
+        repo_obj = retry_call(
+            # the org view is the only bar shown, so don't draw clone bars over it
+            lambda: Repo(org_repo.html_url, clone_progress=False, clone_timeout=args.clone_timeout, remote=github_api, workspace=workspace, size=org_repo.size, name=org_repo.name),
+            attempts=args.retries + 1,
+            retry_on=(GitCommandError, TimeoutError),
+            description=f"Cloning repo {org_repo.name}"
+        )
+        if profiler:
+            profiler.name = Path(repo_obj.csv_filename).stem
+        scan_repo(repo_obj, args, progress, results_store)
+    elapsed = time.monotonic() - start_time
+    # scan_repo has renamed the repo's output into place by now, so it's safe to mark it done
+    if journal:
+        journal.record(
+            org_repo.html_url, name=org_repo.name, seconds=round(elapsed, 1),
+            commits=repo_obj.commit_count, errors=repo_obj.error_counts, summary=repo_obj.summary_file
+        )
+    logging.getLogger().info("Repo %s took %.1f seconds, estimated %.1f seconds", org_repo.name, elapsed, estimate)
+
+def repo_profiler(args, name: str):
+    """Returns a RepoProfiler writing files under name when --profile is given, else a context that does nothing."""
+    if not args.profile:
+        return nullcontext()
+    from contrib_check.profiling import RepoProfiler
+    return RepoProfiler(args.profile, args.output_dir, name, args.profile_top)
+
+def enabled_checks(args) -> dict:
+    """Returns the Repo.checks to run, as chosen on the command line."""
+    checks = {} if args.dco_skip else { 'dco': True }
+    for name in args.check or []:
+        checks[name] = True
+    if args.allowed_email_domains:
+        checks['email-domain'] = { 'domains': args.allowed_email_domains.split(',') }
+    return checks
 
-    repos = []
-    if args.org:
-        repos = Org(
-                org_name = args.org,
-                org_type = args.org_type,
-                only_repos = args.only_repos,
-                ignore_repos = args.ignore_repos,
-                skip_archived = args.skip_archived_repos,
-                load_repos = False
-                ).repos
-
-    if args.repo:
-        repos = [Repo(args.repo)]
-
-    for repo_obj in repos:
-        if not args.dco-skip:
-            logging.getLogger().info(f"Searching repo {repo_obj.name} for DCO signoffs")
-            repo_obj.load_past_signoffs(args.dco-signoff-dirs)
-            repo_obj.scan(since_date=args.dco-start-date,since_commit=args.dco-start-commit,output_dir=args.output_dir)
-
-    logging.getLogger().info("This took {} seconds".format(str(datetime.now() - start_time)))
+def scan_repo(repo_obj, args, progress: ScanProgress, results_store):
+    repo_obj.results_store = results_store
+    repo_obj.log_each_error = args.log_each_error
+    repo_obj.output_compression = args.output_compression
+    repo_obj.output_max_bytes = args.output_max_size
+    repo_obj.message_column = args.message_column
+    if repo_obj.remote:
+        repo_obj.remote.retries = args.retries
+    try:
+        repo_obj.checks = enabled_checks(args)
+        if repo_obj.checks:
+            logging.getLogger().info(f"Searching repo {repo_obj.name} for {', '.join(repo_obj.checks)} errors")
+            if 'dco' in repo_obj.checks:
+                repo_obj.load_past_signoffs(args.dco_signoff_dirs)
+            repo_obj.scan(since_date=args.dco_start_date,since_commit=args.dco_start_commit,output_dir=args.output_dir,progress=progress,jobs=args.jobs,timeout=args.scan_timeout,
+                         until_date=args.dco_end_date,authors=args.dco_author)
+    finally:
+        repo_obj.close()
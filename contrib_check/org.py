@@ -10,19 +10,33 @@ import socket
 import re
 import time
 import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from types import SimpleNamespace
+from typing import NamedTuple
 
-from github import Github, GithubException, RateLimitExceededException
-from .repo import Repo
+from .retry import backoff_delay
+
+class OrgRepo(NamedTuple):
+    """What the org listing tells us about a repo, before anything is cloned."""
+    name: str
+    html_url: str
+    # size as reported by the GitHub API ( or of the packfiles, for local repos ), in KB
+    size: int = 0
 
 class Org():
 
+    # threads listing directories at once when finding the repos of a local org
+    discovery_workers = 8
+
     def __init__(self,
             org_name: str,
             org_type: str = 'github',
             ignore_repos: list[str] | None = None,
             only_repos: list[str] | None = None,
             skip_archived: bool = True,
-            load_repos: bool = True
+            load_repos: bool = True,
+            retries: int = 3,
+            github_api = None
             ):
         self.ignore_repos = ignore_repos or []
         self.only_repos = only_repos or []
@@ -31,6 +45,10 @@ class Org():
         self.__org_name = ''
         self.__org_type = 'github'
         self.skip_archived = skip_archived
+        # how many more times listing the org's repos is tried after a rate limit, 502 or timeout
+        self.retries = retries
+        # the GitHubApi client shared with the rest of the run; one is made on first use if not given
+        self.github_api = github_api
 
         # Execute properties assignments to trigger setters validation
         self.org_type = org_type
@@ -45,6 +63,10 @@ class Org():
 
     @org_name.setter
     def org_name(self, org_name: str):
+        if self.org_type == 'local':
+            # a local org is the directory the repos are under
+            self.__org_name = org_name
+            return
         self.__org_name = re.sub(r'^http(s)*://(www\.)*github.com/', '', org_name)
 
     @property
@@ -67,39 +89,128 @@ class Org():
             return True
         if self.only_repos and gh_repo.name not in self.only_repos:
             return True
-        if self.skip_archived and gh_repo.archived:
+        if self.skip_archived and getattr(gh_repo, 'archived', False):
             return True
         return False
 
     def reload_repos(self):
         self.repos = []
 
+        if self.org_type == 'local':
+            self.repos = [ org_repo for org_repo in self._get_local_repos() if not self._should_skip_repo(org_repo) ]
+            return self.repos
+
         # Guard clause: Exit early if it's not a GitHub org type
         if self.org_type != 'github':
             return self.repos
 
-        try:
-            gh_repos = self._get_github_repos_for_org()
-            for gh_repo in gh_repos:
-                if self._should_skip_repo(gh_repo):
-                    continue
-                self.repos.append(Repo(gh_repo.html_url))
-                logging.getLogger().info(f"Adding repo {gh_repo.html_url}")
-
-        except RateLimitExceededException:
-            logging.getLogger().info("Sleeping until we get past the API rate limit....")
-            time.sleep(60)
-        except GithubException as e:
-            if e.status == 502:
+        # only GitHub orgs need the client, and requests with it
+        from .github_api import GitHubApiError, RateLimitError
+
+        for attempt in range(self.retries + 1):
+            # a failure can come partway through the pages, so every attempt lists the org from the start
+            self.repos = []
+            try:
+                gh_repos = self._get_github_repos_for_org()
+                for gh_repo in gh_repos:
+                    if self._should_skip_repo(gh_repo):
+                        continue
+                    self.repos.append(OrgRepo(gh_repo.name, gh_repo.html_url, gh_repo.size))
+                    logging.getLogger().info(f"Adding repo {gh_repo.html_url}")
+                return self.repos
+
+            except RateLimitError:
+                delay = 60
+                logging.getLogger().info("Sleeping until we get past the API rate limit....")
+            except GitHubApiError as e:
+                if e.status != 502:
+                    logging.getLogger().exception(e.data)
+                    break
+                delay = backoff_delay(attempt)
+                logging.getLogger().error("Server error - retrying...")
+            except (socket.timeout, ConnectionError):
+                delay = backoff_delay(attempt)
                 logging.getLogger().error("Server error - retrying...")
-            else:
-                logging.getLogger().exception(e.data)
-        except socket.timeout:
-            logging.getLogger().error("Server error - retrying...")
 
+            if attempt < self.retries:
+                time.sleep(delay)
+
+        logging.getLogger().error("Giving up loading repos for %s", self.org_name)
+        self.repos = []
         return self.repos
 
     def _get_github_repos_for_org(self):
-        g = Github(login_or_token=os.environ['GITHUB_TOKEN'], per_page=1000)
+        if not self.github_api:
+            from .github_api import GitHubApi
+            self.github_api = GitHubApi()
         logging.getLogger().info(f"Loading repos for {self.org_name}")
-        return g.get_organization(self.org_name).get_repos()
+        return ( SimpleNamespace(**gh_repo) for gh_repo in self.github_api.iter_pages(f"/orgs/{self.org_name}/repos") )
+
+    def _get_local_repos(self) -> list[OrgRepo]:
+        """Finds every git repo ( working copy or bare ) under the org_name directory, each named by its path under it
+        ( 'group/api' ), since repos in different directories can share a directory name.
+
+        Directories are listed by a pool of threads, each handing the subdirectories it finds back to the pool, so
+        deep or wide trees ( and slow network filesystems ) are walked in parallel.
+        """
+        if not os.path.isdir(self.org_name):
+            raise ValueError(f"{self.org_name} is not a directory")
+
+        root = os.path.abspath(self.org_name)
+        repos = []
+        with ThreadPoolExecutor(max_workers=self.discovery_workers) as executor:
+            pending = { executor.submit(_list_local_dir, self.org_name) }
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    org_repo, subdirs = future.result()
+                    if org_repo and org_repo.html_url != root:
+                        org_repo = org_repo._replace(name=os.path.relpath(org_repo.html_url, root).replace(os.sep, '/'))
+                    if org_repo:
+                        repos.append(org_repo)
+                        logging.getLogger().info(f"Adding repo {org_repo.html_url}")
+                    pending.update(executor.submit(_list_local_dir, subdir) for subdir in subdirs)
+
+        # the walk finishes in whatever order the threads do
+        repos = sorted(repos, key=lambda org_repo: org_repo.html_url)
+
+        # a repo's output files are named after it with '/' made '-' ( see Repo.file_stem ), so 'a-b/api' and
+        # 'a/b-api' would write over each other's
+        by_stem = {}
+        for org_repo in repos:
+            other = by_stem.setdefault(org_repo.name.replace('/', '-'), org_repo)
+            if other is not org_repo:
+                raise ValueError(f"Repos {other.name} and {org_repo.name} would write to the same output files; rename one of them")
+        return repos
+
+def _list_local_dir(path: str) -> tuple[OrgRepo | None, list[str]]:
+    """Returns the repo at path, if it is one, and the subdirectories still to be searched."""
+    try:
+        entries = list(os.scandir(path))
+    except OSError as e:
+        logging.getLogger().warning("Skipping %s: %s", path, e)
+        return None, []
+
+    names = { entry.name for entry in entries }
+    if '.git' in names:
+        git_dir = os.path.join(path, '.git')
+    elif { 'HEAD', 'objects', 'refs' } <= names:
+        # a bare repo is nothing but git internals, so there's nothing under it to search
+        return _local_org_repo(path, path), []
+    else:
+        git_dir = None
+
+    # a working copy can still have repos ( submodules, vendored checkouts ) under it, just never inside .git
+    subdirs = [ entry.path for entry in entries if entry.name != '.git' and entry.is_dir(follow_symlinks=False) ]
+    return (_local_org_repo(path, git_dir) if git_dir else None), subdirs
+
+def _local_org_repo(path: str, git_dir: str) -> OrgRepo:
+    # the packfiles are most of a repo's size, and summing them is far cheaper than asking git
+    size = 0
+    try:
+        with os.scandir(os.path.join(git_dir, 'objects', 'pack')) as entries:
+            size = sum(entry.stat().st_size for entry in entries if entry.name.endswith('.pack'))
+    except OSError:
+        pass
+    path = os.path.abspath(path)
+    return OrgRepo(os.path.basename(path), path, -(-size // 1024))
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+#
+# The CSV files a scan writes: how much of each commit message goes in them, whether they're compressed, and
+# splitting them into parts of a bounded size
+#
+
+from __future__ import annotations
+
+import csv
+import gzip
+import hashlib
+import io
+import logging
+import re
+from pathlib import Path
+from typing import IO, Callable
+
+from .results import ScanFailure
+
+# suffix added to the CSV filename for each compression
+COMPRESSION_SUFFIXES = { None: '', 'gzip': '.gz', 'zstd': '.zst' }
+MESSAGE_COLUMNS = ('full', 'first-line', 'hash')
+
+# 'org-repo.part2.csv.gz' is the second part of 'org-repo.csv.gz'
+_PART = re.compile(r"^(?P<stem>.*?)(?:\.part(?P<part>\d+))?(?P<suffix>\.csv(?:\.gz|\.zst)?)$")
+
+def format_message(message: str, column: str = 'full') -> str:
+    """Returns what goes in the message column: the whole message, its first line, or a hash of it and its length."""
+    if column == 'first-line':
+        return message.split('\n', 1)[0].strip()
+    if column == 'hash':
+        encoded = message.encode('utf-8', errors='surrogateescape')
+        return f"sha256:{hashlib.sha256(encoded).hexdigest()} ({len(encoded)} bytes)"
+    return message
+
+def zstd_available() -> bool:
+    try:
+        _zstd()
+        return True
+    except RuntimeError:
+        return False
+
+def _zstd():
+    try:
+        # in the standard library from Python 3.14
+        from compression import zstd
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        raise RuntimeError("zstd compression needs Python 3.14 or later, or the zstandard package installed") from None
+
+def open_text(path: str | Path, mode: str = 'r', compression: str | None = None) -> IO[str]:
+    """Opens path as CSV text for reading ( mode 'r' ) or writing ( mode 'w' ), compressed as compression says, or
+    when reading by default as its suffix says."""
+    if mode == 'r' and compression is None:
+        compression = next((name for name, suffix in COMPRESSION_SUFFIXES.items() if suffix and str(path).endswith(suffix)), None)
+    if compression == 'gzip':
+        return gzip.open(path, f"{mode}t", encoding='utf-8', newline='')
+    if compression == 'zstd':
+        return _zstd().open(path, f"{mode}t", encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+def split_part(filename: str) -> tuple[str, int]:
+    """Returns the name of the whole CSV output a part file belongs to, and its part number ( 1 for the first )."""
+    match = _PART.match(filename)
+    if not match:
+        return filename, 1
+    return match.group('stem') + match.group('suffix'), int(match.group('part') or 1)
+
+class CsvOutput():
+    """Writes failures as CSV rows to path, streamed through gzip or zstd if compression is given, with the message
+    column cut down to what message_column says.
+
+    Given max_bytes, once a part holds that many bytes of CSV the rest of the rows go in a new part
+    ( 'org-repo.part2.csv.gz' and so on ), so no single file grows without bound. The bytes are counted as they're
+    written, before compression, since compressors hold back output and the size on disk lags behind; a compressed
+    part is smaller on disk than max_bytes. open_path maps each file's real name to the name to write it under,
+    which is how Repo writes them as .partial files first.
+    """
+
+    def __init__(self, path: str | Path, compression: str | None = None, max_bytes: int | None = None, message_column: str = 'full', open_path: Callable[[Path], str] | None = None):
+        self.path = Path(f"{path}{COMPRESSION_SUFFIXES[compression]}")
+        self.compression = compression
+        self.max_bytes = max_bytes
+        self.message_column = message_column
+        self.open_path = open_path or str
+        self.files = []
+        self.__raw = None
+        self.__counter = None
+        self.__fh = None
+        self.__writer = None
+
+    def __open_part(self):
+        self.close()
+        path = self.path
+        if self.files:
+            suffix = ''.join(self.path.suffixes[-2:] if self.compression else self.path.suffixes[-1:])
+            path = self.path.with_name(f"{self.path.name[:-len(suffix)]}.part{len(self.files) + 1}{suffix}")
+        self.files.append(path)
+        logging.getLogger().debug("Creating %s", path)
+        self.__raw = open(self.open_path(path), 'wb')
+        if self.compression == 'gzip':
+            stream = gzip.GzipFile(filename='', mode='wb', fileobj=self.__raw)
+        elif self.compression == 'zstd':
+            zstd = _zstd()
+            stream = zstd.ZstdFile(self.__raw, mode='wb') if hasattr(zstd, 'ZstdFile') else zstd.ZstdCompressor().stream_writer(self.__raw, closefd=False)
+        else:
+            stream = self.__raw
+        self.__counter = _CountingStream(stream)
+        # write_through hands each row straight to the counter, so the count is exact after every row
+        self.__fh = io.TextIOWrapper(self.__counter, encoding='utf-8', newline='', write_through=True)
+        self.__writer = csv.writer(self.__fh, delimiter=',', quotechar='"', quoting=csv.QUOTE_ALL)
+
+    def write(self, failure: ScanFailure):
+        if not self.__writer:
+            self.__open_part()
+        elif self.max_bytes and self.__counter.count >= self.max_bytes:
+            self.__open_part()
+        if self.message_column != 'full':
+            failure = failure._replace(message=format_message(failure.message, self.message_column))
+        self.__writer.writerow(failure)
+
+    def close(self):
+        if self.__fh:
+            self.__fh.close()
+            self.__raw.close()
+            self.__raw = None
+            self.__counter = None
+            self.__fh = None
+            self.__writer = None
+
+class _CountingStream(io.BufferedIOBase):
+    """Passes writes on to stream, counting the bytes."""
+
+    def __init__(self, stream):
+        super().__init__()
+        self.stream = stream
+        self.count = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.stream.write(data)
+        self.count += len(data)
+        return len(data)
+
+    def flush(self):
+        self.stream.flush()
+
+    def close(self):
+        if not self.closed:
+            super().close()
+            self.stream.close()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+#
+# Per-repo CPU and memory profiles for --profile, so a slow or bloated repo in a nightly run can be diagnosed from
+# the run's output rather than by rerunning it under a profiler
+#
+
+from __future__ import annotations
+
+import cProfile
+import logging
+import os
+import pstats
+import threading
+import tracemalloc
+from pathlib import Path
+
+PROFILE_MODES = ('cpu', 'memory')
+
+# from Python 3.12 cProfile is built on sys.monitoring, so it sees every thread and only one can be enabled at once
+_cpu_lock = threading.Lock()
+
+# tracemalloc traces the whole process, so repos profiled at once share one trace, stopped when the last finishes
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_started_tracing = False
+
+class RepoProfiler():
+    """Profiles the work done within it ( a repo's clone, remediation load and scan ), writing the profile and a
+    summary of its top hotspots to output_dir on exit. They're written even when the work fails, as the repos most
+    worth profiling are the ones that time out.
+
+    'cpu' profiles with cProfile. From Python 3.12 that sees every thread of the process and can't be enabled twice
+    at once, so CPU profiles are taken one at a time: a second profiler waits in __enter__ until the first exits.
+    That's why --profile cpu can't be combined with --parallel-repos; the worker processes of --jobs aren't profiled.
+    'memory' traces allocations with tracemalloc, which sees the whole process, so with --parallel-repos a repo's
+    profile includes what the repos scanned alongside it allocated.
+    """
+
+    frames = 10
+
+    def __init__(self, mode: str, output_dir: str | os.PathLike, name: str, top: int = 20):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}'; the available modes are {', '.join(PROFILE_MODES)}")
+        self.mode = mode
+        self.output_dir = Path(output_dir)
+        # the name the files are written under; callers set it to the repo's output name once the repo is known
+        self.name = name
+        self.top = top
+        self.profile_file = None
+        self.summary_file = None
+        self.__profile = None
+        self.__start_snapshot = None
+
+    def __enter__(self) -> RepoProfiler:
+        if self.mode == 'cpu':
+            _cpu_lock.acquire()
+            try:
+                self.__profile = cProfile.Profile()
+                self.__profile.enable()
+            except BaseException:
+                _cpu_lock.release()
+                raise
+        else:
+            _start_tracing(self.frames)
+            tracemalloc.reset_peak()
+            self.__start_snapshot = tracemalloc.take_snapshot()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.mode == 'cpu':
+            self.__profile.disable()
+            _cpu_lock.release()
+            self.__write_cpu()
+        else:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            _stop_tracing()
+            self.__write_memory(snapshot, peak)
+        logging.getLogger().info("Wrote %s profile of repo %s to %s", self.mode, self.name, self.profile_file)
+
+    def __write_cpu(self):
+        self.profile_file = self.output_dir / f"{self.name}-profile.prof"
+        self.summary_file = self.output_dir / f"{self.name}-profile.txt"
+        self.__profile.dump_stats(self.profile_file)
+        with open(self.summary_file, 'w', encoding='utf-8') as fh:
+            fh.write(f"CPU profile of repo {self.name}; load {self.profile_file.name} with pstats or snakeviz for the rest\n\n")
+            stats = pstats.Stats(self.__profile, stream=fh).strip_dirs()
+            fh.write(f"Top {self.top} functions by time spent in the function itself:\n")
+            stats.sort_stats('tottime').print_stats(self.top)
+            fh.write(f"Top {self.top} functions by time spent in the function and what it called:\n")
+            stats.sort_stats('cumulative').print_stats(self.top)
+
+    def __write_memory(self, snapshot: tracemalloc.Snapshot, peak: int):
+        self.profile_file = self.output_dir / f"{self.name}-profile.tracemalloc"
+        self.summary_file = self.output_dir / f"{self.name}-profile.txt"
+        ignored = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ]
+        snapshot = snapshot.filter_traces(ignored)
+        snapshot.dump(str(self.profile_file))
+        growth = snapshot.compare_to(self.__start_snapshot.filter_traces(ignored), 'lineno')
+        retained = sum(stat.size_diff for stat in growth)
+        with open(self.summary_file, 'w', encoding='utf-8') as fh:
+            fh.write(f"Memory profile of repo {self.name}; load {self.profile_file.name} with tracemalloc.Snapshot.load() for the rest\n\n")
+            fh.write(f"Peak traced memory: {peak / 2**20:.1f} MiB\n")
+            fh.write(f"Still allocated at the end: {retained / 2**20:+.1f} MiB\n\n")
+            fh.write(f"Top {self.top} lines by memory allocated during the repo's run and still held at the end:\n")
+            for stat in growth[:self.top]:
+                fh.write(f"{stat}\n")
+
+def _start_tracing(frames: int):
+    global _tracing_users, _started_tracing
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            _started_tracing = True
+        _tracing_users += 1
+
+def _stop_tracing():
+    global _tracing_users, _started_tracing
+    with _tracing_lock:
+        _tracing_users -= 1
+        # tracing someone else started ( e.g. python -X tracemalloc ) is left running
+        if _tracing_users == 0 and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
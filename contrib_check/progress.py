@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+#
+# Progress reporting for clones and scans. Rendering is throttled by time and skipped entirely when stdout isn't a
+# TTY, so progress callbacks stay cheap on the hot paths that call them
+#
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+
+def progress_enabled(stream=None) -> bool:
+    """Progress bars are only worth rendering to an interactive terminal."""
+    stream = stream or sys.stdout
+    return hasattr(stream, 'isatty') and stream.isatty()
+
+class ThrottledBar():
+    """Wraps an alive_bar so it's redrawn at most once every min_interval seconds.
+
+    In manual mode update() takes the completed fraction; otherwise it takes an increment, which is accumulated
+    between redraws. text may be a callable, so it's only built when a redraw is due. When disabled, every call is
+    a no-op.
+    """
+
+    min_interval = 0.1
+
+    def __init__(self, title: str = '', total: int | None = None, manual: bool = False, enabled: bool | None = None):
+        self.title = title
+        self.total = total
+        self.manual = manual
+        self.enabled = progress_enabled() if enabled is None else enabled
+        self.__alive_bar_instance = None
+        self.__bar = None
+        self.__last_render = float('-inf')
+        self.__pending = 0
+        self.__value = 0.0
+        self.__text = None
+
+    def __enter__(self) -> ThrottledBar:
+        if self.enabled:
+            # only needed when something is shown, so don't pay for the import otherwise
+            from alive_progress import alive_bar
+
+            self.__alive_bar_instance = alive_bar(self.total, manual=self.manual, title=self.title)
+            self.__bar = self.__alive_bar_instance.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.__bar:
+            self.render()
+            self.__alive_bar_instance.__exit__(*exc_info)
+            self.__alive_bar_instance = None
+            self.__bar = None
+
+    def update(self, value: float = 1, text: str | None = None, force: bool = False):
+        if not self.__bar:
+            return
+        if self.manual:
+            self.__value = value
+        else:
+            self.__pending += value
+        if text is not None:
+            self.__text = text
+        if force or time.monotonic() - self.__last_render >= self.min_interval:
+            self.render()
+
+    def render(self):
+        if not self.__bar:
+            return
+        if self.manual:
+            self.__bar(self.__value)
+        elif self.__pending:
+            self.__bar(self.__pending)
+            self.__pending = 0
+        if self.__text is not None:
+            self.__bar.text(self.__text() if callable(self.__text) else self.__text)
+        self.__last_render = time.monotonic()
+
+class ScanProgress():
+    """Shows a bar per repo scan, sized from the number of commits to be scanned."""
+
+    def __init__(self, enabled: bool | None = None):
+        self.enabled = progress_enabled() if enabled is None else enabled
+
+    def __enter__(self) -> ScanProgress:
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def repo(self, name: str, total: int | None = None) -> ThrottledBar:
+        return ThrottledBar(title=f"Scanning {name}", total=total, enabled=self.enabled)
+
+class OrgProgress(ScanProgress):
+    """Aggregated view of an org run: one bar counting repos, with the commits scanned and repos in flight as text.
+
+    Safe to share between the threads scanning repos in parallel.
+    """
+
+    def __init__(self, total_repos: int, enabled: bool | None = None):
+        super().__init__(enabled)
+        self.commits_scanned = 0
+        self.active = []
+        self.__lock = threading.Lock()
+        self.__bar = ThrottledBar(title="Repos", total=total_repos, enabled=self.enabled)
+
+    def __enter__(self) -> OrgProgress:
+        self.__bar.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.__bar.__exit__(*exc_info)
+
+    def repo(self, name: str, total: int | None = None) -> _OrgRepoTask:
+        return _OrgRepoTask(self, name)
+
+    def _started(self, name: str):
+        with self.__lock:
+            self.active.append(name)
+            self.__bar.update(0, self.__text, force=True)
+
+    def _advance(self, count: int):
+        with self.__lock:
+            self.commits_scanned += count
+            self.__bar.update(0, self.__text)
+
+    def _finished(self, name: str):
+        with self.__lock:
+            self.active.remove(name)
+            self.__bar.update(1, self.__text, force=True)
+
+    def __text(self) -> str:
+        # called under the lock, from the bar's render()
+        return f"{self.commits_scanned} commits scanned | {', '.join(self.active)}"
+
+class _OrgRepoTask():
+    """Per-repo handle on an OrgProgress, with the same interface as ThrottledBar."""
+
+    def __init__(self, org_progress: OrgProgress, name: str):
+        self.org_progress = org_progress
+        self.name = name
+        self.enabled = org_progress.enabled
+
+    def __enter__(self) -> _OrgRepoTask:
+        self.org_progress._started(self.name)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.org_progress._finished(self.name)
+
+    def update(self, value: float = 1, text: str | None = None, force: bool = False):
+        if self.enabled:
+            self.org_progress._advance(value)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+#
+# Reads a GitHub repo's commit history and files through the API instead of a clone, for scans of a short window of
+# history where cloning would cost far more than the scan itself
+#
+
+from __future__ import annotations
+
+import base64
+import itertools
+import logging
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Iterator
+
+from .commit import CommitAuthor, CommitRecord
+from .retry import retry_call
+
+if TYPE_CHECKING:
+    # only wanted for annotations; requests isn't needed until a client is made
+    from .github_api import GitHubApi
+
+HISTORY_QUERY = """
+query($owner: String!, $name: String!, $first: Int!, $after: String, $since: GitTimestamp, $until: GitTimestamp) {
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          oid
+          history(first: $first, after: $after, since: $since, until: $until) {
+            totalCount
+            pageInfo { hasNextPage endCursor }
+            nodes {
+              oid
+              message
+              authoredDate
+              author { name email }
+              parents(first: 2) { nodes { oid } }
+              signature { isValid }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+class RemoteHistory():
+    """History and files of the default branch of one GitHub repo, read through the API.
+
+    The first page of history gives the head commit and the total number of commits; the rest of the pages are
+    then fetched concurrently, page_workers at a time, since a history cursor is just the head commit and an offset
+    into the walk. That '<oid> <offset>' format is GitHub's and isn't documented, so it's only relied on while the
+    cursors GitHub hands back look like it; otherwise, or once GitHub rejects one, the rest of the history is paged
+    through one page at a time by endCursor.
+    """
+
+    page_size = 100
+    # how many more times a request is tried after a rate limit, timeout or dropped connection
+    retries = 2
+
+    def __init__(self, api: GitHubApi, owner: str, name: str, page_workers: int = 4):
+        self.api = api
+        self.owner = owner
+        self.name = name
+        self.page_workers = page_workers
+        self.total = None
+
+    def iter_records(self, since: datetime | str | None = None, until: datetime | str | None = None) -> Iterator[CommitRecord]:
+        """Yields a CommitRecord for each commit on the default branch, newest first, in the optional date window."""
+        variables = { 'owner': self.owner, 'name': self.name, 'first': self.page_size, 'since': _timestamp(since), 'until': _timestamp(until) }
+        history, head = self.__history_page(variables)
+        if history is None:
+            self.total = 0
+            return
+        self.total = history['totalCount']
+        yield from self.__records(history)
+        if not history['pageInfo']['hasNextPage']:
+            return
+
+        end_cursor = history['pageInfo']['endCursor']
+        if end_cursor == f"{head} {self.page_size - 1}":
+            end_cursor = yield from self.__offset_pages(variables, head, end_cursor)
+        while end_cursor:
+            history, _ = self.__history_page({ **variables, 'after': end_cursor })
+            yield from self.__records(history)
+            end_cursor = history['pageInfo']['endCursor'] if history['pageInfo']['hasNextPage'] else None
+
+    def __offset_pages(self, variables: dict, head: str, end_cursor: str) -> Iterator[CommitRecord]:
+        """Yields the records of the pages after the first, fetched by offset with page_workers of them in flight.
+        Returns None once they're all read, or if GitHub rejects a cursor, the endCursor of the last page read."""
+        from .github_api import GitHubApiError, RateLimitError
+
+        # cursors are '<head oid> <offset of the last commit on the previous page>'
+        cursors = ( f"{head} {offset - 1}" for offset in range(self.page_size, self.total, self.page_size) )
+        executor = ThreadPoolExecutor(max_workers=self.page_workers)
+        in_flight = deque()
+        submit = lambda cursor: in_flight.append((cursor, executor.submit(self.__history_page, { **variables, 'after': cursor })))
+        try:
+            for cursor in itertools.islice(cursors, self.page_workers):
+                submit(cursor)
+            while in_flight:
+                cursor, future = in_flight.popleft()
+                try:
+                    history, _ = future.result()
+                except RateLimitError:
+                    # not the cursor's fault, and retried already
+                    raise
+                except GitHubApiError as e:
+                    logging.getLogger().warning("GitHub rejected history cursor '%s' of %s/%s, paging on one at a time: %s", cursor, self.owner, self.name, e)
+                    return end_cursor
+                for next_cursor in itertools.islice(cursors, 1):
+                    submit(next_cursor)
+                end_cursor = history['pageInfo']['endCursor']
+                yield from self.__records(history)
+            return None
+        finally:
+            # a caller that stops reading early ( at since_commit ) mustn't wait on pages it will never read
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def __request(self, func, description: str):
+        from .github_api import RateLimitError
+        return retry_call(func, attempts=self.retries + 1, retry_on=(RateLimitError, ConnectionError, TimeoutError), description=description)
+
+    def __history_page(self, variables: dict) -> tuple[dict | None, str | None]:
+        data = self.__request(lambda: self.api.graphql(HISTORY_QUERY, variables), f"Reading history of {self.owner}/{self.name}")
+        repository = data['repository']
+        target = repository and repository['defaultBranchRef'] and repository['defaultBranchRef']['target']
+        if not target:
+            return None, None
+        return target['history'], target['oid']
+
+    @staticmethod
+    def __records(history: dict) -> Iterator[CommitRecord]:
+        for node in history['nodes']:
+            author = node['author'] or {}
+            yield CommitRecord(
+                node['oid'],
+                node['message'],
+                CommitAuthor(author.get('name') or '', author.get('email') or ''),
+                datetime.fromisoformat(node['authoredDate']),
+                tuple(parent['oid'] for parent in node['parents']['nodes']),
+                node.get('signature') is not None
+            )
+
+    def read_file(self, path: str) -> bytes | None:
+        """Returns the contents of path on the default branch, or None if there is no such file."""
+        url = f"/repos/{self.owner}/{self.name}/contents/{path}"
+        contents = self.__request(lambda: self.api.get(url), f"Reading {url}")
+        if not isinstance(contents, dict) or contents.get('type') != 'file':
+            return None
+        return base64.b64decode(contents['content'])
+
+    def iter_files(self, directory: str) -> Iterator[tuple[str, bytes]]:
+        """Yields ( path, contents ) for every file under directory on the default branch, recursively."""
+        url = f"/repos/{self.owner}/{self.name}/contents/{directory}"
+        listing = self.__request(lambda: self.api.get(url), f"Reading {url}")
+        if not isinstance(listing, list):
+            return
+        for entry in listing:
+            if entry['type'] == 'file':
+                contents = self.read_file(entry['path'])
+                if contents is not None:
+                    yield entry['path'], contents
+            elif entry['type'] == 'dir':
+                yield from self.iter_files(entry['path'])
+
+def filter_records(records: list[CommitRecord], until: datetime | str | None = None, authors: list[str] | None = None) -> list[CommitRecord]:
+    """Drops merges, commits after until and commits by none of authors from records, as git's --no-merges,
+    --until and --author would for a clone; authors are regular expressions matched against 'Name <email>'."""
+    until = datetime.fromisoformat(_timestamp(until)) if until else None
+    patterns = [ re.compile(author) for author in authors or [] ]
+    return [
+        record for record in records
+        if len(record.parents) <= 1
+        and (until is None or record.authored_datetime <= until)
+        and (not patterns or any(pattern.search(f"{record.author.name} <{record.author.email}>") for pattern in patterns))
+    ]
+
+def _timestamp(value: datetime | str | None) -> str | None:
+    # GraphQL only takes ISO 8601 timestamps, not git's relative dates like '2 weeks ago'
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"Remote scans need an ISO 8601 date, not '{value}'")
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat()
@@ -12,37 +12,88 @@ from __future__ import annotations
 
 import os
 import tempfile
-import csv
 import re
-import shutil
 import logging
+import time
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 from pathlib import Path
+from typing import IO, Iterator
 
-from alive_progress import alive_bar
 import git
-from git import RemoteProgress
-
-from .commit import Commit
+from git.cmd import handle_process_output
+from git.remote import to_progress_instance
+from git.util import finalize_process
+
+from .blobs import GitBlobReader
+from .checks import CHECKS, Check, make_checks
+from .commit import Commit, CommitRecord
+from .identity import IdentityIndex
+from .output import CsvOutput
+from .progress import ScanProgress, progress_enabled
+from .remote import RemoteHistory, filter_records
+from .results import ResultSink, ScanFailure
+from .summary import ScanSummary
+
+# clones are announced on their own logger, which the CLI shows whatever its log level and the library leaves quiet
+CLONE_LOGGER = 'contrib_check.clone'
+
+class RepoTimeout(TimeoutError):
+    """A clone or scan ran past its time budget."""
 
 class Repo():
     # Class-level immutable defaults (Safe)
 
+    # the checks run by scan(), by registry name ( see checks.py ); True, a dict of options for the check, or False
     checks = { 'dco': True }
-    error_types = { 'dco': 'The commit did not have a DCO Signoff' }
 
-    def __init__(self, repo_path: str):
+    # commits handed to each check at once; a batch of records is all a serial scan holds in memory
+    check_batch_size = 100
+
+    # keep per-author and per-repo counts of the checks' outcomes, written next to the CSV as <name>-summary.json
+    summarize = True
+    # smallest slice of history worth handing to a worker process in a parallel scan
+    parallel_chunk_size = 5000
+    # how many commits a serial scan checks between looks at the clock when it has a time budget
+    timeout_check_interval = 1000
+
+    def __init__(self, repo_path: str, clone_progress: bool | None = None, clone_timeout: float | None = None, remote=None, workspace=None, size: int = 0, name: str | None = None):
+        """repo_path is a GitHub URL to clone ( or read through remote, a GitHubApi ) or the path of a local clone;
+        a clone goes in a directory from workspace, or a temporary one, and is removed by close()."""
         self.name = ''
         self.html_url = ''
+        self.checks = dict(self.checks)
+        self.error_types = { name: check_class.description for name, check_class in CHECKS.items() }
         self.past_signoffs = []
-        self.remediations = []
+        self.remediations = set()
+        self.remediation_config = None
+        # IdentityIndex of the .mailmap at HEAD, read when first needed
+        self.identities = None
         self.git_repo_object = None
+        self.remote = None
         self.prior_commits_dir = 'dco-signoffs'
-        self.remediation_commits_dir = 'remediation-commits'
+        # where remediation files are written; None means remediation-commits under output_dir
+        self.remediation_commits_dir = None
         self.output_dir = Path.cwd()
         self.csv_filename = "output.csv"
-        self.__csv_writer = None
+        # how the CSV output is written; see CsvOutput
+        self.output_compression = None
+        self.output_max_bytes = None
+        self.message_column = 'full'
+        self.results_store = None
+        self.__results_store_id = None
+        self.log_each_error = False
+        self.commit_count = 0
+        self.error_counts = {}
+        self.summary = None
+        # name of the summary file in output_dir, once a scan has written one
+        self.summary_file = None
+        self.__csv_output = None
+        self.__partial_files = {}
+        self.__blob_reader = None
         self.__fo = None
-        self.__csvfileref = None
 
         # Skip LFS files - we don't need to download them
         os.environ["GIT_LFS_SKIP_SMUDGE"] = "1"
@@ -52,71 +103,330 @@ class Repo():
         if url_search:
             self.html_url = repo_path
             self.name = url_search.group(2)
-            self.__fo = tempfile.TemporaryDirectory()
-            print(f"Cloning repo {self.html_url}")
-            self.git_repo_object = git.Repo.clone_from(
-                self.html_url, self.__fo.name, progress=GitRemoteProgress()
-            )
             self.csv_filename = f"{url_search.group(1)}-{self.name}.csv"
+            if remote:
+                self.remote = RemoteHistory(remote, url_search.group(1), self.name)
+                return
+            self.__fo = workspace.allocate(self.name, size * 1024) if workspace else tempfile.TemporaryDirectory()
+            logging.getLogger(CLONE_LOGGER).info(f"Cloning repo {self.html_url}")
+            try:
+                self.git_repo_object = clone_bare(self.html_url, self.__fo.name, GitRemoteProgress(clone_progress), clone_timeout)
+                # every scan walks the whole history at least once, so this pays for itself on the first walk
+                write_commit_graph(self.git_repo_object)
+                if workspace:
+                    self.__fo.measure()
+            except Exception:
+                # there's no Repo for the caller to close(), so don't leave the partial clone behind
+                self.__fo.cleanup()
+                self.__fo = None
+                raise
         # local clone
         elif os.path.isdir(repo_path):
-            self.name = os.path.basename(os.path.realpath(repo_path))
+            self.name = name or os.path.basename(os.path.realpath(repo_path))
             self.git_repo_object = git.Repo(repo_path)
-            self.csv_filename = f"{self.name}.csv"
-
-        self.load_remediation_commits()
+            self.csv_filename = f"{self.file_stem}.csv"
+
+    @property
+    def file_stem(self) -> str:
+        """The name flattened into something usable in a filename, 'group/api' becoming 'group-api'."""
+        return self.name.replace('/', '-')
+
+    def _make_commit(self, git_commit) -> Commit:
+        """Wraps a compact record of git_commit, so the GitPython object can be dropped as soon as this returns."""
+        if not isinstance(git_commit, CommitRecord):
+            git_commit = CommitRecord.from_git_commit(git_commit)
+        remediation_config = self.__get_remediation_config()
+        # only remediation commits are matched against the .mailmap, so don't read it for repos that allow none
+        identities = self.__get_identities() if remediation_config != (False, False) else None
+        return Commit(git_commit, self, remediation_config, identities)
+
+    def __get_remediation_config(self) -> tuple[bool, bool]:
+        # read from dco.yml once per repo, rather than once per commit
+        if self.remediation_config is None:
+            self.remediation_config = Commit.read_remediation_commit_config(self) or (False, False)
+        return self.remediation_config
+
+    def __get_identities(self) -> IdentityIndex:
+        # likewise .mailmap
+        if self.identities is None:
+            self.identities = IdentityIndex.read(self)
+        return self.identities
+
+    def load_remediation_commits(self, commits=None, rev: str = 'HEAD', timeout: float | None = None, **git_filters):
+        """Collects the commits named by remediation commits in commits ( GitPython commits or CommitRecords ), or
+        by default in the history of rev, narrowed by git_filters ( iter_commits() options such as since or author ).
+        A walk of rev still running after timeout seconds is killed and raises RepoTimeout."""
+        if commits is None:
+            if not self.git_repo_object:
+                return
+            if self.__get_remediation_config() == (False, False):
+                # nothing in the history can count as a remediation commit
+                return
+            # every remediation commit says 'hereby', so git can drop the rest before Python ever sees them, and what's
+            # left is few enough to list in one go, where a walk that hangs can be killed
+            hexshas = self.__rev_list(rev, timeout, no_merges=True, grep='hereby', regexp_ignore_case=True, **git_filters).split()
+            commits = ( self.git_repo_object.commit(hexsha) for hexsha in hexshas )
+        for commit in commits:
+            commit_obj = self._make_commit(commit)
+            if commit_obj.is_remediation_commit():
+                self.remediations.update(commit_obj.remediations)
 
-    def load_remediation_commits(self):
+    def read_blob(self, path: str) -> bytes | None:
+        """Returns the contents of path at HEAD from the object database, or None if it doesn't exist."""
+        if self.remote:
+            return self.remote.read_file(path)
         if not self.git_repo_object:
+            return None
+        return self.__get_blob_reader().read(path)
+
+    def __get_blob_reader(self) -> GitBlobReader:
+        if not self.__blob_reader:
+            self.__blob_reader = GitBlobReader(self.git_repo_object.git_dir)
+        return self.__blob_reader
+
+    def load_past_signoffs(self, signoff_dirs: str = 'dco-signoffs,dco_signoffs'):
+        """Loads the contents of every file in the comma delimited list of past signoff directories at HEAD."""
+        self.past_signoffs = []
+        if not self.git_repo_object and not self.remote:
+            return
+        for signoff_dir in signoff_dirs.split(','):
+            files = self.remote.iter_files(signoff_dir.strip()) if self.remote else self.__get_blob_reader().iter_files(signoff_dir.strip())
+            for path, contents in files:
+                logging.getLogger().debug("Loaded past signoffs from %s", path)
+                self.past_signoffs.append(contents)
+
+    def scan(self, since_date: datetime | str = None, since_commit: str = None, output_dir: Path | None = None, progress: ScanProgress | None = None, jobs: int = 1, timeout: float | None = None, until_date: datetime | str = None, authors: list[str] | None = None, sinks: list[ResultSink] | None = None):
+        """Checks every commit in the scan window as iter_scan() does, writing the failures to sinks, or to the CSV,
+        remediation and summary files."""
+        if not self.git_repo_object and not self.remote:
             return
-        for commit in self.git_repo_object.iter_commits():
-            commit_obj = Commit(commit, self)
-            if commit_obj.is_remediation_commit():
-                self.remediations.extend(commit_obj.remediations)
 
-    def scan(self, since_date: datetime | str = None, since_commit: str = None):
-        if not self.git_repo_object:
+        if output_dir:
+            self.output_dir = Path(output_dir)
+
+        for failure in self.iter_scan(since_date, since_commit, progress, jobs, timeout, until_date, authors):
+            if sinks is None:
+                self.write_error(failure)
+            for sink in sinks or []:
+                sink.write(failure)
+
+        if sinks is not None:
+            for sink in sinks:
+                sink.finish(self)
+        else:
+            if self.summary:
+                self.summary_file = f"{Path(self.csv_filename).stem}-summary.json"
+                self.summary.write(self.__partial_filename(self.output_dir / self.summary_file))
+            self.finalize_output()
+        self.log_summary(self.commit_count)
+
+    def iter_scan(self, since_date: datetime | str = None, since_commit: str = None, progress: ScanProgress | None = None, jobs: int = 1, timeout: float | None = None, until_date: datetime | str = None, authors: list[str] | None = None, head: str = 'HEAD') -> Iterator[ScanFailure]:
+        """Checks the history of head in the scan window, yielding a ScanFailure for each check a commit fails and
+        writing nothing to disk; raises RepoTimeout after timeout seconds."""
+        if not self.git_repo_object and not self.remote:
             return
 
-        rev = "HEAD"
+        deadline = time.monotonic() + timeout if timeout else None
+
+        rev = head
         kwargs = {}
 
         if since_commit:
-            rev = f"{since_commit}..HEAD"
+            rev = f"{since_commit}..{head}"
         elif since_date:
-            # If a datetime object is passed, convert it to ISO format string
-            if isinstance(since_date, datetime):
-                kwargs['since'] = since_date.isoformat()
+            kwargs['since'] = _git_date(since_date)
+
+        records = None
+        if self.remote:
+            # the window is fetched up front, since both the remediation and check passes need it
+            records = self.__remote_records(since_date, since_commit)
+            self.load_remediation_commits(records)
+            records = filter_records(records, until_date, authors)
+        else:
+            remediation_filters = dict(kwargs)
+            # a third party's remediation commit isn't by the author it remediates, so then every author is searched
+            if authors and not self.__get_remediation_config()[1]:
+                remediation_filters['author'] = authors
+            # a walk of the whole history, so it comes out of the time budget as well
+            self.__check_deadline(deadline)
+            self.load_remediation_commits(rev=rev, timeout=_remaining(deadline), **remediation_filters)
+
+        if self.results_store:
+            self.__results_store_id = self.results_store.start_repo(self.name, self.html_url)
+            for remediated_hash in self.remediations:
+                self.results_store.add_remediation(self.__results_store_id, remediated_hash)
+        self.error_counts = {}
+        self.commit_count = 0
+
+        kwargs['no_merges'] = True
+        if until_date:
+            kwargs['until'] = _git_date(until_date)
+        if authors:
+            kwargs['author'] = authors
+
+        checks = make_checks(self.checks)
+        for check in checks:
+            check.prepare(self)
+        self.summary = ScanSummary() if self.summarize else None
+
+        progress = progress or ScanProgress()
+        total = None
+        if records is not None:
+            total = len(records)
+        elif progress.enabled or jobs > 1:
+            # rev-list --count only walks the commit graph, so it's cheap next to the scan itself
+            self.__check_deadline(deadline)
+            total = int(self.__rev_list(rev, _remaining(deadline), count=True, **kwargs))
+
+        with progress.repo(self.name, total) as bar:
+            if records is not None:
+                failures = self.__scan_serial(records, checks, bar, deadline)
+            elif jobs > 1 and total > self.parallel_chunk_size:
+                failures = self.__scan_parallel(rev, kwargs, checks, jobs, total, bar, deadline)
             else:
-                kwargs['since'] = since_date
-
-        # Unpack kwargs into iter_commits (e.g., iter_commits(since="..."))
-        for commit in self.git_repo_object.iter_commits(rev, **kwargs):
-            commit_obj = Commit(commit, self)
-            if 'dco' in self.checks and not commit_obj.check_dco_signoff():
-                self.write_error(commit_obj, 'dco')
+                # leaving the scan early drops the generator, which kills the rev-list process behind it
+                failures = self.__scan_serial(self.git_repo_object.iter_commits(rev, **kwargs), checks, bar, deadline)
+            for record, error_types in failures:
+                for error_type in error_types:
+                    yield self.__record_failure(record, error_type)
+
+        if self.results_store:
+            self.results_store.finish_repo(self.__results_store_id, self.commit_count)
+
+    def __check_deadline(self, deadline: float | None):
+        if deadline and time.monotonic() > deadline:
+            raise RepoTimeout(f"Scan of repo {self.name} ran out of time")
+
+    def __rev_list(self, rev: str, timeout: float | None = None, **kwargs) -> str:
+        """Runs git rev-list, killing it and raising RepoTimeout if it's still running after timeout seconds."""
+        start_time = time.monotonic()
+        try:
+            return self.git_repo_object.git.rev_list(rev, kill_after_timeout=timeout, **kwargs)
+        except git.GitCommandError as e:
+            if timeout and time.monotonic() - start_time >= timeout:
+                raise RepoTimeout(f"Scan of repo {self.name} ran out of time") from e
+            raise
+
+    def __remote_records(self, since_date: datetime | str | None, since_commit: str | None) -> list[CommitRecord]:
+        records = []
+        remote_records = self.remote.iter_records(since=since_date)
+        for record in remote_records:
+            if since_commit and record.hexsha.startswith(since_commit):
+                break
+            records.append(record)
+        # stops the pages still being fetched ahead of the one read last
+        remote_records.close()
+        return records
+
+    def __scan_serial(self, commits, checks: list[Check], bar, deadline: float | None = None) -> Iterator[tuple[CommitRecord, list[str]]]:
+        batch = []
+        # Commits are streamed a batch at a time and nothing is kept once the verdicts are handed on, so memory use
+        # doesn't grow with the length of the history
+        for commit in commits:
+            self.commit_count += 1
+            if self.commit_count % self.timeout_check_interval == 0:
+                self.__check_deadline(deadline)
+            record = commit if isinstance(commit, CommitRecord) else CommitRecord.from_git_commit(commit)
+            if self.results_store:
+                self.results_store.add_commit(
+                    self.__results_store_id, record.hexsha, record.author.name, record.author.email, record.authored_datetime
+                )
+            batch.append(record)
+            if len(batch) >= self.check_batch_size:
+                failures = _check_batch(batch, checks, self.summary, self.name)
+                bar.update(len(batch))
+                batch = []
+                yield from failures
+        if batch:
+            failures = _check_batch(batch, checks, self.summary, self.name)
+            bar.update(len(batch))
+            yield from failures
+
+    def __scan_parallel(self, rev: str, kwargs: dict, checks: list[Check], jobs: int, total: int, bar, deadline: float | None = None) -> Iterator[tuple[CommitRecord, list[str]]]:
+        # a few chunks per worker so an expensive stretch of history doesn't leave the others idle
+        chunk_size = max(self.parallel_chunk_size, -(-total // (jobs * 4)))
+        pending = deque()
+        with ProcessPoolExecutor(
+                max_workers=jobs,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_scan_worker,
+                initargs=(self.git_repo_object.git_dir, self.name, self.past_signoffs, self.remediations, checks, self.check_batch_size, self.summary is not None)
+                ) as executor:
+            rev_list = self.git_repo_object.git.rev_list(rev, as_process=True, **kwargs)
+            try:
+                for chunk in _iter_chunks(rev_list.proc.stdout, chunk_size):
+                    self.__check_deadline(deadline)
+                    pending.append(executor.submit(_scan_chunk, chunk, self.results_store is not None))
+                    # bound what's in flight, and collect results in submission order so output is deterministic
+                    if len(pending) >= jobs * 2:
+                        yield from self.__collect_chunk(pending.popleft().result(), bar)
+                rev_list.wait()
+                while pending:
+                    self.__check_deadline(deadline)
+                    yield from self.__collect_chunk(pending.popleft().result(), bar)
+            except (RepoTimeout, GeneratorExit):
+                # only the chunks already running are waited for on the way out
+                for future in pending:
+                    future.cancel()
+                raise
+
+    def __collect_chunk(self, chunk_result: tuple[int, list, list, ScanSummary | None], bar) -> list[tuple[CommitRecord, list[str]]]:
+        chunk_count, commits, failures, summary = chunk_result
+        for row in commits:
+            self.results_store.add_commit(self.__results_store_id, *row)
+        if summary:
+            self.summary.merge(summary)
+        self.commit_count += chunk_count
+        bar.update(chunk_count)
+        return failures
+
+    def log_summary(self, commit_count: int):
+        for error_type, count in self.error_counts.items():
+            logging.getLogger().error("Found %d commits with error '%s' out of %d scanned in repo %s", count, error_type, commit_count, self.name)
+        if not self.error_counts:
+            logging.getLogger().info("Found no errors in %d commits scanned in repo %s", commit_count, self.name)
+
+    def __partial_filename(self, filename: str | Path) -> str:
+        """Output is written under a temporary name until finalize_output(), so a crash never leaves a truncated file
+        behind under the real name."""
+        partial = f"{filename}.partial"
+        self.__partial_files[str(filename)] = partial
+        return partial
+
+    def finalize_output(self):
+        """Moves everything written by this scan into place under its real name."""
+        if self.__csv_output:
+            self.__csv_output.close()
+            self.__csv_output = None
+        for filename, partial in self.__partial_files.items():
+            os.replace(partial, filename)
+        self.__partial_files = {}
+
+    def __discard_output(self):
+        for partial in self.__partial_files.values():
+            if os.path.isfile(partial):
+                os.remove(partial)
+        self.__partial_files = {}
 
     def __open_csvfile(self):
         # Safely clear out any old references first
-        if self.__csvfileref:
-            self.__csvfileref.close()
-        csvfile = self.output_dir / self.csv_filename
-        if os.path.isfile(csvfile):
-            os.remove(csvfile)
-
-        # We keep this reference open because write_error needs continuous access
-        self.__csvfileref = open(csvfile, mode='w', encoding='utf-8', newline='')
-        logging.getLogger().debug(f"Creating {csvfile}")
-        logging.getLogger().debug(f"Full filename is {os.path.abspath(self.__csvfileref.name)}")
-        self.__csv_writer = csv.writer(
-            self.__csvfileref, delimiter=',', quotechar='"', quoting=csv.QUOTE_ALL
+        if self.__csv_output:
+            self.__csv_output.close()
+        # We keep this open because write_error needs continuous access
+        self.__csv_output = CsvOutput(
+            self.output_dir / self.csv_filename, self.output_compression, self.output_max_bytes, self.message_column,
+            self.__partial_filename
         )
 
     def close(self):
-        """Explicit cleanup method to ensure resources drain properly."""
-        if self.__csvfileref:
-            self.__csvfileref.close()
-            self.__csvfileref = None
+        """Explicit cleanup method to ensure resources drain properly; output not yet finalized is discarded."""
+        if self.__csv_output:
+            self.__csv_output.close()
+            self.__csv_output = None
+        self.__discard_output()
+        if self.__blob_reader:
+            self.__blob_reader.close()
+            self.__blob_reader = None
         if self.__fo:
             self.__fo.cleanup()
             self.__fo = None
@@ -125,40 +435,167 @@ class Repo():
         # Fallback safety net
         self.close()
 
-    def write_error(self, commit: Commit, error_type: str):
-        logging.getLogger().error(f"Found error '{error_type}' in commit {commit.git_commit_object.hexsha}")
-        if not self.__csv_writer:
+    def __record_failure(self, record: CommitRecord, error_type: str) -> ScanFailure:
+        """Counts, logs and stores a failure found by the scan, returning it as a ScanFailure."""
+        self.error_counts[error_type] = self.error_counts.get(error_type, 0) + 1
+        # one line per failing commit is a lot of log I/O on big repos, so by default only scan() logs a summary
+        if self.log_each_error:
+            logging.getLogger().error("Found error '%s' in commit %s", error_type, record.hexsha)
+        elif logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.getLogger().debug("Found error '%s' in commit %s", error_type, record.hexsha)
+
+        if self.results_store:
+            self.results_store.add_failure(self.__results_store_id, record.hexsha, record.author.name, record.author.email, error_type)
+
+        return ScanFailure(
+            self.name, record.hexsha, record.message, record.author.name, record.author.email,
+            record.authored_datetime, error_type, self.error_types[error_type]
+        )
+
+    def write_error(self, failure: ScanFailure):
+        """Writes a failure to the CSV output, and a dco failure to its author's remediation file too."""
+        if not self.__csv_output:
             self.__open_csvfile()
 
-        self.__csv_writer.writerow([
-            self.name,
-            commit.git_commit_object.hexsha,
-            commit.git_commit_object.message,
-            commit.git_commit_object.author.name,
-            commit.git_commit_object.author.email,
-            commit.git_commit_object.authored_datetime,
-            error_type,
-            self.error_types[error_type]
-        ])
+        self.__csv_output.write(failure)
 
-        if error_type == 'dco':
-            self.write_individual_remediation_commit(commit)
+        if failure.error_type == 'dco':
+            self.write_individual_remediation_commit(failure)
 
-    def write_individual_remediation_commit(self, commit):
-        os.makedirs(self.remediation_commits_dir, exist_ok=True)
+    def write_individual_remediation_commit(self, failure: ScanFailure):
+        remediation_commits_dir = self.remediation_commits_dir or self.output_dir / 'remediation-commits'
+        os.makedirs(remediation_commits_dir, exist_ok=True)
 
+        # one file per person, under the name and email the .mailmap gives them, whichever they committed as
+        author_name, author_email = self.__get_identities().canonical(failure.author_name, failure.author_email)
         remediationfilename = os.path.join(
-            self.remediation_commits_dir, f"{self.name}-{commit.git_commit_object.author.name}.txt"
+            remediation_commits_dir, f"{self.file_stem}-{author_name}.txt"
         )
-        short_hash = self.git_repo_object.git.rev_parse(commit.git_commit_object.hexsha, short="7")
+        if self.remote:
+            # without the object database there's no way to check what's unambiguous, so use git's default length
+            short_hash = failure.hexsha[:7]
+        else:
+            short_hash = self.git_repo_object.git.rev_parse(failure.hexsha, short="7")
 
-        mode = 'a' if os.path.isfile(remediationfilename) else 'w+'
+        # each scan starts the file afresh, then appends to it for every further commit by the same author
+        mode = 'a' if remediationfilename in self.__partial_files else 'w+'
 
-        with open(remediationfilename, mode=mode, encoding='utf-8') as fh:
+        with open(self.__partial_filename(remediationfilename), mode=mode, encoding='utf-8') as fh:
             if mode == 'w+':
-                fh.write(f"DCO Remediation Commit for {commit.git_commit_object.author.name} <{commit.git_commit_object.author.email}>\n\n")
-            fh.write(f"I, {commit.git_commit_object.author.name} <{commit.git_commit_object.author.email}>, hereby add my Signed-off-by to this commit: {short_hash}\n")
-
+                fh.write(f"DCO Remediation Commit for {author_name} <{author_email}>\n\n")
+            fh.write(f"I, {author_name} <{author_email}>, hereby add my Signed-off-by to this commit: {short_hash}\n")
+
+
+def _check_batch(records: list[CommitRecord], checks: list[Check], summary: ScanSummary | None = None, repo_name: str = '') -> list[tuple[CommitRecord, list[str]]]:
+    """Runs every check over records, returning ( record, names of the checks it failed ) for each failing record,
+    in order. Given a summary, the checks' outcomes for every record are counted in it as well."""
+    if summary is None:
+        verdicts = [ (check.name, check.check(records)) for check in checks ]
+    else:
+        outcomes = { check.name: check.outcomes(records) for check in checks }
+        verdicts = [ (check.name, [ outcome not in check.failing_outcomes for outcome in outcomes[check.name] ]) for check in checks ]
+    failures = []
+    failed = [False] * len(records)
+    for index, record in enumerate(records):
+        failed_checks = [ name for name, passed in verdicts if not passed[index] ]
+        if failed_checks:
+            failures.append((record, failed_checks))
+            failed[index] = True
+    if summary is not None:
+        summary.add(repo_name, records, outcomes, failed)
+    return failures
+
+class _ScanWorkerRepo():
+    """Stands in for Repo inside a parallel scan worker, with what the checks' prepare() needs from it."""
+
+    def __init__(self, git_dir: str, past_signoffs: list[bytes], remediations: set[str]):
+        self.git_repo_object = git.Repo(git_dir)
+        self.past_signoffs = past_signoffs
+        self.remediations = remediations
+
+_scan_worker_state = {}
+
+def _init_scan_worker(git_dir: str, name: str, past_signoffs: list[bytes], remediations: set[str], checks: list[Check], batch_size: int, summarize: bool):
+    repo = _ScanWorkerRepo(git_dir, past_signoffs, remediations)
+    for check in checks:
+        check.prepare(repo)
+    _scan_worker_state['repo'] = repo
+    _scan_worker_state['name'] = name
+    _scan_worker_state['checks'] = checks
+    _scan_worker_state['batch_size'] = batch_size
+    _scan_worker_state['summarize'] = summarize
+
+def _scan_chunk(shas: list[str], collect_commits: bool) -> tuple[int, list, list, ScanSummary | None]:
+    """Checks a chunk of commits, returning ( count, commit rows, failures as _check_batch() returns them, summary
+    of the chunk if the scan keeps one )."""
+    repo = _scan_worker_state['repo']
+    batch_size = _scan_worker_state['batch_size']
+    summary = ScanSummary() if _scan_worker_state['summarize'] else None
+    commits = []
+    failures = []
+    for start in range(0, len(shas), batch_size):
+        records = [ CommitRecord.from_git_commit(git.Commit(repo.git_repo_object, bytes.fromhex(sha))) for sha in shas[start:start + batch_size] ]
+        if collect_commits:
+            commits.extend((record.hexsha, record.author.name, record.author.email, record.authored_datetime) for record in records)
+        failures.extend(_check_batch(records, _scan_worker_state['checks'], summary, _scan_worker_state['name']))
+    return len(shas), commits, failures, summary
+
+def clone_bare(url: str, path: str, progress: git.RemoteProgress | None = None, timeout: float | None = None, **git_options) -> git.Repo:
+    """Does what git.Repo.clone_from(url, path, bare=True) does, except that a clone still running after timeout
+    seconds is killed ( along with the processes it started ) and raises RepoTimeout.
+
+    Config and signoff files are read from the object database, so there's no need to write out a worktree.
+    """
+    # clone_from has no time limit, so this runs the clone process the same way but drains it with one
+    proc = git.Git().clone(
+        '--', url, path, bare=True, v=True, progress=True, with_extended_output=True, as_process=True,
+        universal_newlines=True, **git_options
+    )
+    start_time = time.monotonic()
+    try:
+        handle_process_output(
+            proc, None, to_progress_instance(progress).new_message_handler(), finalize_process,
+            decode_streams=False, kill_after_timeout=timeout
+        )
+    except git.GitCommandError as e:
+        if timeout and time.monotonic() - start_time >= timeout:
+            raise RepoTimeout(f"Clone of {url} didn't finish within {timeout} seconds") from e
+        raise
+    return git.Repo(path)
+
+def write_commit_graph(git_repo: git.Repo, multi_pack_index: bool = False):
+    """Writes a commit-graph of every commit reachable in git_repo, and with multi_pack_index a multi-pack-index
+    of its packs, so git walks history from the parents and generation numbers in the graph rather than parsing
+    each commit out of the packs, and can stop a walk like since_commit..HEAD early.
+
+    The graph is written split, so writing it again after a fetch only adds the commits that came with the fetch.
+    A git too old to write either just walks history the slow way, so failing to write them is only logged.
+    """
+    try:
+        git_repo.git.commit_graph('write', '--reachable', '--split')
+        # with a single pack ( or none, as a local clone hard links loose objects ) there's nothing to gain from one
+        pack_dir = os.path.join(git_repo.git_dir, 'objects', 'pack')
+        if multi_pack_index and os.path.isdir(pack_dir) and sum(name.endswith('.pack') for name in os.listdir(pack_dir)) > 1:
+            git_repo.git.multi_pack_index('write')
+    except git.GitCommandError as e:
+        logging.getLogger().warning("Couldn't write a commit-graph for %s: %s", git_repo.git_dir, e)
+
+def _remaining(deadline: float | None) -> float | None:
+    return max(deadline - time.monotonic(), 0) if deadline else None
+
+def _git_date(value: datetime | str) -> str:
+    # git takes ISO dates as well as relative ones like '2 weeks ago'
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _iter_chunks(stream: IO[bytes], chunk_size: int) -> Iterator[list[str]]:
+    chunk = []
+    for line in stream:
+        chunk.append(line.strip().decode())
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 
 class GitRemoteProgress(git.RemoteProgress):
     OP_CODES = [
@@ -169,10 +606,15 @@ class GitRemoteProgress(git.RemoteProgress):
         getattr(git.RemoteProgress, _op_code): _op_code for _op_code in OP_CODES
     }
 
-    def __init__(self) -> None:
+    # Git sends progress callbacks far faster than a terminal can usefully show them
+    min_interval = 0.1
+
+    def __init__(self, enabled: bool | None = None) -> None:
         super().__init__()
         self.alive_bar_instance = None
         self.bar = None
+        self.enabled = progress_enabled() if enabled is None else enabled
+        self._last_render = float('-inf')
 
     @classmethod
     def get_curr_op(cls, op_code: int) -> str:
@@ -186,21 +628,29 @@ class GitRemoteProgress(git.RemoteProgress):
         max_count: str | float | None = None,
         message: str | None = "",
     ) -> None:
-        cur_count = float(cur_count)
-        max_count = float(max_count) if max_count is not None else 100.0
-
         if op_code & self.BEGIN:
             self.curr_op = self.get_curr_op(op_code)
             self._dispatch_bar(title=self.curr_op)
 
         if self.bar:
-            self.bar(cur_count / max_count)
-            self.bar.text(str(message or ""))
+            now = time.monotonic()
+            if op_code & git.RemoteProgress.END or now - self._last_render >= self.min_interval:
+                cur_count = float(cur_count)
+                max_count = float(max_count) if max_count is not None else 100.0
+                self.bar(cur_count / max_count)
+                self.bar.text(str(message or ""))
+                self._last_render = now
 
         if op_code & git.RemoteProgress.END:
             self._destroy_bar()
 
     def _dispatch_bar(self, title: str | None = "") -> None:
+        if not self.enabled:
+            return
+
+        # only needed when cloning, so don't pay for the import otherwise
+        from alive_progress import alive_bar
+
         self.alive_bar_instance = alive_bar(manual=True, title=title)
         self.bar = self.alive_bar_instance.__enter__()
 
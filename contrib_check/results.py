@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+#
+# What a scan finds, as typed records, and the sinks they can be handed to in place of the output files
+#
+
+from __future__ import annotations
+
+import csv
+from datetime import datetime
+from typing import IO, NamedTuple
+
+class ScanFailure(NamedTuple):
+    """A commit that failed a check. A commit failing several checks is reported once for each.
+
+    The fields are in the order of the columns of the CSV output, so tuple(failure) is its CSV row.
+    """
+    repo: str
+    hexsha: str
+    message: str
+    author_name: str
+    author_email: str
+    authored_datetime: datetime | str
+    error_type: str
+    description: str
+
+class ResultSink():
+    """Receives a scan's failures as they're found, for Repo.scan(sinks=...). Subclass it, or pass any object with
+    the same methods."""
+
+    def write(self, failure: ScanFailure) -> None:
+        raise NotImplementedError
+
+    def finish(self, repo) -> None:
+        """Called once the scan of repo is complete ( not if it failed or timed out ); repo.commit_count,
+        repo.error_counts and repo.summary hold its totals by then."""
+
+class CsvSink(ResultSink):
+    """Writes failures as rows of the CSV output to an open text file ( e.g. sys.stdout ), which is left open, with
+    the message column as message_column says ( see output.format_message() )."""
+
+    def __init__(self, fh: IO[str], message_column: str = 'full'):
+        self.writer = csv.writer(fh, delimiter=',', quotechar='"', quoting=csv.QUOTE_ALL)
+        self.message_column = message_column
+
+    def write(self, failure: ScanFailure) -> None:
+        if self.message_column != 'full':
+            from .output import format_message
+            failure = failure._replace(message=format_message(failure.message, self.message_column))
+        self.writer.writerow(failure)
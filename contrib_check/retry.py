@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+#
+# Exponential backoff for the calls that fail transiently ( clones, GitHub API requests ), so a flaky network
+# costs a few retries instead of a repo or the whole run
+#
+
+from __future__ import annotations
+
+import logging
+import random
+import time
+from typing import Callable, TypeVar
+
+T = TypeVar('T')
+
+def backoff_delay(attempt: int, base_delay: float = 1.0, max_delay: float = 60.0) -> float:
+    """Seconds to wait before retry number attempt ( counting from 0 ).
+
+    The delay doubles with each attempt up to max_delay, and is jittered into its upper half so workers that
+    failed together don't all retry at the same moment.
+    """
+    delay = min(base_delay * 2 ** attempt, max_delay)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+def retry_call(
+        func: Callable[[], T],
+        attempts: int = 3,
+        retry_on: tuple[type[BaseException], ...] = (Exception,),
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        description: str = 'Call'
+        ) -> T:
+    """Returns func(), calling it up to attempts times while it raises one of retry_on; the last failure is raised."""
+    for attempt in range(attempts):
+        try:
+            return func()
+        except retry_on as e:
+            if attempt + 1 >= attempts:
+                raise
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            logging.getLogger().warning(
+                "%s failed ( %s ); retrying in %.1f seconds ( attempt %d of %d )",
+                description, e, delay, attempt + 2, attempts
+            )
+            time.sleep(delay)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+#
+# Cost estimates and longest-job-first ordering for org scans, so the biggest repos start first instead of
+# stretching the run when they happen to come last in API order
+#
+
+from __future__ import annotations
+
+import heapq
+from typing import Callable, Iterable, TypeVar
+
+T = TypeVar('T')
+
+# Rough scan rates used to turn what we know about a repo into seconds; only their ratio matters for ordering
+SECONDS_PER_COMMIT = 0.0005
+SECONDS_PER_KB = 0.00005
+# Clone and setup cost every repo pays, however small
+SECONDS_PER_REPO = 1.0
+
+def estimate_cost(size_kb: int | None = None, commit_count: int | None = None) -> float:
+    """Estimates how long a repo takes to scan, in seconds.
+
+    The commit count stored from a previous run is the better predictor of scan time, so it's preferred; the
+    API's size field ( in KB ) is the fallback for repos we haven't scanned before.
+    """
+    if commit_count:
+        return SECONDS_PER_REPO + commit_count * SECONDS_PER_COMMIT
+    if size_kb:
+        return SECONDS_PER_REPO + size_kb * SECONDS_PER_KB
+    return SECONDS_PER_REPO
+
+def longest_first(items: Iterable[T], cost: Callable[[T], float]) -> list[T]:
+    """Orders items by descending cost; stable, so equal costs keep their original order."""
+    return sorted(items, key=cost, reverse=True)
+
+def predict_makespan(costs: Iterable[float], workers: int) -> float:
+    """Wall time for running jobs with the given costs, in order, on workers that each take the next job when free."""
+    finish_times = [0.0] * max(workers, 1)
+    for cost in costs:
+        heapq.heapreplace(finish_times, finish_times[0] + cost)
+    return max(finish_times)
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+#
+# `contrib-check serve`: a long-running process that keeps repos cloned, with their dco.yml, past signoffs and
+# remediation index loaded, and checks just the commits of each push it's told about
+#
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from git import GitCommandError
+
+from .progress import ScanProgress
+from .repo import Repo, write_commit_graph
+
+NULL_SHA = '0' * 40
+
+class _WarmRepo():
+    """A repo kept ready between pushes, and the HEAD its config and signoffs were loaded from."""
+
+    def __init__(self):
+        self.repo = None
+        self.head = None
+        # one push at a time per repo; pushes to different repos are checked at once
+        self.lock = threading.Lock()
+
+class ScanService():
+    """Checks pushes to repos, keeping each repo warm from one push to the next.
+
+    A repo is cloned ( or opened, for a local path ) the first time a push to it arrives, or by warm(), and its
+    dco.yml, past signoffs and remediation commits are loaded then. After that a push costs a fetch, when the pushed
+    commit isn't already there, and a scan of only the commits it added, whose remediation commits are added to
+    the index. The config and signoffs are loaded again only when a push changes them on the default branch.
+    """
+
+    def __init__(self, checks: dict, signoff_dirs: str = 'dco-signoffs,dco_signoffs', clone_timeout: float | None = None):
+        self.checks = dict(checks)
+        self.signoff_dirs = signoff_dirs
+        self.clone_timeout = clone_timeout
+        self.pushes = 0
+        self.__repos = {}
+        self.__lock = threading.Lock()
+
+    def warm(self, repo_path: str) -> _WarmRepo:
+        """Returns the warm state of the repo at repo_path ( a GitHub URL or local path ), loading it if need be."""
+        with self.__lock:
+            warm = self.__repos.setdefault(repo_path, _WarmRepo())
+        # loading one repo, which may mean cloning it, doesn't hold up pushes to the others
+        with warm.lock:
+            if warm.repo is None:
+                repo = Repo(repo_path, clone_progress=False, clone_timeout=self.clone_timeout)
+                if not repo.git_repo_object:
+                    repo.close()
+                    raise ValueError(f"{repo_path} is neither a GitHub URL nor the path of a git repo")
+                repo.checks = dict(self.checks)
+                self.__load(repo)
+                warm.repo = repo
+                warm.head = repo.git_repo_object.head.commit.hexsha
+                logging.getLogger().info("Loaded repo %s with %d remediated commits", repo.name, len(repo.remediations))
+        return warm
+
+    def __load(self, repo: Repo):
+        repo.remediation_config = None
+        repo.identities = None
+        repo.remediations = set()
+        if repo.checks.get('dco'):
+            repo.load_past_signoffs(self.signoff_dirs)
+        repo.load_remediation_commits()
+
+    def push(self, repo_path: str, before: str, after: str) -> dict:
+        """Checks the commits a push of after over before added to the repo at repo_path, returning what was found.
+
+        before is all zeros for a new branch, whose commits that aren't on the default branch are checked; a before
+        that isn't in the repo means every commit in after's history is checked. after is all zeros for a deleted
+        branch, which has nothing to check. Raises ValueError if after can't be found.
+        """
+        start_time = time.perf_counter()
+        result = { 'repo': repo_path, 'before': before, 'after': after, 'commits': 0, 'errors': {}, 'failures': [] }
+        if after == NULL_SHA:
+            return result
+
+        warm = self.warm(repo_path)
+        with warm.lock:
+            repo = warm.repo
+            if not self.__has_commit(repo, after) and repo.html_url:
+                repo.git_repo_object.git.fetch('origin', '+refs/heads/*:refs/heads/*', prune=True)
+                # each fetch adds a pack, so index them together along with the new commits
+                write_commit_graph(repo.git_repo_object, multi_pack_index=True)
+            if not self.__has_commit(repo, after):
+                raise ValueError(f"Commit {after} isn't in {repo_path}")
+            self.__refresh(warm)
+
+            if before == NULL_SHA:
+                # a new branch is checked from the default branch
+                since_commit = 'HEAD'
+            elif self.__has_commit(repo, before):
+                since_commit = before
+            else:
+                # force pushed over history never seen here, or fetched shallow; from HEAD would miss a push to the
+                # default branch entirely, since HEAD is then after
+                logging.getLogger().warning("Commit %s isn't in %s; checking all of %s's history", before, repo_path, after)
+                since_commit = None
+            failures = list(repo.iter_scan(since_commit=since_commit, head=after, progress=ScanProgress(enabled=False)))
+            result['commits'] = repo.commit_count
+            result['errors'] = dict(repo.error_counts)
+            result['failures'] = [
+                dict(failure._asdict(), authored_datetime=_isoformat(failure.authored_datetime)) for failure in failures
+            ]
+
+        with self.__lock:
+            self.pushes += 1
+        result['milliseconds'] = round((time.perf_counter() - start_time) * 1000, 1)
+        logging.getLogger().info(
+            "Checked push of %s to %s: %d commits, errors %s, in %.1f ms", after, repo_path, result['commits'], result['errors'], result['milliseconds']
+        )
+        return result
+
+    def __has_commit(self, repo: Repo, sha: str) -> bool:
+        try:
+            repo.git_repo_object.git.cat_file('-e', f"{sha}^{{commit}}")
+            return True
+        except GitCommandError:
+            return False
+
+    def __refresh(self, warm: _WarmRepo):
+        # dco.yml, .mailmap and the signoff files are read from the default branch, so only a push there can change them
+        head = warm.repo.git_repo_object.head.commit.hexsha
+        if head == warm.head:
+            return
+        paths = ['.github/dco.yml', '.mailmap'] + [ signoff_dir.strip() for signoff_dir in self.signoff_dirs.split(',') ]
+        if warm.repo.git_repo_object.git.diff(warm.head, head, '--', *paths, name_only=True):
+            logging.getLogger().info("DCO config, .mailmap or signoffs changed in %s; reloading them", warm.repo.name)
+            self.__load(warm.repo)
+        warm.head = head
+
+    def status(self) -> dict:
+        with self.__lock:
+            repos = { path: warm.repo for path, warm in self.__repos.items() }
+            pushes = self.pushes
+        return {
+            'pushes': pushes,
+            'repos': { path: { 'name': repo.name, 'remediations': len(repo.remediations) } for path, repo in repos.items() if repo },
+        }
+
+    def close(self):
+        with self.__lock:
+            repos, self.__repos = list(self.__repos.values()), {}
+        for warm in repos:
+            with warm.lock:
+                if warm.repo:
+                    warm.repo.close()
+
+def _isoformat(value) -> str:
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+def make_server(service: ScanService, host: str = '127.0.0.1', port: int = 8080) -> ThreadingHTTPServer:
+    """Serves service over HTTP: POST /push with { 'repo', 'before', 'after' } ( or a GitHub push webhook payload )
+    returns the push's results, and GET /status the repos being kept warm."""
+    return ThreadingHTTPServer((host, port), _make_handler(service))
+
+def _make_handler(service: ScanService):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            logging.getLogger().debug("%s %s", self.address_string(), format % args)
+
+        def _reply(self, status: int, body: dict):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == '/status':
+                return self._reply(200, service.status())
+            self._reply(404, { 'error': f"No such endpoint {self.path}" })
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            body = self.rfile.read(length)
+            if self.path != '/push':
+                return self._reply(404, { 'error': f"No such endpoint {self.path}" })
+            try:
+                event = json.loads(body)
+                # a GitHub push webhook names the repo under 'repository'
+                repo_path = event.get('repo') or event['repository']['html_url']
+                before, after = event['before'], event['after']
+            except (ValueError, KeyError, TypeError, AttributeError):
+                return self._reply(400, { 'error': "Expected a JSON object with 'repo', 'before' and 'after'" })
+            try:
+                self._reply(200, service.push(repo_path, before, after))
+            except ValueError as e:
+                self._reply(422, { 'error': str(e) })
+            except Exception as e:
+                logging.getLogger().exception("Checking push of %s to %s failed", after, repo_path)
+                self._reply(500, { 'error': f"{type(e).__name__}: {e}" })
+
+    return Handler
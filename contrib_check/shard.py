@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+#
+# Splits an org scan into shards that independent machines can run, and merges what the shards write back into
+# one org-level report
+#
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+
+from .journal import RunJournal
+from .output import COMPRESSION_SUFFIXES, open_text, split_part
+from .summary import SUMMARY_FILENAME, summarize_journal
+
+METRICS_FILENAME = 'contrib-check-metrics.json'
+
+def parse_shard(shard: str) -> tuple[int, int]:
+    """Parses 'i/N' ( 1 <= i <= N ) into ( i, N )."""
+    try:
+        index, count = (int(part) for part in shard.split('/'))
+    except ValueError:
+        raise ValueError(f"Shard must be given as i/N, not '{shard}'")
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard {shard} is out of range; i must be between 1 and N")
+    return index, count
+
+def shard_of(repo_name: str, count: int) -> int:
+    """Which of count shards ( numbered from 1 ) repo_name belongs to.
+
+    A stable hash of the name rather than hash(), which is salted per process, so every machine agrees.
+    """
+    digest = hashlib.sha1(repo_name.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count + 1
+
+def merge_shards(shard_dirs: list[str | os.PathLike], output_dir: str | os.PathLike) -> dict:
+    """Combines the output directories of shard runs into output_dir, dropping rows seen more than once.
+
+    Per-repo CSVs and remediation files are merged by name, with the parts of a CSV split by size put back together
+    into one file ( compressed as the parts were ), the shard journals into one journal, the summaries of
+    the repos in it into one org summary, and the totals across them are written to the metrics file and returned.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    csv_files = {}
+    remediation_files = {}
+    for shard_dir in map(Path, shard_dirs):
+        for suffix in COMPRESSION_SUFFIXES.values():
+            for path in sorted(shard_dir.glob(f"*.csv{suffix}"), key=lambda path: split_part(path.name)):
+                csv_files.setdefault(split_part(path.name)[0], []).append(path)
+        for path in sorted(shard_dir.glob('remediation-commits/*.txt')):
+            remediation_files.setdefault(path.name, []).append(path)
+
+    for name, paths in csv_files.items():
+        _merge_csv(paths, output_dir / name)
+    if remediation_files:
+        (output_dir / 'remediation-commits').mkdir(exist_ok=True)
+    for name, paths in remediation_files.items():
+        _merge_lines(paths, output_dir / 'remediation-commits' / name)
+
+    entries = {}
+    sources = {}
+    for shard_dir in map(Path, shard_dirs):
+        journal_path = shard_dir / RunJournal.default_filename
+        if not journal_path.is_file():
+            logging.getLogger().warning("No journal found in %s", shard_dir)
+            continue
+        journal = RunJournal(journal_path, resume=True)
+        journal.close()
+        for repo, entry in journal.completed.items():
+            # a repo scanned by more than one shard run counts once, as of its latest scan
+            if repo not in entries or entry['completed_at'] > entries[repo]['completed_at']:
+                entries[repo] = entry
+                sources[repo] = shard_dir
+
+    with open(output_dir / RunJournal.default_filename, 'w', encoding='utf-8') as fh:
+        for entry in sorted(entries.values(), key=lambda entry: entry['repo']):
+            fh.write(json.dumps(entry) + '\n')
+
+    for repo, entry in entries.items():
+        if entry.get('summary') and (sources[repo] / entry['summary']).is_file():
+            shutil.copyfile(sources[repo] / entry['summary'], output_dir / entry['summary'])
+    summarize_journal(entries.values(), output_dir).write(output_dir / SUMMARY_FILENAME)
+
+    metrics = { 'shards': len(shard_dirs), 'repos': len(entries), 'commits': 0, 'errors': {}, 'seconds': 0.0 }
+    for entry in entries.values():
+        metrics['commits'] += entry.get('commits', 0)
+        metrics['seconds'] += entry.get('seconds', 0)
+        for error_type, count in entry.get('errors', {}).items():
+            metrics['errors'][error_type] = metrics['errors'].get(error_type, 0) + count
+    with open(output_dir / METRICS_FILENAME, 'w', encoding='utf-8') as fh:
+        json.dump(metrics, fh, indent=2)
+
+    return metrics
+
+def _merge_csv(paths: list[Path], destination: Path):
+    # commit messages span lines, so rows have to be compared as parsed rows rather than lines of text
+    seen = set()
+    compression = next((name for name, suffix in COMPRESSION_SUFFIXES.items() if suffix and destination.name.endswith(suffix)), None)
+    with open_text(destination, 'w', compression) as out:
+        writer = csv.writer(out, delimiter=',', quotechar='"', quoting=csv.QUOTE_ALL)
+        for path in paths:
+            with open_text(path) as fh:
+                for row in csv.reader(fh):
+                    if tuple(row) not in seen:
+                        seen.add(tuple(row))
+                        writer.writerow(row)
+
+def _merge_lines(paths: list[Path], destination: Path):
+    # the first file supplies the header; the others only add the lines it doesn't already have
+    with open(paths[0], encoding='utf-8') as fh:
+        lines = fh.read().splitlines(keepends=True)
+    seen = set(lines)
+    for path in paths[1:]:
+        if lines and not lines[-1].endswith('\n'):
+            lines[-1] += '\n'
+        with open(path, encoding='utf-8') as fh:
+            for line in fh:
+                if line not in seen:
+                    seen.add(line)
+                    lines.append(line)
+    with open(destination, 'w', encoding='utf-8') as fh:
+        fh.writelines(lines)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+#
+# Optional SQLite sink for scan results, so org-wide questions can be answered with indexed queries
+# instead of crawling the per-repo CSV files
+#
+
+from __future__ import annotations
+
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timezone
+
+class ResultsStore():
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS repos (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            html_url TEXT,
+            scanned_at TEXT NOT NULL,
+            commit_count INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS commits (
+            repo_id INTEGER NOT NULL REFERENCES repos(id),
+            hexsha TEXT NOT NULL,
+            author_name TEXT,
+            author_email TEXT,
+            authored_date TEXT
+        );
+        CREATE TABLE IF NOT EXISTS failures (
+            repo_id INTEGER NOT NULL REFERENCES repos(id),
+            hexsha TEXT NOT NULL,
+            author_name TEXT,
+            author_email TEXT,
+            error_type TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS remediations (
+            repo_id INTEGER NOT NULL REFERENCES repos(id),
+            remediated_hash TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_repos_name ON repos(name);
+        CREATE INDEX IF NOT EXISTS idx_commits_repo ON commits(repo_id, hexsha);
+        CREATE INDEX IF NOT EXISTS idx_commits_author_email ON commits(author_email);
+        CREATE INDEX IF NOT EXISTS idx_failures_repo ON failures(repo_id);
+        CREATE INDEX IF NOT EXISTS idx_failures_author_email ON failures(author_email);
+        CREATE INDEX IF NOT EXISTS idx_remediations_repo ON remediations(repo_id);
+        CREATE VIEW IF NOT EXISTS latest_repos AS
+            SELECT * FROM repos WHERE id IN (SELECT MAX(id) FROM repos GROUP BY name);
+    """
+
+    # Canned queries for the `query` subcommand; each takes optional :repo and :author filters
+    QUERIES = {
+        'authors': """
+            SELECT f.author_email, f.author_name, COUNT(*) AS failures, COUNT(DISTINCT r.name) AS repos
+            FROM failures f JOIN latest_repos r ON r.id = f.repo_id
+            WHERE (:repo IS NULL OR r.name = :repo) AND (:author IS NULL OR f.author_email = :author)
+            GROUP BY f.author_email ORDER BY failures DESC, f.author_email
+        """,
+        'repos': """
+            SELECT r.name, r.scanned_at, r.commit_count,
+                (SELECT COUNT(*) FROM failures f WHERE f.repo_id = r.id) AS failures
+            FROM latest_repos r
+            WHERE (:repo IS NULL OR r.name = :repo)
+            ORDER BY failures DESC, r.name
+        """,
+        'failures': """
+            SELECT r.name, f.hexsha, f.author_name, f.author_email, f.error_type
+            FROM failures f JOIN latest_repos r ON r.id = f.repo_id
+            WHERE (:repo IS NULL OR r.name = :repo) AND (:author IS NULL OR f.author_email = :author)
+            ORDER BY r.name, f.author_email
+        """,
+    }
+
+    def __init__(self, db_path: str, batch_size: int = 1000):
+        self.db_path = str(db_path)
+        self.batch_size = batch_size
+        self.__pending = { 'commits': [], 'failures': [], 'remediations': [] }
+        # repos scanned in parallel share the store, so every access goes through the lock
+        self.__lock = threading.RLock()
+        self.__connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.__connection.executescript(self.SCHEMA)
+        self.__connection.commit()
+
+    def start_repo(self, name: str, html_url: str = '') -> int:
+        """Registers a new scan of a repo and returns the id rows for that scan are recorded against."""
+        with self.__lock, self.__connection:
+            cursor = self.__connection.execute(
+                "INSERT INTO repos (name, html_url, scanned_at) VALUES (?, ?, ?)",
+                (name, html_url, datetime.now(timezone.utc).isoformat())
+            )
+        return cursor.lastrowid
+
+    def finish_repo(self, repo_id: int, commit_count: int):
+        self.flush()
+        with self.__lock, self.__connection:
+            self.__connection.execute("UPDATE repos SET commit_count = ? WHERE id = ?", (commit_count, repo_id))
+
+    def add_commit(self, repo_id: int, hexsha: str, author_name: str, author_email: str, authored_date):
+        self.__add('commits', (repo_id, hexsha, author_name, author_email, str(authored_date)))
+
+    def add_failure(self, repo_id: int, hexsha: str, author_name: str, author_email: str, error_type: str):
+        self.__add('failures', (repo_id, hexsha, author_name, author_email, error_type))
+
+    def add_remediation(self, repo_id: int, remediated_hash: str):
+        self.__add('remediations', (repo_id, remediated_hash))
+
+    def __add(self, table: str, row: tuple):
+        with self.__lock:
+            self.__pending[table].append(row)
+            if len(self.__pending[table]) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        """Writes all pending rows in a single transaction."""
+        with self.__lock:
+            self.__flush()
+
+    def __flush(self):
+        if not any(self.__pending.values()):
+            return
+        with self.__connection:
+            for table, rows in self.__pending.items():
+                if not rows:
+                    continue
+                placeholders = ', '.join('?' * len(rows[0]))
+                self.__connection.executemany(f"INSERT INTO {table} VALUES ({placeholders})", rows)
+                logging.getLogger().debug("Wrote %d rows to %s", len(rows), table)
+                rows.clear()
+
+    def query(self, name: str, repo: str | None = None, author: str | None = None) -> tuple[list[str], list[tuple]]:
+        """Runs one of the canned QUERIES, returning the column names and rows."""
+        if name not in self.QUERIES:
+            raise ValueError(f"Unknown query '{name}'. Valid queries are {', '.join(self.QUERIES)}")
+        with self.__lock:
+            self.__flush()
+            cursor = self.__connection.execute(self.QUERIES[name], { 'repo': repo, 'author': author })
+            return [column[0] for column in cursor.description], cursor.fetchall()
+
+    def commit_counts(self) -> dict[str, int]:
+        """Returns the number of commits scanned in the latest scan of each repo, keyed by repo name."""
+        with self.__lock:
+            cursor = self.__connection.execute("SELECT name, commit_count FROM latest_repos WHERE commit_count IS NOT NULL")
+            return dict(cursor.fetchall())
+
+    def close(self):
+        with self.__lock:
+            if self.__connection:
+                self.__flush()
+                self.__connection.close()
+                self.__connection = None
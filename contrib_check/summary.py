@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+#
+# Running totals of check outcomes per author and per repo, kept as the scan goes so nobody has to post-process the
+# per-failure CSVs to find out who owes what
+#
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, timezone
+
+from .commit import CommitRecord
+
+SUMMARY_FILENAME = 'contrib-check-summary.json'
+
+class ScanSummary():
+    """Counts of each check's outcomes ( e.g. 'unsigned', 'remediated', 'past-signed' for dco ), per repo and per
+    author email, with the dates of each author's first and last failing commit.
+
+    Memory grows with the number of authors and repos, never the number of commits. Summaries of parts of a scan
+    ( a parallel scan's chunks, an org's repos, a sharded run's shards ) merge into the summary of the whole.
+    """
+
+    def __init__(self):
+        self.repos = {}
+        self.authors = {}
+
+    def add(self, repo_name: str, records: list[CommitRecord], outcomes: dict[str, list[str]], failed: list[bool]):
+        """Counts a batch of records from repo_name, given each check's outcome for every record and whether each
+        record failed any check."""
+        repo = self.repos.setdefault(repo_name, _tally())
+        for index, record in enumerate(records):
+            email = record.author.email.lower()
+            author = self.authors.get(email)
+            if author is None:
+                author = self.authors[email] = dict(_tally(), name=record.author.name, first_failure=None, last_failure=None)
+            for tally in (repo, author):
+                tally['commits'] += 1
+                for check_name, check_outcomes in outcomes.items():
+                    counts = tally['outcomes'].setdefault(check_name, {})
+                    counts[check_outcomes[index]] = counts.get(check_outcomes[index], 0) + 1
+            if failed[index]:
+                _widen(author, _date(record.authored_datetime), _date(record.authored_datetime))
+
+    def merge(self, other: ScanSummary):
+        for name, tally in other.repos.items():
+            _add_tally(self.repos.setdefault(name, _tally()), tally)
+        for email, other_author in other.authors.items():
+            author = self.authors.get(email)
+            if author is None:
+                author = self.authors[email] = dict(_tally(), name=other_author['name'], first_failure=None, last_failure=None)
+            _add_tally(author, other_author)
+            _widen(author, other_author['first_failure'], other_author['last_failure'])
+
+    def write(self, path: str | os.PathLike):
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump({ 'repos': self.repos, 'authors': self.authors }, fh, indent=1, sort_keys=True)
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> ScanSummary:
+        with open(path, encoding='utf-8') as fh:
+            data = json.load(fh)
+        summary = cls()
+        summary.repos = data['repos']
+        summary.authors = data['authors']
+        return summary
+
+def _tally() -> dict:
+    return { 'commits': 0, 'outcomes': {} }
+
+def _add_tally(tally: dict, other: dict):
+    tally['commits'] += other['commits']
+    for check_name, other_counts in other['outcomes'].items():
+        counts = tally['outcomes'].setdefault(check_name, {})
+        for outcome, count in other_counts.items():
+            counts[outcome] = counts.get(outcome, 0) + count
+
+def _widen(author: dict, first: str | None, last: str | None):
+    # dates are kept as UTC ISO strings, so comparing them as strings orders them correctly
+    if first and (author['first_failure'] is None or first < author['first_failure']):
+        author['first_failure'] = first
+    if last and (author['last_failure'] is None or last > author['last_failure']):
+        author['last_failure'] = last
+
+def _date(value) -> str:
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).isoformat()
+    return str(value)
+
+def summarize_journal(entries, directory: str | os.PathLike) -> ScanSummary:
+    """Merges the summaries of the repos in journal entries, from the summary files they name in directory."""
+    summary = ScanSummary()
+    for entry in entries:
+        if entry.get('summary') and os.path.isfile(os.path.join(directory, entry['summary'])):
+            summary.merge(ScanSummary.load(os.path.join(directory, entry['summary'])))
+    return summary
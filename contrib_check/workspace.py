@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+#
+# Where clones are made: a directory per run under a chosen location, a disk budget the concurrent clones share,
+# and cleanup that doesn't depend on every Repo being closed, or even on the run exiting cleanly
+#
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import re
+import shutil
+import socket
+import tempfile
+import threading
+
+_SIZE_UNITS = { '': 1, 'K': 2**10, 'M': 2**20, 'G': 2**30, 'T': 2**40 }
+
+def parse_size(value: str) -> int:
+    """Returns the bytes in a size such as '500M' or '20G' ( powers of 1024; a plain number is bytes )."""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*', value, re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Can't read '{value}' as a size; use a number of bytes, or e.g. 500M or 20G")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).upper()])
+
+class CloneWorkspace():
+    """Hands out directories to clone into, under a directory of this run's own inside directory ( the system temp
+    directory by default ).
+
+    Given a budget in bytes, allocate() waits until the clone's expected size fits alongside the clones already in
+    the workspace, so parallel scans of big repos can't fill the disk; a clone bigger than the whole budget waits
+    until it has the workspace to itself. The run's directory is removed by close(), or at exit if close() is never
+    reached. A run killed outright can't clean up after itself, so creating a workspace also removes the directories
+    of earlier runs on this host whose processes are gone.
+    """
+
+    prefix = 'contrib-check-'
+
+    def __init__(self, directory: str | os.PathLike | None = None, budget: int | None = None):
+        self.directory = str(directory or tempfile.gettempdir())
+        self.budget = budget
+        self.used = 0
+        self.__reservations = {}
+        self.__condition = threading.Condition()
+        os.makedirs(self.directory, exist_ok=True)
+        self.sweep()
+        self.path = tempfile.mkdtemp(prefix=f"{self.prefix}{_host()}-{os.getpid()}-", dir=self.directory)
+        atexit.register(self.close)
+
+    def sweep(self):
+        """Removes the directories left in directory by runs on this host that are no longer running."""
+        pattern = re.compile(rf"{re.escape(self.prefix)}{re.escape(_host())}-(\d+)-")
+        for entry in os.scandir(self.directory):
+            match = pattern.match(entry.name)
+            if match and entry.is_dir(follow_symlinks=False) and not _running(int(match.group(1))):
+                logging.getLogger().info("Removing %s, left behind by an earlier run", entry.path)
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def allocate(self, name: str, size: int = 0) -> WorkspaceDir:
+        """Returns a new directory for cloning name, expected to take size bytes, once the budget has room for it."""
+        with self.__condition:
+            if self.budget and self.used and self.used + size > self.budget:
+                logging.getLogger().info(
+                    "Waiting for %.0f MB of the clone budget to clone %s ( %.0f MB in use )", size / 2**20, name, self.used / 2**20
+                )
+            self.__condition.wait_for(lambda: not self.budget or not self.used or self.used + size <= self.budget)
+            workspace_dir = WorkspaceDir(self, tempfile.mkdtemp(prefix=f"{_safe_name(name)}-", dir=self.path))
+            self.__reservations[workspace_dir.name] = size
+            self.used += size
+        return workspace_dir
+
+    def _resize(self, workspace_dir: WorkspaceDir, size: int):
+        with self.__condition:
+            if workspace_dir.name in self.__reservations:
+                self.used += size - self.__reservations[workspace_dir.name]
+                self.__reservations[workspace_dir.name] = size
+                self.__condition.notify_all()
+
+    def _release(self, workspace_dir: WorkspaceDir):
+        shutil.rmtree(workspace_dir.name, ignore_errors=True)
+        with self.__condition:
+            self.used -= self.__reservations.pop(workspace_dir.name, 0)
+            self.__condition.notify_all()
+
+    def close(self):
+        """Removes the run's directory, and everything cloned into it."""
+        atexit.unregister(self.close)
+        shutil.rmtree(self.path, ignore_errors=True)
+        with self.__condition:
+            self.__reservations = {}
+            self.used = 0
+            self.__condition.notify_all()
+
+class WorkspaceDir():
+    """A directory allocated from a CloneWorkspace, used as tempfile.TemporaryDirectory is."""
+
+    def __init__(self, workspace: CloneWorkspace, name: str):
+        self.workspace = workspace
+        self.name = name
+
+    def measure(self) -> int:
+        """Counts what's actually on disk against the budget in place of the estimate, returning it in bytes."""
+        size = 0
+        for root, _, files in os.walk(self.name):
+            for filename in files:
+                try:
+                    size += os.lstat(os.path.join(root, filename)).st_size
+                except OSError:
+                    pass
+        self.workspace._resize(self, size)
+        return size
+
+    def cleanup(self):
+        """Removes the directory and returns its share of the budget; safe to call more than once."""
+        self.workspace._release(self)
+
+def _host() -> str:
+    return _safe_name(socket.gethostname())
+
+def _safe_name(name: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.]+', '_', name) or 'repo'
+
+def _running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # it exists, just not as ours
+        return True
+    return True
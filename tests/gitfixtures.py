@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+#
+# Builds real git repos of arbitrary size quickly with `git fast-import`, for tests that need actual history, and
+# records what the benchmarks run over them measured
+
+import json
+import logging
+import os
+import shutil
+import subprocess
+
+def make_git_repo(path: str, commit_count: int, signed_every: int = 2, message_padding: int = 0, files: dict | None = None) -> str:
+    """Creates a repo at path with commit_count linear commits on main.
+
+    Every signed_every-th commit has a DCO signoff; the rest don't. message_padding adds that many bytes to each
+    commit message. files is an optional { path: content } dict committed in the final commit.
+    """
+    subprocess.run(["git", "init", "-q", "-b", "main", path], check=True)
+    stream = []
+    for i in range(commit_count):
+        author = f"Dev {i % 5} <dev{i % 5}@example.com>"
+        message = f"commit {i}\n\n" + ("x" * message_padding)
+        if i % signed_every == 0:
+            message += f"\n\nSigned-off-by: {author}\n"
+        message = message.encode()
+        stream.append(b"commit refs/heads/main\n")
+        stream.append(f"mark :{i + 1}\n".encode())
+        stream.append(f"author {author} {1600000000 + i * 60} +0000\n".encode())
+        stream.append(f"committer {author} {1600000000 + i * 60} +0000\n".encode())
+        stream.append(f"data {len(message)}\n".encode() + message + b"\n")
+        if i:
+            stream.append(f"from :{i}\n".encode())
+        content = f"{i}\n".encode()
+        stream.append(f"M 644 inline file.txt\ndata {len(content)}\n".encode() + content + b"\n")
+        if files and i == commit_count - 1:
+            for filename, file_content in files.items():
+                file_content = file_content.encode() if isinstance(file_content, str) else file_content
+                stream.append(f"M 644 inline {filename}\ndata {len(file_content)}\n".encode() + file_content + b"\n")
+    subprocess.run(["git", "fast-import", "--quiet"], input=b"".join(stream), cwd=path, check=True)
+    subprocess.run(["git", "checkout", "-q", "-f", "main"], cwd=path, check=True)
+    return path
+
+def make_git_repos(directory: str, count: int, commit_counts: tuple[int, ...] = (5, 20, 50), signed_every: int = 2) -> list[str]:
+    """Creates count repos named repo0, repo1, ... under directory, for tests of whole orgs.
+
+    Repo i has commit_counts[i % len(commit_counts)] commits. Only one repo of each size is built with git; the
+    rest are copies of it, so thousands of repos take seconds rather than minutes.
+    """
+    templates = {}
+    paths = []
+    for i in range(count):
+        commit_count = commit_counts[i % len(commit_counts)]
+        path = os.path.join(directory, f"repo{i}")
+        if commit_count in templates:
+            shutil.copytree(templates[commit_count], path, symlinks=True)
+        else:
+            templates[commit_count] = make_git_repo(path, commit_count, signed_every=signed_every)
+        paths.append(path)
+    return paths
+
+def record_results(results: dict):
+    """Logs a benchmark's results, and appends them as a JSON line to the file named by CONTRIB_CHECK_LOAD_RESULTS if
+    it's set, so runs can be compared."""
+    logging.getLogger(__name__).info("Benchmark results: %s", results)
+    if os.environ.get('CONTRIB_CHECK_LOAD_RESULTS'):
+        with open(os.environ['CONTRIB_CHECK_LOAD_RESULTS'], 'a') as fh:
+            fh.write(json.dumps(results) + '\n')
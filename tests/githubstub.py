@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+#
+# A stand-in for the parts of the GitHub API contrib-check uses, served from local git repos, so API-backed code can
+# be tested against real HTTP without network access
+
+import base64
+import json
+import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import git
+
+class GitHubStub():
+    """Serves GraphQL commit history and the REST contents API for repos added with add_repo(), and org repo
+    listings for repos added with add_org_repo().
+
+    Use as a context manager; url is the API root to hand to GitHubApi. Every request is appended to calls as
+    ( method, path, graphql variables or None ), and the client port it came from is added to connections. Statuses
+    appended to failures are answered, in order, instead of the next requests; rate_limit() schedules rate limit
+    responses for particular requests. Every response is held back by latency seconds, as if GitHub were far away.
+    """
+
+    def __init__(self):
+        self.repos = {}
+        self.org_repos = {}
+        self.calls = []
+        self.connections = set()
+        self.failures = []
+        self.scheduled_failures = {}
+        self.latency = 0.0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _make_handler(self))
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = None
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={ 'poll_interval': 0.05 }, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def add_repo(self, owner: str, name: str, path: str):
+        """Serves the local repo at path as owner/name, with its HEAD as the default branch."""
+        repo = git.Repo(path)
+        commits = [
+            {
+                'oid': commit.hexsha,
+                'message': commit.message,
+                'authoredDate': commit.authored_datetime.isoformat(),
+                'author': { 'name': commit.author.name, 'email': commit.author.email },
+                'parents': { 'nodes': [ { 'oid': parent.hexsha } for parent in commit.parents ] },
+                'signature': { 'isValid': True } if commit.gpgsig else None,
+            }
+            for commit in repo.iter_commits('HEAD')
+        ]
+        paths = subprocess.run(['git', 'ls-tree', '-r', '--name-only', 'HEAD'], cwd=path, capture_output=True, text=True, check=True).stdout.split('\n')
+        files = { file_path: repo.git.show(f"HEAD:{file_path}", stdout_as_string=False) for file_path in paths if file_path }
+        self.repos[(owner, name)] = { 'commits': commits, 'files': files }
+
+    def add_org_repo(self, org: str, name: str, size: int = 0, archived: bool = False, html_url: str | None = None):
+        """Lists name among org's repos. html_url defaults to the repo's github.com URL; pointing it at a local repo
+        instead lets the listing drive a real scan without network access."""
+        self.org_repos.setdefault(org, []).append(
+            { 'name': name, 'html_url': html_url or f"https://github.com/{org}/{name}", 'size': size, 'archived': archived }
+        )
+
+    def rate_limit(self, after: int = 0, count: int = 1, reset_in: int = 60):
+        """Answers the count requests following the first after requests with GitHub's rate limit response."""
+        headers = { 'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(int(time.time()) + reset_in) }
+        with self.lock:
+            for index in range(after + 1, after + count + 1):
+                self.scheduled_failures[index] = (403, { 'message': 'API rate limit exceeded' }, headers)
+
+    def graphql(self, variables: dict) -> dict:
+        repo = self.repos.get((variables['owner'], variables['name']))
+        if not repo:
+            return { 'repository': None }
+        commits = [
+            commit for commit in repo['commits']
+            if (not variables.get('since') or commit['authoredDate'] >= variables['since'])
+            and (not variables.get('until') or commit['authoredDate'] <= variables['until'])
+        ]
+        head = repo['commits'][0]['oid']
+        start = int(variables['after'].split(' ')[1]) + 1 if variables.get('after') else 0
+        end = min(start + variables['first'], len(commits))
+        return { 'repository': { 'defaultBranchRef': { 'target': {
+            'oid': head,
+            'history': {
+                'totalCount': len(commits),
+                'pageInfo': { 'hasNextPage': end < len(commits), 'endCursor': f"{head} {end - 1}" },
+                'nodes': commits[start:end],
+            }
+        } } } }
+
+    def contents(self, owner: str, name: str, path: str):
+        repo = self.repos.get((owner, name))
+        if not repo:
+            return None
+        if path in repo['files']:
+            return { 'type': 'file', 'path': path, 'encoding': 'base64', 'content': base64.b64encode(repo['files'][path]).decode() }
+        entries = {}
+        for file_path in repo['files']:
+            if file_path.startswith(path + '/'):
+                child = file_path[len(path) + 1:].split('/')[0]
+                entries[child] = { 'type': 'file' if '/' not in file_path[len(path) + 1:] else 'dir', 'path': f"{path}/{child}", 'name': child }
+        return list(entries.values()) or None
+
+def _make_handler(stub: GitHubStub):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        # keep-alive, as GitHub does
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status: int, body, headers: dict | None = None):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _record(self, call: tuple) -> tuple | None:
+            with stub.lock:
+                stub.calls.append(call)
+                stub.connections.add(self.client_address[1])
+                failure = stub.scheduled_failures.pop(len(stub.calls), None)
+                if failure is None and stub.failures:
+                    failure = stub.failures.pop(0)
+            if stub.latency:
+                time.sleep(stub.latency)
+            return failure
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            failure = self._record(('POST', self.path, body['variables']))
+            if failure:
+                return self._reply(*failure)
+            self._reply(200, { 'data': stub.graphql(body['variables']) })
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            path = unquote(url.path)
+            failure = self._record(('GET', path, None))
+            if failure:
+                return self._reply(*failure)
+            parts = path.split('/', 5)
+            # /orgs/<org>/repos?per_page=<n>&page=<n>
+            if len(parts) == 4 and parts[1] == 'orgs' and parts[3] == 'repos' and parts[2] in stub.org_repos:
+                query = parse_qs(url.query)
+                per_page = int(query.get('per_page', ['30'])[0])
+                page = int(query.get('page', ['1'])[0])
+                repos = stub.org_repos[parts[2]]
+                headers = {}
+                if page * per_page < len(repos):
+                    headers['Link'] = f'<{stub.url}{url.path}?per_page={per_page}&page={page + 1}>; rel="next"'
+                return self._reply(200, repos[(page - 1) * per_page:page * per_page], headers)
+            # /repos/<owner>/<name>/contents/<path>
+            if len(parts) == 6 and parts[1] == 'repos' and parts[4] == 'contents':
+                contents = stub.contents(parts[2], parts[3], parts[5])
+                if contents is not None:
+                    return self._reply(200, contents)
+            self._reply(404, { 'message': 'Not Found' })
+
+    return Handler
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+
+import csv
+import io
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest.mock import patch
+
+from contrib_check.api import scan
+from contrib_check.repo import Repo, clone_bare
+from contrib_check.results import CsvSink, ResultSink, ScanFailure
+
+from .gitfixtures import make_git_repo
+
+class _ListSink(ResultSink):
+
+    def __init__(self):
+        self.failures = []
+        self.finished = None
+
+    def write(self, failure):
+        self.failures.append(failure)
+
+    def finish(self, repo):
+        self.finished = (repo.commit_count, repo.error_counts, repo.summary.repos)
+
+class TestApi(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = make_git_repo(os.path.join(self.tmpdir, "repo"), 300, signed_every=3)
+        # anything written relative to the cwd would turn up here
+        self.cwd = os.getcwd()
+        self.workdir = os.path.join(self.tmpdir, "cwd")
+        os.makedirs(self.workdir)
+        os.chdir(self.workdir)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _csv_rows(self):
+        output_dir = os.path.join(self.tmpdir, "out")
+        os.makedirs(output_dir)
+        repo = Repo(self.path)
+        repo.remediation_commits_dir = os.path.join(output_dir, "remediation-commits")
+        repo.scan(output_dir=Path(output_dir))
+        repo.close()
+        with open(os.path.join(output_dir, repo.csv_filename), newline='') as fh:
+            return list(csv.reader(fh))
+
+    def test_yields_what_the_csv_records_without_writing_files(self):
+        sink = _ListSink()
+        failures = list(scan(self.path, sinks=[sink]))
+
+        self.assertTrue(all(isinstance(failure, ScanFailure) for failure in failures))
+        self.assertEqual(len(failures), 200)
+        self.assertEqual(failures[0].error_type, 'dco')
+        self.assertEqual(sink.failures, failures)
+        self.assertEqual(sink.finished[:2], (300, { 'dco': 200 }))
+        self.assertEqual(os.listdir(self.workdir), [])
+        self.assertEqual([ [ str(field) for field in failure ] for failure in failures ], self._csv_rows())
+
+    def test_checks_and_window(self):
+        failures = list(scan(self.path, checks={ 'email-domain': { 'domains': ["example.org"] } }, authors=["dev1@"]))
+        self.assertEqual(len(failures), 60)
+        self.assertEqual(set(failure.error_type for failure in failures), { 'email-domain' })
+        self.assertEqual(set(failure.author_email for failure in failures), { "dev1@example.com" })
+
+    def test_repo_scan_into_sinks(self):
+        out = io.StringIO()
+        repo = Repo(self.path)
+        repo.scan(sinks=[CsvSink(out)])
+        repo.close()
+        self.assertEqual(os.listdir(self.workdir), [])
+        self.assertEqual(list(csv.reader(io.StringIO(out.getvalue()))), self._csv_rows())
+
+    def test_closing_early_stops_a_parallel_scan(self):
+        repo = Repo(self.path)
+        repo.parallel_chunk_size = 10
+        failures = repo.iter_scan(jobs=2)
+        self.assertIsInstance(next(failures), ScanFailure)
+        start_time = time.monotonic()
+        failures.close()
+        repo.close()
+        self.assertLess(time.monotonic() - start_time, 10)
+        self.assertLess(repo.commit_count, 300)
+        self.assertEqual(os.listdir(self.workdir), [])
+
+    def test_nothing_printed(self):
+        out = io.StringIO()
+        # as if run from a terminal, where the CLI would draw progress bars
+        with redirect_stdout(out), patch('contrib_check.progress.progress_enabled', return_value=True), \
+                patch('contrib_check.repo.clone_bare', side_effect=lambda url, path, *args: clone_bare(self.path, path)):
+            with self.assertLogs(level='INFO') as logs:
+                failures = list(scan("https://github.com/foo/repo"))
+        self.assertEqual(len(failures), 200)
+        self.assertEqual(out.getvalue(), "")
+        self.assertIn("Cloning repo https://github.com/foo/repo", "\n".join(logs.output))
+
+    def test_not_a_repo(self):
+        with self.assertRaises(ValueError):
+            list(scan(os.path.join(self.tmpdir, "missing")))
+
+
+if __name__ == '__main__':
+    unittest.main()
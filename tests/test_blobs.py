@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from contrib_check.blobs import GitBlobReader
+
+from .gitfixtures import make_git_repo
+
+class TestGitBlobReader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        path = make_git_repo(os.path.join(self.tmpdir, "repo"), 2, files={"docs/a.txt": "a", "docs/sub/b.txt": b"\x00b\n"})
+        self.reader = GitBlobReader(os.path.join(path, ".git"))
+
+    def tearDown(self):
+        self.reader.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_read_file(self):
+        self.assertEqual(self.reader.read("docs/a.txt"), b"a")
+        self.assertEqual(self.reader.read("docs/sub/b.txt"), b"\x00b\n")
+
+    def test_read_missing_or_directory(self):
+        self.assertIsNone(self.reader.read("docs/missing.txt"))
+        self.assertIsNone(self.reader.read("docs"))
+        self.assertIsNone(self.reader.read("docs/a.txt", rev="no-such-branch"))
+
+    def test_iter_files_recurses(self):
+        files = dict(self.reader.iter_files("docs"))
+        self.assertEqual(files, {"docs/a.txt": b"a", "docs/sub/b.txt": b"\x00b\n"})
+        self.assertEqual(list(self.reader.iter_files("missing")), [])
+
+    def test_single_process_for_all_reads(self):
+        with patch('contrib_check.blobs.subprocess.Popen', wraps=subprocess.Popen) as mock_popen:
+            for _ in range(5):
+                self.reader.read("docs/a.txt")
+            list(self.reader.iter_files("docs"))
+        self.assertEqual(mock_popen.call_count, 1)
+
+    def test_exited_process_replaced(self):
+        self.assertEqual(self.reader.read("docs/a.txt"), b"a")
+        process = self.reader._GitBlobReader__process
+        process.kill()
+        process.wait()
+        self.assertEqual(self.reader.read("docs/a.txt"), b"a")
+        self.assertIsNot(self.reader._GitBlobReader__process, process)
+
+    def test_not_a_repo(self):
+        reader = GitBlobReader(os.path.join(self.tmpdir, "missing"))
+        with self.assertLogs(level='WARNING'):
+            self.assertIsNone(reader.read("docs/a.txt"))
+        # the pipe to the exited process is already broken
+        reader.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+
+import csv
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import git
+
+from contrib_check.checks import CHECKS, Check, DcoCheck, EmailDomainCheck, SignedCheck, make_checks, register_check
+from contrib_check.commit import Commit, CommitAuthor, CommitRecord
+from contrib_check.repo import Repo
+
+from .gitfixtures import make_git_repo
+
+def _record(hexsha="a" * 40, message="msg", email="dev@example.com", parents=("b" * 40,), signed=False):
+    return CommitRecord(hexsha, message, CommitAuthor("Dev", email), "2024-01-01", parents, signed)
+
+class TestRegistry(unittest.TestCase):
+
+    def test_builtin_checks_registered(self):
+        self.assertEqual(CHECKS['dco'], DcoCheck)
+        self.assertEqual(CHECKS['email-domain'], EmailDomainCheck)
+        self.assertEqual(CHECKS['signed'], SignedCheck)
+
+    def test_make_checks(self):
+        checks = make_checks({ 'dco': True, 'signed': False, 'email-domain': { 'domains': ["example.com"] } })
+        self.assertEqual([check.name for check in checks], ['dco', 'email-domain'])
+        self.assertEqual(checks[1].domains, ("example.com",))
+        with self.assertRaises(ValueError):
+            make_checks({ 'no-such-check': True })
+
+
+class TestDcoCheck(unittest.TestCase):
+
+    def test_same_verdicts_as_commit(self):
+        repo = SimpleNamespace(past_signoffs=[b"c" * 40 + b" past commit"], remediations={"d" * 7})
+        records = [
+            _record("1" * 40, "Fix\n\nSigned-off-by: Dev <dev@example.com>"),
+            _record("2" * 40, "Merge", parents=("b" * 40, "e" * 40)),
+            _record("c" * 40),
+            _record("d" * 40),
+            _record("f" * 40),
+        ]
+        check = DcoCheck()
+        check.prepare(repo)
+        expected = [ Commit(record, repo, (False, False)).check_dco_signoff() for record in records ]
+        self.assertEqual(check.check(records), expected)
+        self.assertEqual(expected, [True, True, True, True, False])
+
+    def test_short_remediations_match_nothing(self):
+        check = DcoCheck()
+        check.prepare(SimpleNamespace(past_signoffs=[], remediations={"a", "abc", "b" * 7}))
+        records = [ _record("a" * 40), _record("abc" + "0" * 37), _record("b" * 40) ]
+        self.assertEqual(check.outcomes(records), ['unsigned', 'unsigned', 'remediated'])
+
+
+class TestEmailDomainCheck(unittest.TestCase):
+
+    def test_domains_and_subdomains(self):
+        check = EmailDomainCheck(["example.com", " @Example.org"])
+        emails = ["a@example.com", "a@dev.example.com", "a@EXAMPLE.ORG", "a@notexample.com", "a@example.com.evil", "no-at-sign"]
+        self.assertEqual(check.check([ _record(email=email) for email in emails ]), [True, True, True, False, False, False])
+
+
+class TestSignedCheck(unittest.TestCase):
+
+    def test_signed(self):
+        self.assertEqual(SignedCheck().check([_record(signed=True), _record()]), [True, False])
+
+
+class _ShortMessageCheck(Check):
+    # registered only for the test below, to show a check outside this package plugs in the same way
+    name = 'short-message'
+    description = 'The commit message is too short'
+
+    def check(self, records):
+        return [ len(record.message.strip()) > 10 for record in records ]
+
+class TestChecksInOneScan(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = make_git_repo(os.path.join(self.tmpdir, "repo"), 300, signed_every=3)
+        # rewrite the head commit with a signature header, standing in for a GPG signed commit
+        head = git.Repo(self.path).head.commit
+        raw = subprocess.run(["git", "cat-file", "commit", head.hexsha], cwd=self.path, capture_output=True, check=True).stdout
+        headers, _, message = raw.partition(b"\n\n")
+        signed = headers + b"\ngpgsig -----BEGIN PGP SIGNATURE-----\n \n -----END PGP SIGNATURE-----\n\n" + message
+        sha = subprocess.run(["git", "hash-object", "-t", "commit", "-w", "--stdin"], cwd=self.path, input=signed, capture_output=True, check=True).stdout.decode().strip()
+        subprocess.run(["git", "update-ref", "refs/heads/main", sha], cwd=self.path, check=True)
+        register_check(_ShortMessageCheck)
+
+    def tearDown(self):
+        del CHECKS['short-message']
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _scan(self, name, jobs=1):
+        output_dir = os.path.join(self.tmpdir, name)
+        os.makedirs(output_dir)
+        repo = Repo(self.path)
+        repo.parallel_chunk_size = 50
+        repo.checks = { 'dco': True, 'email-domain': { 'domains': ["example.org"] }, 'signed': True, 'short-message': True }
+        repo.remediation_commits_dir = os.path.join(output_dir, "remediation-commits")
+        with patch.object(git.cmd.Git, '_call_process', autospec=True, side_effect=git.cmd.Git._call_process) as mock_call:
+            repo.scan(output_dir=Path(output_dir), jobs=jobs)
+        repo.close()
+        walks = [ call for call in mock_call.call_args_list if call.args[1] == 'rev_list' and not call.kwargs.get('count') ]
+        with open(os.path.join(output_dir, repo.csv_filename), newline='') as fh:
+            return list(csv.reader(fh)), repo.error_counts, len(walks)
+
+    def test_all_checks_in_one_walk(self):
+        rows, error_counts, walks = self._scan("serial")
+        self.assertEqual(walks, 1)
+        self.assertEqual(error_counts, { 'dco': 200, 'email-domain': 300, 'signed': 299, 'short-message': 200 })
+        # a failing commit's errors are written together, in the order the checks are enabled
+        self.assertEqual([row[6] for row in rows[:4]], ['dco', 'email-domain', 'short-message', 'dco'])
+
+    def test_parallel_scan_matches_serial(self):
+        self.assertEqual(self._scan("parallel", jobs=3), self._scan("serial"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,15 +8,14 @@
 import os
 import tempfile
 import unittest
-from unittest.mock import Mock, mock_open, patch
+from unittest.mock import Mock, patch
 
-from contrib_check.commit import Commit
+from contrib_check.commit import Commit, CommitRecord
 
-def _make_mock_repo(tree_raises_key_error=True):
-    """Return a mock repo whose tree[] raises KeyError by default (no dco.yml)."""
+def _make_mock_repo(dco_yml=None):
+    """Return a mock repo serving dco_yml as .github/dco.yml ( None means there isn't one )."""
     mock_repo = Mock()
-    if tree_raises_key_error:
-        mock_repo.git_repo_object.head.commit.tree.__getitem__ = Mock(side_effect=KeyError)
+    mock_repo.read_blob.return_value = dco_yml
     return mock_repo
 
 
@@ -106,8 +105,8 @@ class TestCommitCheckDCOSignoff(unittest.TestCase):
         commit = _make_commit(parents=[1])
         commit.git_commit_object.message = "no signoff"
         commit.repo_object.past_signoffs = []
-        commit.repo_object.git_repo_object.git.rev_parse.return_value = "abc1234"
-        commit.remediations = []
+        commit.git_commit_object.hexsha = "abc1234" + "0" * 33
+        commit.repo_object.remediations = set()
         self.assertFalse(commit.check_dco_signoff())
 
     def test_normal_commit_with_past_signoff_passes(self):
@@ -122,8 +121,8 @@ class TestCommitCheckDCOSignoff(unittest.TestCase):
         commit.git_commit_object.message = "no signoff"
         commit.repo_object.past_signoffs = []
         short = "abc1234"
-        commit.repo_object.git_repo_object.git.rev_parse.return_value = short
-        commit.remediations = [short]
+        commit.git_commit_object.hexsha = short + "0" * 33
+        commit.repo_object.remediations = {short}
         self.assertTrue(commit.check_dco_signoff())
 
 
@@ -132,54 +131,47 @@ class TestCommitHasRemediation(unittest.TestCase):
     def test_has_remediation_match(self):
         commit = _make_commit()
         short = "abc1234"
-        commit.repo_object.git_repo_object.git.rev_parse.return_value = short
-        commit.remediations = [short]
+        commit.git_commit_object.hexsha = short + "0" * 33
+        commit.repo_object.remediations = {short}
         self.assertTrue(commit.has_remediation())
 
+    def test_short_remediation_never_matches(self):
+        commit = _make_commit()
+        commit.git_commit_object.hexsha = "abc1234" + "0" * 33
+        commit.repo_object.remediations = {"a", "abc"}
+        self.assertFalse(commit.has_remediation())
+
     def test_has_remediation_no_match(self):
         commit = _make_commit()
-        commit.repo_object.git_repo_object.git.rev_parse.return_value = "abc1234"
-        commit.remediations = ["zzzzzzz"]
+        commit.git_commit_object.hexsha = "abc1234" + "0" * 33
+        commit.repo_object.remediations = {"abc12350"}
         self.assertFalse(commit.has_remediation())
 
 
 class TestCommitLoadRemediationCommitConfig(unittest.TestCase):
 
     def test_no_dco_yml_returns_false(self):
-        """KeyError from tree lookup → returns False, flags stay False."""
+        """No dco.yml in the object database → returns False, flags stay False."""
         commit = _make_commit()
+        self.assertFalse(commit.load_remediation_commit_config())
         self.assertFalse(commit.allow_remediation_commit_individual)
         self.assertFalse(commit.allow_remediation_commit_thirdparty)
+        commit.repo_object.read_blob.assert_called_with(".github/dco.yml")
 
     def test_dco_yml_enables_individual(self):
-        mock_repo = _make_mock_repo(tree_raises_key_error=False)
         dco_yml = "allowRemediationCommits:\n  individual: true\n  thirdParty: false\n"
-        mock_blob = Mock()
-        mock_blob.abspath = "/fake/dco.yml"
-        mock_repo.git_repo_object.head.commit.tree.__getitem__ = Mock(return_value=mock_blob)
-        with patch("builtins.open", mock_open(read_data=dco_yml)):
-            commit = _make_commit(mock_repo=mock_repo)
+        commit = _make_commit(mock_repo=_make_mock_repo(dco_yml.encode()))
         self.assertTrue(commit.allow_remediation_commit_individual)
         self.assertFalse(commit.allow_remediation_commit_thirdparty)
 
     def test_dco_yml_enables_thirdparty(self):
-        mock_repo = _make_mock_repo(tree_raises_key_error=False)
         dco_yml = "allowRemediationCommits:\n  individual: false\n  thirdParty: true\n"
-        mock_blob = Mock()
-        mock_blob.abspath = "/fake/dco.yml"
-        mock_repo.git_repo_object.head.commit.tree.__getitem__ = Mock(return_value=mock_blob)
-        with patch("builtins.open", mock_open(read_data=dco_yml)):
-            commit = _make_commit(mock_repo=mock_repo)
+        commit = _make_commit(mock_repo=_make_mock_repo(dco_yml.encode()))
         self.assertFalse(commit.allow_remediation_commit_individual)
         self.assertTrue(commit.allow_remediation_commit_thirdparty)
 
     def test_empty_dco_yml_leaves_flags_false(self):
-        mock_repo = _make_mock_repo(tree_raises_key_error=False)
-        mock_blob = Mock()
-        mock_blob.abspath = "/fake/dco.yml"
-        mock_repo.git_repo_object.head.commit.tree.__getitem__ = Mock(return_value=mock_blob)
-        with patch("builtins.open", mock_open(read_data="")):
-            commit = _make_commit(mock_repo=mock_repo)
+        commit = _make_commit(mock_repo=_make_mock_repo(b""))
         self.assertFalse(commit.allow_remediation_commit_individual)
         self.assertFalse(commit.allow_remediation_commit_thirdparty)
 
@@ -187,19 +179,13 @@ class TestCommitLoadRemediationCommitConfig(unittest.TestCase):
 class TestCommitIsRemediationCommit(unittest.TestCase):
 
     def _commit_with_config(self, individual=False, thirdparty=False):
-        mock_repo = _make_mock_repo(tree_raises_key_error=False)
         flags = {}
         if individual:
             flags['individual'] = True
         if thirdparty:
             flags['thirdParty'] = True
         dco_yml = f"allowRemediationCommits:\n  individual: {str(individual).lower()}\n  thirdParty: {str(thirdparty).lower()}\n"
-        mock_blob = Mock()
-        mock_blob.abspath = "/fake/dco.yml"
-        mock_repo.git_repo_object.head.commit.tree.__getitem__ = Mock(return_value=mock_blob)
-        with patch("builtins.open", mock_open(read_data=dco_yml)):
-            commit = _make_commit(mock_repo=mock_repo)
-        return commit
+        return _make_commit(mock_repo=_make_mock_repo(dco_yml.encode()))
 
     def test_no_config_not_remediation(self):
         commit = _make_commit()
@@ -234,6 +220,24 @@ class TestCommitIsRemediationCommit(unittest.TestCase):
         self.assertTrue(commit.is_remediation_commit())
         self.assertIn("def5678", commit.remediations)
 
+    def test_no_debug_calls_when_debug_disabled(self):
+        commit = self._commit_with_config(individual=True, thirdparty=True)
+        commit.git_commit_object.message = "I, Jane Doe <jane@example.com>, hereby add my Signed-off-by to this commit: abc1234"
+        commit.git_commit_object.author.name = "Jane Doe"
+        commit.git_commit_object.author.email = "jane@example.com"
+        with patch('logging.Logger.isEnabledFor', return_value=False), patch('logging.Logger.debug') as mock_debug:
+            self.assertTrue(commit.is_remediation_commit())
+        mock_debug.assert_not_called()
+
+    def test_remediation_of_too_short_hash_ignored(self):
+        commit = self._commit_with_config(individual=True)
+        commit.git_commit_object.message = "I, Jane Doe <jane@example.com>, hereby add my Signed-off-by to this commit: a"
+        commit.git_commit_object.author.name = "Jane Doe"
+        commit.git_commit_object.author.email = "jane@example.com"
+        with self.assertLogs(level='WARNING'):
+            self.assertFalse(commit.is_remediation_commit())
+        self.assertEqual(commit.remediations, [])
+
     def test_thirdparty_remediation_wrong_author(self):
         commit = self._commit_with_config(thirdparty=True)
         commit.git_commit_object.message = (
@@ -245,5 +249,44 @@ class TestCommitIsRemediationCommit(unittest.TestCase):
         self.assertFalse(commit.is_remediation_commit())
 
 
+class TestCommitRecord(unittest.TestCase):
+
+    def _git_commit(self):
+        git_commit = Mock()
+        git_commit.hexsha = "a" * 40
+        git_commit.message = "fix: thing"
+        git_commit.author.name = "Jane"
+        git_commit.author.email = "jane@example.com"
+        git_commit.authored_datetime = "2024-01-01"
+        git_commit.parents = ["b" * 40, "c" * 40]
+        return git_commit
+
+    def test_from_git_commit_copies_fields(self):
+        record = CommitRecord.from_git_commit(self._git_commit())
+        self.assertEqual(record.hexsha, "a" * 40)
+        self.assertEqual(record.author.name, "Jane")
+        self.assertEqual(record.author.email, "jane@example.com")
+        self.assertEqual(record.parents, ("b" * 40, "c" * 40))
+
+    def test_record_is_slotted(self):
+        record = CommitRecord.from_git_commit(self._git_commit())
+        with self.assertRaises(AttributeError):
+            record.extra = True
+
+    def test_commit_accepts_record_and_config(self):
+        record = CommitRecord.from_git_commit(self._git_commit())
+        with patch.object(Commit, 'read_remediation_commit_config') as mock_read_config:
+            commit = Commit(record, Mock(), (True, False))
+        self.assertTrue(commit.is_merge_commit)
+        self.assertTrue(commit.allow_remediation_commit_individual)
+        self.assertFalse(commit.allow_remediation_commit_thirdparty)
+        mock_read_config.assert_not_called()
+
+    def test_remediations_are_not_shared_between_commits(self):
+        first = _make_commit()
+        first.remediations.append("abc1234")
+        self.assertEqual(_make_commit().remediations, [])
+
+
 if __name__ == '__main__':
     unittest.main()
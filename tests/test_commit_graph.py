@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+#
+# Commit-graphs written into clones, and a benchmark of the history walks a scan makes with and without one. The
+# benchmark repo is small by default so the suite stays quick; set CONTRIB_CHECK_GRAPH_COMMITS ( e.g. to 500000 )
+# to measure a deep history.
+
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import git
+
+from contrib_check.progress import ScanProgress
+from contrib_check.repo import Repo, clone_bare, write_commit_graph
+
+from .gitfixtures import make_git_repo, record_results
+
+GRAPH_COMMITS = int(os.environ.get('CONTRIB_CHECK_GRAPH_COMMITS', '3000'))
+
+def _git(path: str, *args) -> str:
+    return subprocess.run(["git", *args], cwd=path, capture_output=True, text=True, check=True).stdout.strip()
+
+class TestWriteCommitGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.source = make_git_repo(os.path.join(self.tmpdir, "source"), 20)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_graph_updated_after_fetch(self):
+        clone = clone_bare(self.source, os.path.join(self.tmpdir, "clone"), no_local=True)
+        write_commit_graph(clone, multi_pack_index=True)
+        graph_dir = os.path.join(clone.git_dir, "objects", "info", "commit-graphs")
+        self.assertTrue(os.path.isfile(os.path.join(graph_dir, "commit-graph-chain")))
+        # a single pack has no need of a multi-pack-index
+        self.assertFalse(os.path.exists(os.path.join(clone.git_dir, "objects", "pack", "multi-pack-index")))
+
+        _git(self.source, "-c", "user.name=Dev", "-c", "user.email=dev@example.com", "commit", "-q", "--allow-empty", "-m", "new")
+        _git(clone.git_dir, "-c", "fetch.unpackLimit=1", "fetch", "-q", "origin", "+refs/heads/*:refs/heads/*")
+        write_commit_graph(clone, multi_pack_index=True)
+        self.assertTrue(os.path.isfile(os.path.join(clone.git_dir, "objects", "pack", "multi-pack-index")))
+        clone.git.commit_graph('verify')
+        # the graph now covers the fetched commit, so writing it again has nothing to add
+        self.assertEqual(_git(clone.git_dir, "commit-graph", "write", "--reachable", "--split", "--no-progress"), "")
+
+    def test_clones_get_a_graph(self):
+        with patch('contrib_check.repo.clone_bare', side_effect=lambda url, path, *args: clone_bare(self.source, path)):
+            repo = Repo("https://github.com/foo/bar", clone_progress=False)
+        self.assertTrue(os.path.isdir(os.path.join(repo.git_repo_object.git_dir, "objects", "info", "commit-graphs")))
+        repo.close()
+
+    def test_failure_only_logged(self):
+        clone = clone_bare(self.source, os.path.join(self.tmpdir, "clone"))
+        with patch.object(type(clone.git), 'commit_graph', create=True, side_effect=git.GitCommandError("commit-graph", 129)):
+            with self.assertLogs(level='WARNING'):
+                write_commit_graph(clone)
+
+
+class TestCommitGraphWalks(unittest.TestCase):
+    """Times the walks a scan makes, over a clone of a deep history, with git told to ignore the commit-graph and
+    then to use it."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        source = make_git_repo(os.path.join(cls.tmpdir, "source"), GRAPH_COMMITS)
+        cls.clone = clone_bare(source, os.path.join(cls.tmpdir, "clone"))
+        # the scan window is the newest tenth of the history
+        cls.since_commit = _git(cls.clone.git_dir, "rev-parse", f"HEAD~{GRAPH_COMMITS // 10}")
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir, ignore_errors=True)
+
+    def _walks(self) -> tuple[dict, dict]:
+        """Runs each walk, returning what each found and how long it took."""
+        rev_list = self.clone.git.rev_list
+        walks = {
+            'count': lambda: rev_list('HEAD', count=True, no_merges=True),
+            'count_since_commit': lambda: rev_list(f"{self.since_commit}..HEAD", count=True, no_merges=True),
+            'remediation_candidates': lambda: rev_list('HEAD', no_merges=True, grep='hereby', regexp_ignore_case=True),
+            'scan': self._scan,
+        }
+        found, seconds = {}, {}
+        for name, walk in walks.items():
+            start_time = time.perf_counter()
+            found[name] = walk()
+            seconds[name] = round(time.perf_counter() - start_time, 4)
+        return found, seconds
+
+    def _scan(self) -> int:
+        repo = Repo(self.clone.git_dir)
+        failures = sum(1 for _ in repo.iter_scan(progress=ScanProgress(enabled=False)))
+        repo.close()
+        return failures
+
+    def test_walks_with_and_without_graph(self):
+        _git(self.clone.git_dir, "config", "core.commitGraph", "false")
+        found_without, seconds_without = self._walks()
+        _git(self.clone.git_dir, "config", "core.commitGraph", "true")
+        write_commit_graph(self.clone)
+        found_with, seconds_with = self._walks()
+
+        self.assertEqual(found_with, found_without)
+        self.assertEqual(int(found_with['count']), GRAPH_COMMITS)
+        results = { 'test': "commit-graph", 'commits': GRAPH_COMMITS, 'seconds_without_graph': seconds_without, 'seconds_with_graph': seconds_with }
+        record_results(results)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+
+import os
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from contrib_check.github_api import GitHubApi, GitHubApiError, RateLimitError
+from contrib_check.org import Org
+
+from .githubstub import GitHubStub
+
+class TestGitHubApi(unittest.TestCase):
+
+    def setUp(self):
+        self.stub = GitHubStub().__enter__()
+        for i in range(25):
+            self.stub.add_org_repo("my-org", f"repo{i}", size=i, archived=(i == 3))
+        self.api = GitHubApi(token="token", api_url=self.stub.url, pool_size=4)
+
+    def tearDown(self):
+        self.api.close()
+        self.stub.__exit__(None, None, None)
+
+    def test_pages_followed(self):
+        repos = list(self.api.iter_pages("/orgs/my-org/repos", per_page=10))
+        self.assertEqual([repo['name'] for repo in repos], [f"repo{i}" for i in range(25)])
+        self.assertEqual(self.api.stats()['rest'][0], 3)
+
+    def test_one_connection_kept_alive(self):
+        for _ in range(5):
+            self.api.get("/orgs/my-org/repos")
+        self.assertEqual(len(self.stub.connections), 1)
+
+    def test_shared_across_threads(self):
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(lambda _: self.api.get("/orgs/my-org/repos"), range(32)))
+        self.assertTrue(all(len(result) == 25 for result in results))
+        # every request is counted, and no more connections are opened than the pool holds
+        calls, seconds = self.api.stats()['rest']
+        self.assertEqual(calls, 32)
+        self.assertGreater(seconds, 0)
+        self.assertLessEqual(len(self.stub.connections), 4)
+
+    def test_errors(self):
+        self.stub.failures.append((403, { 'message': 'API rate limit exceeded' }, { 'X-RateLimit-Remaining': '0' }))
+        with self.assertRaises(RateLimitError):
+            self.api.get("/orgs/my-org/repos")
+        self.stub.failures.append((502, { 'message': 'Bad Gateway' }))
+        with self.assertRaises(GitHubApiError) as context:
+            list(self.api.iter_pages("/orgs/my-org/repos"))
+        self.assertEqual(context.exception.status, 502)
+        self.assertIsNone(self.api.get("/no/such/path"))
+
+    def test_graphql_errors(self):
+        self.stub.failures.append((200, { 'errors': [ { 'message': 'Something went wrong' } ] }))
+        with self.assertRaises(GitHubApiError):
+            self.api.graphql("query { viewer { login } }")
+        self.assertEqual(self.api.stats(), { 'graphql': (1, self.api.stats()['graphql'][1]) })
+
+    def test_org_lists_repos_through_shared_client(self):
+        with patch.dict(os.environ, { 'GITHUB_TOKEN': 'token' }), patch('contrib_check.org.time.sleep'):
+            self.stub.failures.append((502, { 'message': 'Bad Gateway' }))
+            org = Org("https://github.com/my-org", github_api=self.api)
+        self.assertEqual(len(org.repos), 24)
+        self.assertEqual(org.repos[0].html_url, "https://github.com/my-org/repo0")
+        self.assertEqual(org.repos[-1].size, 24)
+        self.assertEqual(self.api.stats()['rest'][0], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -26,10 +26,10 @@ class TestGitRemoteProgressCoverage(unittest.TestCase):
         # Verify the calculation fell back to 100.0 safely (50 / 100.0 = 0.5)
         progress.bar.assert_called_once_with(0.5)
 
-    @patch('contrib_check.repo.alive_bar')
+    @patch('alive_progress.alive_bar')
     def test_progress_lifecycle_and_missing_bar_guard(self, mock_alive_bar):
         """Tests the full BEGIN/END cycle and explicitly covers the missing bar guard path."""
-        progress = GitRemoteProgress()
+        progress = GitRemoteProgress(enabled=True)
 
         # Scenario A: Update is called WITHOUT a BEGIN flag while progress.bar is uninitialized.
         # This forces 'if self.bar:' to evaluate to False, clearing that branch gap.
@@ -47,6 +47,27 @@ class TestGitRemoteProgressCoverage(unittest.TestCase):
         self.assertIsNone(progress.bar)
         self.assertIsNone(progress.alive_bar_instance)
 
+    @patch('alive_progress.alive_bar')
+    def test_no_bar_when_not_a_tty(self, mock_alive_bar):
+        """Progress is turned off automatically when stdout isn't a terminal."""
+        with patch('sys.stdout.isatty', return_value=False):
+            progress = GitRemoteProgress()
+        progress.update(op_code=git.RemoteProgress.BEGIN, cur_count=0, max_count=100, message="Starting")
+        self.assertIsNone(progress.bar)
+        mock_alive_bar.assert_not_called()
+
+    def test_updates_are_throttled(self):
+        """Only the first of a burst of callbacks renders; END always renders."""
+        progress = GitRemoteProgress(enabled=True)
+        progress.bar = MagicMock()
+        for count in range(100):
+            progress.update(op_code=git.RemoteProgress.RECEIVING, cur_count=count, max_count=100, message="")
+        self.assertEqual(progress.bar.call_count, 1)
+
+        bar = progress.bar
+        progress.update(op_code=git.RemoteProgress.END, cur_count=100, max_count=100, message="Done")
+        bar.assert_called_with(1.0)
+
     def test_get_curr_op_unknown_code(self):
         """Verifies the fallback title parsing behavior when an unexpected op code hits."""
         # Mix an out-of-bounds op_code value
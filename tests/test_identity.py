@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+from contrib_check.identity import IdentityIndex
+from contrib_check.repo import Repo
+
+from .gitfixtures import make_git_repo
+
+MAILMAP = b"""# people who have changed name or email
+Jane Doe <jane@example.com>
+<jane@example.com> <jane@old-employer.com>
+Jane Doe <jane@example.com> J. Doe <jdoe@example.com>
+Robert Smith <bob@acme.com> Bob <BOB@ACME.COM>
+"""
+
+class TestIdentityIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = IdentityIndex.from_mailmap(MAILMAP)
+
+    def test_canonical(self):
+        # a proper name only
+        self.assertEqual(self.index.canonical("jane", "jane@example.com"), ("Jane Doe", "jane@example.com"))
+        # a proper email only, matched case-insensitively; the name comes from the other line for that email
+        self.assertEqual(self.index.canonical("Jane", "Jane@Old-Employer.com"), ("Jane", "jane@example.com"))
+        # name and email, matched on both
+        self.assertEqual(self.index.canonical("J.  Doe", "jdoe@example.com"), ("Jane Doe", "jane@example.com"))
+        self.assertEqual(self.index.canonical("Someone Else", "jdoe@example.com"), ("Someone Else", "jdoe@example.com"))
+        self.assertEqual(self.index.canonical("Nobody", "nobody@example.com"), ("Nobody", "nobody@example.com"))
+
+    def test_same(self):
+        self.assertTrue(self.index.same("Jane Doe", "jane@example.com", "J. Doe", "jdoe@example.com"))
+        self.assertTrue(self.index.same("Robert Smith", "bob@acme.com", "bob", "bob@acme.com"))
+        self.assertFalse(self.index.same("Jane Doe", "jane@example.com", "Not Jane", "other@example.com"))
+        self.assertFalse(self.index.same("Robert Smith", "bob@acme.com", "Bob", "notbob@acme.com"))
+
+    def test_names_and_emails_normalized_without_mailmap(self):
+        index = IdentityIndex.from_mailmap(None)
+        self.assertTrue(index.same("José  Núñez", "Jose@Example.com", "josé núñez", "jose@example.com"))
+        self.assertFalse(index.same("Jose Nunez", "jose@example.com", "José Núñez", "jose@example.com"))
+
+
+class TestRepoIdentities(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        # Dev 1 has since become Devon One at a new address, and attests to their old unsigned commits as that
+        self.path = make_git_repo(
+            os.path.join(self.tmpdir, "repo"), 10, signed_every=2,
+            files={
+                ".github/dco.yml": "allowRemediationCommits:\n  individual: true\n",
+                ".mailmap": "Devon One <devon@example.org> Dev 1 <dev1@example.com>\n",
+            }
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_remediation_by_renamed_author(self):
+        repo = Repo(self.path)
+        unsigned = next(commit for commit in repo.git_repo_object.iter_commits() if commit.author.email == "dev1@example.com")
+        subprocess.run([
+            "git", "-c", "user.name=Devon One", "-c", "user.email=devon@example.org", "commit", "--allow-empty", "-q",
+            "-m", f"I, Devon One <devon@example.org>, hereby add my Signed-off-by to this commit: {unsigned.hexsha[:7]}"
+        ], cwd=self.path, check=True)
+        repo.load_remediation_commits()
+        self.assertEqual(repo.remediations, { unsigned.hexsha[:7] })
+        repo.close()
+
+    def test_remediation_output_under_canonical_identity(self):
+        repo = Repo(self.path)
+        repo.output_dir = Path(self.tmpdir)
+        repo.remediation_commits_dir = os.path.join(self.tmpdir, "remediation-commits")
+        repo.scan()
+        repo.close()
+        with open(os.path.join(repo.remediation_commits_dir, "repo-Devon One.txt")) as fh:
+            self.assertTrue(fh.read().startswith("DCO Remediation Commit for Devon One <devon@example.org>\n"))
+        self.assertFalse(os.path.exists(os.path.join(repo.remediation_commits_dir, "repo-Dev 1.txt")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+#
+# Guards CLI startup cost: heavy third party modules should only load on the code paths that use them. The import
+# time itself is measured against GitPython's in the same process, rather than against a wall-clock budget, so a slow
+# or busy machine slows both alike.
+
+import ast
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from .gitfixtures import make_git_repo, record_results
+
+HEAVY_MODULES = ('requests', 'git', 'yaml', 'alive_progress')
+
+def _run_python(code: str, *args: str, cwd: str | None = None) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return subprocess.run(
+        [sys.executable, *args, "-c", code], capture_output=True, text=True, check=True, env=env, cwd=cwd
+    )
+
+def _loaded_heavy_modules(code: str, cwd: str | None = None) -> list[str]:
+    result = _run_python(code + f"\nimport sys\nprint([m for m in {HEAVY_MODULES!r} if m in sys.modules])", cwd=cwd)
+    return ast.literal_eval(result.stdout.strip().splitlines()[-1])
+
+class TestImportTime(unittest.TestCase):
+
+    def test_importing_main_loads_no_heavy_modules(self):
+        self.assertEqual(_loaded_heavy_modules("import contrib_check.main"), [])
+
+    def test_help_loads_no_heavy_modules(self):
+        code = "import contrib_check.main\ntry:\n    contrib_check.main.main(['--help'])\nexcept SystemExit:\n    pass"
+        self.assertEqual(_loaded_heavy_modules(code), [])
+
+    def test_local_repo_scan_does_not_load_github_client(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = make_git_repo(os.path.join(tmpdir, "repo"), 3, signed_every=1)
+            code = (
+                "import contrib_check.main\n"
+                f"contrib_check.main.main(['--repo', {path!r}, '-o', {tmpdir!r}, '--logfile', {os.path.join(tmpdir, 'debug.log')!r}])"
+            )
+            loaded = _loaded_heavy_modules(code, cwd=tmpdir)
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+        self.assertNotIn('requests', loaded)
+        self.assertNotIn('alive_progress', loaded)
+
+    def test_import_time_against_gitpython(self):
+        # git first, so the standard library modules both use are charged to it and not to contrib_check.main
+        result = _run_python("import git\nimport contrib_check.main", "-X", "importtime")
+        cumulative = {
+            module: int(re.search(rf"\|\s+(\d+)\s+\|\s+{re.escape(module)}$", result.stderr, re.M).group(1))
+            for module in ('git', 'contrib_check.main')
+        }
+        record_results({ 'test': "import-time", 'microseconds': cumulative })
+        # the CLI's own imports should cost less than the one heavy module every scan needs anyway
+        self.assertLess(cumulative['contrib_check.main'], cumulative['git'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from contrib_check.journal import RunJournal
+
+class TestRunJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "journal.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_record_is_on_disk_immediately(self):
+        journal = RunJournal(self.path)
+        journal.record("https://github.com/foo/bar", name="bar")
+        with open(self.path) as fh:
+            entry = json.loads(fh.readline())
+        journal.close()
+        self.assertEqual(entry['repo'], "https://github.com/foo/bar")
+        self.assertEqual(entry['name'], "bar")
+        self.assertIn('completed_at', entry)
+
+    def test_resume_loads_completed(self):
+        journal = RunJournal(self.path)
+        journal.record("https://github.com/foo/bar")
+        journal.close()
+
+        journal = RunJournal(self.path, resume=True)
+        self.assertTrue(journal.is_complete("https://github.com/foo/bar"))
+        self.assertFalse(journal.is_complete("https://github.com/foo/baz"))
+        journal.close()
+
+    def test_without_resume_starts_fresh(self):
+        journal = RunJournal(self.path)
+        journal.record("https://github.com/foo/bar")
+        journal.close()
+
+        journal = RunJournal(self.path)
+        journal.close()
+        journal = RunJournal(self.path, resume=True)
+        self.assertFalse(journal.is_complete("https://github.com/foo/bar"))
+        journal.close()
+
+    def test_torn_last_line_ignored(self):
+        with open(self.path, 'w') as fh:
+            fh.write(json.dumps({ 'repo': "https://github.com/foo/bar" }) + '\n')
+            fh.write('{"repo": "https://github.com/fo')
+
+        with self.assertLogs(level='WARNING'):
+            journal = RunJournal(self.path, resume=True)
+        journal.record("https://github.com/foo/baz")
+        journal.close()
+
+        journal = RunJournal(self.path, resume=True)
+        self.assertEqual(set(journal.completed), { "https://github.com/foo/bar", "https://github.com/foo/baz" })
+        journal.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+#
+# End-to-end org scans against the fake GitHub API, listing many small local repos, to measure throughput and API
+# use and to check the pipeline holds up under latency, server errors and rate limits. The org is small by default
+# so the suite stays quick; set CONTRIB_CHECK_LOAD_REPOS ( e.g. to 5000 ) for a real load test.
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from contrib_check.main import main
+from contrib_check.summary import SUMMARY_FILENAME
+
+from .gitfixtures import make_git_repos, record_results
+from .githubstub import GitHubStub
+
+REPO_COUNT = int(os.environ.get('CONTRIB_CHECK_LOAD_REPOS', '120'))
+COMMIT_COUNTS = (5, 20, 50)
+# the org listing is paged 100 repos at a time
+PAGE_COUNT = -(-REPO_COUNT // 100)
+
+class TestOrgScanLoad(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.mkdtemp()
+        cls.repo_paths = make_git_repos(os.path.join(cls.tmpdir, "repos"), REPO_COUNT, COMMIT_COUNTS)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmpdir, ignore_errors=True)
+
+    def setUp(self):
+        self.stub = GitHubStub().__enter__()
+        for i, path in enumerate(self.repo_paths):
+            self.stub.add_org_repo("load-org", f"repo{i}", size=COMMIT_COUNTS[i % len(COMMIT_COUNTS)], html_url=path)
+        self.output_dir = tempfile.mkdtemp(dir=self.tmpdir)
+        self.environ = patch.dict(os.environ, { 'GITHUB_TOKEN': "token", 'GITHUB_API_URL': self.stub.url })
+        self.environ.start()
+
+    def tearDown(self):
+        self.environ.stop()
+        self.stub.__exit__(None, None, None)
+
+    def _scan(self, name: str, *extra_args: str) -> dict:
+        """Runs an org scan from the command line, returning its measurements."""
+        start_time = time.monotonic()
+        main([
+            '--org', "https://github.com/load-org", '-o', self.output_dir,
+            '--logfile', os.path.join(self.output_dir, "debug.log"), *extra_args
+        ])
+        seconds = time.monotonic() - start_time
+        with open(os.path.join(self.output_dir, "contrib-check-journal.jsonl")) as fh:
+            entries = [ json.loads(line) for line in fh ]
+        results = {
+            'test': name,
+            'repos': len(entries),
+            'commits': sum(entry['commits'] for entry in entries),
+            'seconds': round(seconds, 2),
+            'repos_per_second': round(len(entries) / seconds, 1),
+            'api_calls': len(self.stub.calls),
+        }
+        record_results(results)
+        return results
+
+    def _expected_commits(self, repo_count: int = REPO_COUNT) -> int:
+        return sum(COMMIT_COUNTS[i % len(COMMIT_COUNTS)] for i in range(repo_count))
+
+    def test_org_scan_throughput(self):
+        results = self._scan("throughput", '--parallel-repos', '4')
+
+        self.assertEqual(results['repos'], REPO_COUNT)
+        self.assertEqual(results['commits'], self._expected_commits())
+        # listing the org is the only API use when repos are cloned, one call per page
+        self.assertEqual(results['api_calls'], PAGE_COUNT)
+        with open(os.path.join(self.output_dir, SUMMARY_FILENAME)) as fh:
+            self.assertEqual(len(json.load(fh)['repos']), REPO_COUNT)
+
+    @patch('contrib_check.org.time.sleep')
+    def test_listing_recovers_from_server_errors_and_rate_limits(self, mock_sleep):
+        self.stub.failures.append((502, { 'message': 'Bad Gateway' }))
+        # then rate limited on the last page of the listing, which starts over once the limit has passed
+        self.stub.rate_limit(after=PAGE_COUNT, count=1)
+        results = self._scan("errors", '--parallel-repos', '4', '--retries', '3')
+
+        self.assertEqual(results['repos'], REPO_COUNT)
+        self.assertEqual(results['api_calls'], 1 + PAGE_COUNT + PAGE_COUNT)
+        delays = [ call.args[0] for call in mock_sleep.call_args_list ]
+        self.assertEqual(len(delays), 2)
+        self.assertEqual(delays[1], 60)
+
+    @patch('contrib_check.org.time.sleep')
+    def test_listing_gives_up_after_retries(self, mock_sleep):
+        self.stub.rate_limit(count=3)
+        with self.assertLogs(level='ERROR') as logs:
+            results = self._scan("gave-up", '--retries', '2')
+
+        self.assertEqual(results['repos'], 0)
+        self.assertEqual(results['api_calls'], 3)
+        self.assertTrue(any("Giving up loading repos for load-org" in line for line in logs.output))
+
+    def test_remote_scan_under_latency(self):
+        # a remote scan reads each repo's history and files through the API, so latency is felt on every repo
+        remote_count = min(REPO_COUNT, 24)
+        self.stub.org_repos.clear()
+        for i, path in enumerate(self.repo_paths[:remote_count]):
+            self.stub.add_repo("load-org", f"repo{i}", path)
+            self.stub.add_org_repo("load-org", f"repo{i}")
+        self.stub.latency = 0.02
+
+        results = self._scan("remote-latency", '--remote-scan', '--parallel-repos', '8', '--github-pool-size', '8')
+
+        self.assertEqual(results['repos'], remote_count)
+        self.assertEqual(results['commits'], self._expected_commits(remote_count))
+        graphql_calls = sum(1 for method, _, _ in self.stub.calls if method == 'POST')
+        # every repo here fits in a single page of history
+        self.assertEqual(graphql_calls, remote_count)
+        # repos are scanned eight at a time, so the run takes far less than every request made one after another
+        self.assertLess(results['seconds'], results['api_calls'] * self.stub.latency)
+        self.assertGreater(len(self.stub.connections), 1)
+        self.assertLessEqual(len(self.stub.connections), 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
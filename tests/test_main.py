@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+
+import logging
+import logging.handlers
+import os
+import shutil
+import tempfile
+import unittest
+from argparse import Namespace
+from unittest.mock import MagicMock, patch
+
+from contrib_check.main import setup_logging, run_org
+from contrib_check.org import OrgRepo
+
+class TestMainLogging(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.root_handlers = logging.getLogger().handlers[:]
+        self.root_level = logging.getLogger().level
+        logging.getLogger().handlers = []
+
+    def tearDown(self):
+        logging.getLogger().handlers = self.root_handlers
+        logging.getLogger().setLevel(self.root_level)
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_logs_through_queue_to_file(self):
+        logfile = os.path.join(self.tmpdir, "debug.log")
+        listener = setup_logging('info', logfile)
+        try:
+            self.assertIsInstance(logging.getLogger().handlers[0], logging.handlers.QueueHandler)
+            logging.getLogger().info("queued %s", "message")
+        finally:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+
+        with open(logfile) as fh:
+            content = fh.read()
+        self.assertIn("[INFO] queued message", content)
+
+    def test_clones_announced_at_default_level(self):
+        logfile = os.path.join(self.tmpdir, "debug.log")
+        listener = setup_logging('error', logfile)
+        try:
+            logging.getLogger().info("not shown")
+            logging.getLogger('contrib_check.clone').info("Cloning repo %s", "https://github.com/foo/bar")
+        finally:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+            logging.getLogger('contrib_check.clone').setLevel(logging.NOTSET)
+
+        with open(logfile) as fh:
+            content = fh.read()
+        self.assertNotIn("not shown", content)
+        self.assertIn("[INFO] Cloning repo https://github.com/foo/bar", content)
+
+
+def _scanned_repo():
+    return MagicMock(commit_count=1, error_counts={}, summary_file=None)
+
+class TestMainRunOrg(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _args(self, **kwargs):
+        defaults = dict(
+            org="my-org", org_type="github", only_repos=None, ignore_repos=None, skip_archived_repos=False,
+            parallel_repos=1, dco_skip=False, dco_signoff_dirs="dco-signoffs", dco_start_date=None,
+            dco_start_commit=None, output_dir=self.tmpdir, jobs=1, log_each_error=False, resume=False, journal=None,
+            retries=0, clone_timeout=None, scan_timeout=None, shard=None, remote_scan=False,
+            dco_end_date=None, dco_author=None, check=None, allowed_email_domains=None,
+            profile=None, profile_top=20, output_compression=None, output_max_size=None, message_column="full"
+        )
+        defaults.update(kwargs)
+        return Namespace(**defaults)
+
+    @patch('contrib_check.repo.Repo')
+    @patch('contrib_check.org.Org')
+    def test_largest_repos_scanned_first(self, mock_org_class, mock_repo_class):
+        mock_repo_class.return_value = _scanned_repo()
+        mock_org_class.return_value.repos = [
+            OrgRepo("small", "https://github.com/my-org/small", 10),
+            OrgRepo("huge", "https://github.com/my-org/huge", 500000),
+            OrgRepo("medium", "https://github.com/my-org/medium", 3000),
+        ]
+        results_store = MagicMock()
+        # the previous run found the small repo has far more history than its size suggests
+        results_store.commit_counts.return_value = { "small": 10000000 }
+
+        with self.assertLogs(level='INFO') as logs:
+            run_org(self._args(), results_store)
+
+        cloned = [call.args[0] for call in mock_repo_class.call_args_list]
+        self.assertEqual(cloned, [
+            "https://github.com/my-org/small", "https://github.com/my-org/huge", "https://github.com/my-org/medium"
+        ])
+        self.assertTrue(any("predicted makespan" in line for line in logs.output))
+
+    @patch('contrib_check.repo.Repo')
+    @patch('contrib_check.org.Org')
+    def test_only_repos_split_into_list(self, mock_org_class, mock_repo_class):
+        mock_org_class.return_value.repos = []
+        run_org(self._args(only_repos="a,b"), None)
+        self.assertEqual(mock_org_class.call_args.kwargs['only_repos'], ['a', 'b'])
+
+    @patch('contrib_check.repo.Repo')
+    @patch('contrib_check.org.Org')
+    def test_resume_skips_finished_repos(self, mock_org_class, mock_repo_class):
+        mock_org_class.return_value.repos = [
+            OrgRepo("first", "https://github.com/my-org/first"),
+            OrgRepo("second", "https://github.com/my-org/second"),
+        ]
+        mock_repo_class.return_value = _scanned_repo()
+        # the interrupted run only got through the first repo
+        mock_repo_class.return_value.scan.side_effect = [None, KeyboardInterrupt]
+        with self.assertRaises(KeyboardInterrupt):
+            run_org(self._args(), None)
+
+        mock_repo_class.reset_mock()
+        mock_repo_class.return_value.scan.side_effect = None
+        run_org(self._args(resume=True), None)
+        self.assertEqual([call.args[0] for call in mock_repo_class.call_args_list], ["https://github.com/my-org/second"])
+
+
+    @patch('time.sleep')
+    @patch('contrib_check.repo.Repo')
+    @patch('contrib_check.org.Org')
+    def test_failing_repos_retried_then_summarized(self, mock_org_class, mock_repo_class, mock_sleep):
+        from git import GitCommandError
+
+        mock_org_class.return_value.repos = [
+            OrgRepo("flaky", "https://github.com/my-org/flaky"),
+            OrgRepo("broken", "https://github.com/my-org/broken"),
+            OrgRepo("fine", "https://github.com/my-org/fine"),
+        ]
+        clone_results = {
+            "https://github.com/my-org/flaky": [GitCommandError("clone", 128), _scanned_repo()],
+            "https://github.com/my-org/broken": [GitCommandError("clone", 128)] * 3,
+        }
+        def clone(url, **kwargs):
+            results = clone_results.get(url)
+            result = results.pop(0) if results else _scanned_repo()
+            if isinstance(result, Exception):
+                raise result
+            return result
+        mock_repo_class.side_effect = clone
+
+        with self.assertLogs(level='ERROR') as logs:
+            failures = run_org(self._args(retries=2), None)
+
+        self.assertEqual([org_repo.name for org_repo, _ in failures], ["broken"])
+        self.assertEqual(mock_sleep.call_count, 3)
+        self.assertTrue(any("Failed to scan 1 of 3 repos" in line for line in logs.output))
+        self.assertTrue(any("https://github.com/my-org/broken: GitCommandError" in line for line in logs.output))
+        # the broken repo isn't recorded as done, so --resume tries it again
+        with open(os.path.join(self.tmpdir, "contrib-check-journal.jsonl")) as fh:
+            self.assertNotIn("broken", fh.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,23 +7,26 @@
 #
 
 import os
+import shutil
+import socket
+import subprocess
+import tempfile
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, call, patch
 
-from github import RateLimitExceededException, GithubException
+from contrib_check.github_api import GitHubApiError, RateLimitError
+from contrib_check.org import Org, OrgRepo
+from contrib_check.repo import Repo
 
-from contrib_check.org import Org
+from .gitfixtures import make_git_repo
 
 class TestOrgCoverage(unittest.TestCase):
 
     def setUp(self):
-        # Seed the token environment variable required by the setter validation
-        os.environ['GITHUB_TOKEN'] = 'fake_secure_token'
-
-    def tearDown(self):
-        # Clear it out so it doesn't pollute real execution states
-        if 'GITHUB_TOKEN' in os.environ:
-            del os.environ['GITHUB_TOKEN']
+        # Seed the token environment variable required by the setter validation, restoring the real one afterwards
+        environ = patch.dict(os.environ, { 'GITHUB_TOKEN': 'fake_secure_token' })
+        environ.start()
+        self.addCleanup(environ.stop)
 
     def test_init_missing_token_exception(self):
         """Verifies an explicit error is raised if GITHUB_TOKEN is absent."""
@@ -42,9 +45,8 @@ class TestOrgCoverage(unittest.TestCase):
         self.assertEqual(result, [])
         mock_get_repos.assert_not_called()
 
-    @patch('contrib_check.org.Repo')
     @patch('contrib_check.org.Org._get_github_repos_for_org')
-    def test_reload_repos_filters_and_loops(self, mock_get_repos, mock_repo_class):
+    def test_reload_repos_filters_and_loops(self, mock_get_repos):
         """Exercises every loop condition inside reload_repos (ignore, only, and archived filters)."""
         mock_repo_1 = MagicMock()
         mock_repo_1.name = "ignored-project"
@@ -62,6 +64,7 @@ class TestOrgCoverage(unittest.TestCase):
         mock_repo_4.name = "valid-project"
         mock_repo_4.archived = False
         mock_repo_4.html_url = "https://github.com/my-org/valid-project"
+        mock_repo_4.size = 1234
 
         mock_get_repos.return_value = [mock_repo_1, mock_repo_2, mock_repo_3, mock_repo_4]
 
@@ -72,17 +75,16 @@ class TestOrgCoverage(unittest.TestCase):
             skip_archived=True
         )
 
-        self.assertEqual(len(org.repos), 1)
-        mock_repo_class.assert_called_once_with("https://github.com/my-org/valid-project")
+        self.assertEqual(org.repos, [OrgRepo("valid-project", "https://github.com/my-org/valid-project", 1234)])
 
-    @patch('contrib_check.org.Repo')
     @patch('contrib_check.org.Org._get_github_repos_for_org')
-    def test_reload_repos_include_archived_when_disabled(self, mock_get_repos, mock_repo_class):
+    def test_reload_repos_include_archived_when_disabled(self, mock_get_repos):
         """Fixes 72 ↛ 73: Verifies archived repos are NOT skipped if skip_archived=False."""
         mock_archived_repo = MagicMock()
         mock_archived_repo.name = "old-archived-project"
         mock_archived_repo.archived = True
         mock_archived_repo.html_url = "https://github.com/my-org/old-archived-project"
+        mock_archived_repo.size = 10
 
         mock_get_repos.return_value = [mock_archived_repo]
 
@@ -91,31 +93,132 @@ class TestOrgCoverage(unittest.TestCase):
 
         # The archived repo should bypass the filter and be added cleanly
         self.assertEqual(len(org.repos), 1)
-        mock_repo_class.assert_called_once_with("https://github.com/my-org/old-archived-project")
+        self.assertEqual(org.repos[0].html_url, "https://github.com/my-org/old-archived-project")
 
     @patch('contrib_check.org.Org._get_github_repos_for_org')
     def test_reload_repos_rate_limiting_exception(self, mock_get_repos):
         """Triggers the API rate limit handler block."""
-        mock_get_repos.side_effect = RateLimitExceededException(status=403, data="Rate limit hit", headers={})
+        mock_get_repos.side_effect = RateLimitError(status=403, data="Rate limit hit", headers={})
 
         with patch('time.sleep') as mock_sleep:
-            org = Org("my-org")
-            mock_sleep.assert_called_once_with(60)
+            org = Org("my-org", retries=2)
+            self.assertEqual(mock_sleep.call_args_list, [call(60), call(60)])
+            self.assertEqual(mock_get_repos.call_count, 3)
             self.assertEqual(org.repos, [])
 
     @patch('contrib_check.org.Org._get_github_repos_for_org')
     def test_reload_repos_server_error_502_exception(self, mock_get_repos):
-        """Triggers the 502 branch of the GithubException block."""
-        mock_get_repos.side_effect = GithubException(status=502, data={"message": "Bad Gateway"}, headers={})
-        org = Org("my-org")
+        """Triggers the 502 branch of the GitHubApiError block."""
+        mock_get_repos.side_effect = GitHubApiError(status=502, data={"message": "Bad Gateway"}, headers={})
+        with patch('time.sleep') as mock_sleep:
+            org = Org("my-org")
         self.assertEqual(org.repos, [])
+        self.assertEqual(mock_get_repos.call_count, 4)
+        # backoff grows with each attempt
+        delays = [c.args[0] for c in mock_sleep.call_args_list]
+        self.assertEqual(len(delays), 3)
+        self.assertLess(delays[0], delays[2])
+
+    @patch('contrib_check.org.Org._get_github_repos_for_org')
+    def test_reload_repos_retries_after_timeout(self, mock_get_repos):
+        """A transient failure partway through listing is retried from the start, without duplicating repos."""
+        mock_repo = MagicMock()
+        mock_repo.name = "valid-project"
+        mock_repo.archived = False
+        mock_repo.html_url = "https://github.com/my-org/valid-project"
+        mock_repo.size = 1
+
+        def pages_then_timeout():
+            yield mock_repo
+            raise socket.timeout()
+
+        mock_get_repos.side_effect = [pages_then_timeout(), [mock_repo]]
+        with patch('time.sleep'):
+            org = Org("my-org")
+        self.assertEqual(org.repos, [OrgRepo("valid-project", "https://github.com/my-org/valid-project", 1)])
 
     @patch('contrib_check.org.Org._get_github_repos_for_org')
     def test_reload_repos_other_github_exception_else_branch(self, mock_get_repos):
-        """Fixes 79 ↛ 82: Triggers the non-502 'else' block inside GithubException."""
+        """Fixes 79 ↛ 82: Triggers the non-502 'else' block inside GitHubApiError."""
         # Use a 404 code to fail the 'if e.status == 502' condition
-        mock_get_repos.side_effect = GithubException(status=404, data={"message": "Not Found"}, headers={})
+        mock_get_repos.side_effect = GitHubApiError(status=404, data={"message": "Not Found"}, headers={})
 
         org = Org("my-org")
         self.assertEqual(org.repos, [])
+        # not a transient error, so there's no point retrying
+        self.assertEqual(mock_get_repos.call_count, 1)
+
+
+
+class TestOrgLocal(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        # no token is needed to scan a directory of repos
+        environ = patch.dict(os.environ)
+        environ.start()
+        self.addCleanup(environ.stop)
+        os.environ.pop('GITHUB_TOKEN', None)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _path(self, *parts):
+        return os.path.join(self.tmpdir, *parts)
+
+    def test_finds_repos_at_any_depth(self):
+        # enough objects that fast-import writes a pack rather than loose objects
+        make_git_repo(self._path("top"), 50)
+        make_git_repo(self._path("group", "nested"), 2)
+        make_git_repo(self._path("top", "vendor", "inner"), 2)
+        subprocess.run(["git", "clone", "-q", "--bare", self._path("top"), self._path("group", "mirror.git")], check=True)
+        os.makedirs(self._path("not-a-repo", "empty"))
+
+        org = Org(self.tmpdir, org_type="local")
+
+        self.assertEqual([org_repo.name for org_repo in org.repos], ["group/mirror.git", "group/nested", "top", "top/vendor/inner"])
+        self.assertEqual(org.repos[0].html_url, self._path("group", "mirror.git"))
+        # sized from its packfile
+        self.assertGreater(org.repos[2].size, 0)
+
+    def test_git_internals_not_searched(self):
+        make_git_repo(self._path("top"), 2)
+        # looks like a bare repo, but it's inside .git so it mustn't be reported
+        os.makedirs(self._path("top", ".git", "modules", "sub", "objects"), exist_ok=True)
+        os.makedirs(self._path("top", ".git", "modules", "sub", "refs"), exist_ok=True)
+        open(self._path("top", ".git", "modules", "sub", "HEAD"), 'w').close()
+
+        org = Org(self.tmpdir, org_type="local")
+
+        self.assertEqual([org_repo.name for org_repo in org.repos], ["top"])
+
+    def test_same_directory_name_in_different_groups(self):
+        make_git_repo(self._path("a", "api"), 2)
+        make_git_repo(self._path("b", "api"), 2)
+
+        org = Org(self.tmpdir, org_type="local")
+
+        self.assertEqual([org_repo.name for org_repo in org.repos], ["a/api", "b/api"])
+        repos = [ Repo(org_repo.html_url, name=org_repo.name) for org_repo in org.repos ]
+        self.assertEqual([ repo.csv_filename for repo in repos ], ["a-api.csv", "b-api.csv"])
+        for repo in repos:
+            repo.close()
+
+    def test_names_flattening_to_the_same_file(self):
+        make_git_repo(self._path("a-b", "api"), 2)
+        make_git_repo(self._path("a", "b-api"), 2)
+
+        with self.assertRaises(ValueError):
+            Org(self.tmpdir, org_type="local")
+
+    def test_filters_apply(self):
+        make_git_repo(self._path("keep"), 2)
+        make_git_repo(self._path("drop"), 2)
+
+        org = Org(self.tmpdir, org_type="local", ignore_repos=["drop"])
+
+        self.assertEqual([org_repo.name for org_repo in org.repos], ["keep"])
 
+    def test_missing_directory(self):
+        with self.assertRaises(ValueError):
+            Org(self._path("nope"), org_type="local")
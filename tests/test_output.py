@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+
+import csv
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from contrib_check.output import CsvOutput, format_message, open_text, split_part, zstd_available
+from contrib_check.repo import Repo
+from contrib_check.results import ScanFailure
+from contrib_check.shard import merge_shards
+
+from .gitfixtures import make_git_repo
+
+def _failure(i: int, message: str = "fix: thing\n\nbody") -> ScanFailure:
+    return ScanFailure("repo", f"{i:040x}", message, "Jane", "jane@example.com", "2024-01-01", "dco", "The commit did not have a DCO Signoff")
+
+def _read_rows(paths) -> list[list[str]]:
+    rows = []
+    for path in paths:
+        with open_text(path) as fh:
+            rows.extend(csv.reader(fh))
+    return rows
+
+class TestFormatMessage(unittest.TestCase):
+
+    def test_columns(self):
+        message = "fix: thing  \n\n" + "generated\n" * 1000
+        self.assertEqual(format_message(message), message)
+        self.assertEqual(format_message(message, 'first-line'), "fix: thing")
+        hashed = format_message(message, 'hash')
+        self.assertTrue(hashed.startswith("sha256:"))
+        self.assertTrue(hashed.endswith(f"({len(message)} bytes)"))
+        self.assertNotEqual(hashed, format_message(message + "x", 'hash'))
+
+
+class TestCsvOutput(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_gzip_split_into_parts(self):
+        output = CsvOutput(self.tmpdir / "org-repo.csv", 'gzip', max_bytes=2048)
+        # random-ish messages, so gzip can't shrink them to nothing
+        failures = [ _failure(i, os.urandom(200).hex()) for i in range(100) ]
+        for failure in failures:
+            output.write(failure)
+        output.close()
+
+        self.assertGreater(len(output.files), 1)
+        self.assertEqual(output.files[0].name, "org-repo.csv.gz")
+        self.assertEqual(output.files[1].name, "org-repo.part2.csv.gz")
+        self.assertEqual([ split_part(path.name) for path in output.files[:2] ], [("org-repo.csv.gz", 1), ("org-repo.csv.gz", 2)])
+        # rotation counts the CSV written, not what the compressor has let reach the disk so far
+        for path in output.files[:-1]:
+            with gzip.open(path) as fh:
+                self.assertTrue(2048 <= len(fh.read()) < 2048 + 600)
+        self.assertEqual(_read_rows(output.files), [ list(failure) for failure in failures ])
+
+    def test_uncompressed_first_line(self):
+        output = CsvOutput(self.tmpdir / "repo.csv", message_column='first-line')
+        output.write(_failure(1))
+        output.close()
+        self.assertEqual(output.files, [self.tmpdir / "repo.csv"])
+        self.assertEqual(_read_rows(output.files)[0][2], "fix: thing")
+
+    @unittest.skipUnless(zstd_available(), "needs Python 3.14 or the zstandard package")
+    def test_zstd(self):
+        output = CsvOutput(self.tmpdir / "repo.csv", 'zstd')
+        output.write(_failure(1))
+        output.close()
+        self.assertEqual(output.files, [self.tmpdir / "repo.csv.zst"])
+        self.assertEqual(_read_rows(output.files), [list(_failure(1))])
+
+
+class TestCompressedScanOutput(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = make_git_repo(os.path.join(self.tmpdir, "repo"), 20, message_padding=5000)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _scan(self, output_dir: str, **options) -> Repo:
+        os.makedirs(output_dir)
+        repo = Repo(self.path)
+        for name, value in options.items():
+            setattr(repo, name, value)
+        repo.remediation_commits_dir = os.path.join(output_dir, "remediation-commits")
+        repo.scan(output_dir=output_dir)
+        repo.close()
+        return repo
+
+    def test_compressed_first_lines(self):
+        repo = self._scan(os.path.join(self.tmpdir, "out"), output_compression='gzip', message_column='first-line')
+        self.assertEqual(sorted(name for name in os.listdir(repo.output_dir) if '.csv' in name), ["repo.csv.gz"])
+        rows = _read_rows([repo.output_dir / "repo.csv.gz"])
+        self.assertEqual(len(rows), 10)
+        self.assertTrue(all(row[2].startswith("commit ") and '\n' not in row[2] for row in rows))
+
+    def test_parts_merged_back_together(self):
+        shard_dirs = [ os.path.join(self.tmpdir, f"shard{i}") for i in (1, 2) ]
+        for shard_dir in shard_dirs:
+            self._scan(shard_dir, output_max_bytes=10000)
+
+        files = sorted((path for path in Path(shard_dirs[0]).iterdir() if '.csv' in path.name), key=lambda path: split_part(path.name)[1])
+        self.assertEqual([ path.name for path in files[:2] ], ["repo.csv", "repo.part2.csv"])
+        self.assertFalse(any(path.name.endswith('.partial') for path in files))
+        rows = _read_rows(files)
+        self.assertEqual(len(rows), 10)
+
+        merged = os.path.join(self.tmpdir, "merged")
+        merge_shards(shard_dirs, merged)
+        self.assertEqual(sorted(name for name in os.listdir(merged) if '.csv' in name), ["repo.csv"])
+        self.assertEqual(_read_rows([os.path.join(merged, "repo.csv")]), rows)
+
+    def test_hash_column_keeps_output_small(self):
+        full = self._scan(os.path.join(self.tmpdir, "full"))
+        hashed = self._scan(os.path.join(self.tmpdir, "hashed"), message_column='hash')
+        full_size = os.path.getsize(full.output_dir / "repo.csv")
+        hashed_size = os.path.getsize(hashed.output_dir / "repo.csv")
+        self.assertLess(hashed_size * 10, full_size)
+
+
+if __name__ == '__main__':
+    unittest.main()
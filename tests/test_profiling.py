@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+
+import os
+import pstats
+import shutil
+import tempfile
+import threading
+import tracemalloc
+import unittest
+from argparse import Namespace
+from unittest.mock import patch
+
+from contrib_check.main import main, run_org
+from contrib_check.org import OrgRepo
+from contrib_check.profiling import RepoProfiler
+
+from .gitfixtures import make_git_repo
+
+def _allocate():
+    return [ bytearray(1024) for _ in range(1000) ]
+
+class TestRepoProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_cpu_profile_written_even_when_work_fails(self):
+        with self.assertRaises(TimeoutError):
+            with RepoProfiler('cpu', self.tmpdir, "repo", top=5) as profiler:
+                _allocate()
+                raise TimeoutError("Scan of repo repo ran out of time")
+
+        stats = pstats.Stats(str(profiler.profile_file))
+        self.assertTrue(any(function == '_allocate' for _, _, function in stats.stats))
+        with open(profiler.summary_file) as fh:
+            summary = fh.read()
+        self.assertIn("Top 5 functions by time spent in the function itself", summary)
+        self.assertIn("_allocate", summary)
+
+    def test_memory_profile(self):
+        self.assertFalse(tracemalloc.is_tracing())
+        with RepoProfiler('memory', self.tmpdir, "repo", top=5) as profiler:
+            kept = _allocate()
+
+        # tracing is stopped again once the profiler that started it is done
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertIsInstance(tracemalloc.Snapshot.load(str(profiler.profile_file)), tracemalloc.Snapshot)
+        with open(profiler.summary_file) as fh:
+            summary = fh.read()
+        self.assertIn("Peak traced memory", summary)
+        # the allocation site holding the most memory at the end tops the list
+        top_line = summary.split("still held at the end:\n")[1].splitlines()[0]
+        self.assertIn("test_profiling.py", top_line)
+        del kept
+
+    def test_cpu_profiles_taken_one_at_a_time(self):
+        # two cProfiles can't be enabled at once from Python 3.12, so the second waits for the first
+        first = RepoProfiler('cpu', self.tmpdir, "first")
+        first.__enter__()
+        entered = threading.Event()
+        second = RepoProfiler('cpu', self.tmpdir, "second")
+        thread = threading.Thread(target=lambda: (second.__enter__(), entered.set(), second.__exit__(None, None, None)))
+        thread.start()
+        self.assertFalse(entered.wait(0.2))
+        first.__exit__(None, None, None)
+        self.assertTrue(entered.wait(5))
+        thread.join()
+        self.assertTrue(os.path.isfile(second.profile_file))
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            RepoProfiler('disk', self.tmpdir, "repo")
+
+
+class TestProfileOrgRun(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.repo_paths = [ make_git_repo(os.path.join(self.tmpdir, "repos", f"repo{i}"), 20, signed_every=2) for i in range(2) ]
+        self.output_dir = os.path.join(self.tmpdir, "out")
+        os.makedirs(self.output_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _run(self, profile, parallel_repos=1):
+        args = Namespace(
+            org="my-org", org_type="local", only_repos=None, ignore_repos=None, skip_archived_repos=False,
+            parallel_repos=parallel_repos, dco_skip=False, dco_signoff_dirs="dco-signoffs", dco_start_date=None,
+            dco_start_commit=None, output_dir=self.output_dir, jobs=1, log_each_error=False, resume=False, journal=None,
+            retries=0, clone_timeout=None, scan_timeout=None, shard=None, remote_scan=False,
+            dco_end_date=None, dco_author=None, check=None, allowed_email_domains=None,
+            profile=profile, profile_top=10, output_compression=None, output_max_size=None, message_column="full"
+        )
+        with patch('contrib_check.org.Org') as mock_org_class:
+            mock_org_class.return_value.repos = [ OrgRepo(os.path.basename(path), path) for path in self.repo_paths ]
+            self.assertEqual(run_org(args, None), [])
+
+    def test_cpu_profile_per_repo(self):
+        self._run('cpu')
+        for name in ["repo0", "repo1"]:
+            stats = pstats.Stats(os.path.join(self.output_dir, f"{name}-profile.prof"))
+            # the profile covers the clone and the scan, remediation load included
+            functions = set(function for _, _, function in stats.stats)
+            self.assertTrue({'__init__', 'scan', 'load_remediation_commits'} <= functions)
+            self.assertTrue(os.path.isfile(os.path.join(self.output_dir, f"{name}-profile.txt")))
+
+    def test_cpu_profile_not_with_parallel_repos(self):
+        with patch('sys.stderr'), self.assertRaises(SystemExit):
+            main(['--org', "my-org", '--profile', 'cpu', '--parallel-repos', '2'])
+
+    def test_memory_profile_per_repo(self):
+        self._run('memory', parallel_repos=2)
+        for name in ["repo0", "repo1"]:
+            self.assertTrue(os.path.isfile(os.path.join(self.output_dir, f"{name}-profile.tracemalloc")))
+            self.assertTrue(os.path.isfile(os.path.join(self.output_dir, f"{name}-profile.txt")))
+
+    def test_no_profile_by_default(self):
+        self._run(None)
+        self.assertFalse([ name for name in os.listdir(self.output_dir) if '-profile' in name ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from contrib_check.progress import ThrottledBar, ScanProgress, OrgProgress
+
+class TestThrottledBar(unittest.TestCase):
+
+    @patch('alive_progress.alive_bar')
+    def test_disabled_bar_never_renders(self, mock_alive_bar):
+        with ThrottledBar(total=10, enabled=False) as bar:
+            for _ in range(10):
+                bar.update()
+        mock_alive_bar.assert_not_called()
+
+    @patch('alive_progress.alive_bar')
+    def test_increments_are_accumulated_between_renders(self, mock_alive_bar):
+        rendered = mock_alive_bar.return_value.__enter__.return_value
+        with ThrottledBar(total=1000, enabled=True) as bar:
+            for _ in range(1000):
+                bar.update()
+        # first update renders straight away, exit flushes the rest in one call
+        self.assertLess(rendered.call_count, 10)
+        self.assertEqual(sum(call.args[0] for call in rendered.call_args_list), 1000)
+
+    @patch('alive_progress.alive_bar')
+    def test_callable_text_only_built_on_render(self, mock_alive_bar):
+        text = MagicMock(return_value="text")
+        with ThrottledBar(total=100, enabled=True) as bar:
+            for _ in range(100):
+                bar.update(text=text)
+        self.assertLess(text.call_count, 10)
+
+class TestScanProgress(unittest.TestCase):
+
+    def test_not_enabled_off_a_tty(self):
+        with patch('sys.stdout.isatty', return_value=False):
+            self.assertFalse(ScanProgress().enabled)
+
+class TestOrgProgress(unittest.TestCase):
+
+    @patch('alive_progress.alive_bar')
+    def test_aggregates_commits_and_repos(self, mock_alive_bar):
+        rendered = mock_alive_bar.return_value.__enter__.return_value
+        with OrgProgress(2, enabled=True) as progress:
+            with progress.repo("first") as task:
+                task.update(5)
+                self.assertEqual(progress.active, ["first"])
+            with progress.repo("second") as task:
+                task.update(3)
+        self.assertEqual(progress.commits_scanned, 8)
+        self.assertEqual(progress.active, [])
+        self.assertEqual(sum(call.args[0] for call in rendered.call_args_list if call.args), 2)
+        mock_alive_bar.assert_called_once_with(2, manual=False, title="Repos")
+
+
+if __name__ == '__main__':
+    unittest.main()
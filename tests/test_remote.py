@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import git
+
+from contrib_check.github_api import GitHubApi
+from contrib_check.remote import RemoteHistory
+from contrib_check.repo import Repo
+
+from .gitfixtures import make_git_repo
+from .githubstub import GitHubStub
+
+class TestRemoteHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = make_git_repo(
+            os.path.join(self.tmpdir, "repo"), 250, signed_every=3,
+            files={ ".github/dco.yml": "allowRemediationCommits:\n  individual: true\n", "dco-signoffs/nested/dev.txt": "abc123" }
+        )
+        self.stub = GitHubStub().__enter__()
+        self.stub.add_repo("foo", "bar", self.path)
+        self.api = GitHubApi(token="token", api_url=self.stub.url)
+        self.history = RemoteHistory(self.api, "foo", "bar")
+
+    def tearDown(self):
+        self.api.close()
+        self.stub.__exit__(None, None, None)
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_records_match_local_history(self):
+        records = list(self.history.iter_records())
+        local = list(git.Repo(self.path).iter_commits())
+        self.assertEqual(self.history.total, 250)
+        self.assertEqual([record.hexsha for record in records], [commit.hexsha for commit in local])
+        self.assertEqual(records[1].message, local[1].message)
+        self.assertEqual(records[1].author.email, local[1].author.email)
+        self.assertEqual(records[1].authored_datetime, local[1].authored_datetime)
+        self.assertEqual(records[1].parents, (local[2].hexsha,))
+
+    def test_pages_after_the_first_fetched_by_offset(self):
+        list(self.history.iter_records())
+        cursors = sorted((call[2].get('after') or '') for call in self.stub.calls if call[0] == 'POST')
+        head = git.Repo(self.path).head.commit.hexsha
+        self.assertEqual(cursors, ['', f"{head} 199", f"{head} 99"])
+
+    def test_pages_fetched_a_few_at_a_time(self):
+        self.history.page_size = 10
+        records = self.history.iter_records()
+        for _ in range(15):
+            next(records)
+        records.close()
+        # the first page, the page_workers fetched ahead of the reader and the one submitted as it read the second
+        self.assertLessEqual(sum(1 for call in self.stub.calls if call[0] == 'POST'), 2 + self.history.page_workers)
+
+    def test_rejected_cursor_falls_back_to_end_cursors(self):
+        self.history.page_size = 10
+        # GitHub answers errors in a 200 response
+        self.stub.scheduled_failures[2] = (200, { 'errors': [ { 'message': "Argument 'after' has an invalid value" } ] }, {})
+        with self.assertLogs(level='WARNING'):
+            records = list(self.history.iter_records())
+        self.assertEqual([record.hexsha for record in records], [commit.hexsha for commit in git.Repo(self.path).iter_commits()])
+
+    def test_rate_limited_request_retried(self):
+        self.stub.rate_limit()
+        with patch('contrib_check.retry.time.sleep') as mock_sleep:
+            records = list(self.history.iter_records())
+        self.assertEqual(len(records), 250)
+        self.assertEqual(mock_sleep.call_count, 1)
+
+    def test_since_window(self):
+        local = list(git.Repo(self.path).iter_commits())
+        records = list(self.history.iter_records(since=local[9].authored_datetime))
+        self.assertEqual(len(records), 10)
+
+    def test_relative_dates_rejected(self):
+        with self.assertRaises(ValueError):
+            list(self.history.iter_records(since="2 weeks ago"))
+
+    def test_files(self):
+        self.assertIn(b"individual: true", self.history.read_file(".github/dco.yml"))
+        self.assertIsNone(self.history.read_file("no/such/file"))
+        self.assertEqual(list(self.history.iter_files("dco-signoffs")), [("dco-signoffs/nested/dev.txt", b"abc123")])
+
+
+class TestRepoRemoteScan(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        path = make_git_repo(
+            os.path.join(self.tmpdir, "bar"), 150, signed_every=3,
+            files={ ".github/dco.yml": "allowRemediationCommits:\n  individual: true\n" }
+        )
+        shas = subprocess.run(["git", "rev-list", "--reverse", "HEAD"], cwd=path, capture_output=True, text=True, check=True).stdout.split()
+        os.makedirs(os.path.join(path, "dco-signoffs"))
+        with open(os.path.join(path, "dco-signoffs", "dev4.txt"), "w") as fh:
+            fh.write(f"{shas[4]} commit 4\n")
+        subprocess.run(["git", "add", "dco-signoffs"], cwd=path, check=True)
+        subprocess.run(
+            ["git", "-c", "user.name=Dev 1", "-c", "user.email=dev1@example.com", "commit", "-q",
+             "--author", "Dev 1 <dev1@example.com>",
+             "-m", f"Remediation\n\nI, Dev 1 <dev1@example.com>, hereby add my Signed-off-by to this commit: {shas[1][:7]}\n\nSigned-off-by: Dev 1 <dev1@example.com>"],
+            cwd=path, check=True
+        )
+        self.path = path
+        self.stub = GitHubStub().__enter__()
+        self.stub.add_repo("foo", "bar", path)
+        self.api = GitHubApi(token="token", api_url=self.stub.url)
+
+    def tearDown(self):
+        self.api.close()
+        self.stub.__exit__(None, None, None)
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _scan(self, repo, name):
+        output_dir = os.path.join(self.tmpdir, name)
+        os.makedirs(output_dir)
+        repo.remediation_commits_dir = os.path.join(output_dir, "remediation-commits")
+        repo.load_past_signoffs()
+        repo.scan(output_dir=Path(output_dir))
+        repo.close()
+        with open(os.path.join(output_dir, repo.csv_filename)) as fh:
+            csv_content = fh.read()
+        with open(os.path.join(repo.remediation_commits_dir, "bar-Dev 2.txt")) as fh:
+            return csv_content, fh.read(), repo.error_counts
+
+    def test_remote_scan_matches_local_scan(self):
+        with patch('contrib_check.repo.clone_bare') as mock_clone:
+            remote_repo = Repo("https://github.com/foo/bar", remote=self.api)
+            remote = self._scan(remote_repo, "remote")
+        mock_clone.assert_not_called()
+        local = self._scan(Repo(self.path), "local")
+
+        self.assertEqual(remote_repo.csv_filename, "foo-bar.csv")
+        self.assertEqual(remote[2], { 'dco': 98 })
+        self.assertEqual(remote, local)
+
+    def test_since_commit_stops_the_window(self):
+        head = git.Repo(self.path).head.commit
+        repo = Repo("https://github.com/foo/bar", remote=self.api)
+        repo.output_dir = Path(self.tmpdir)
+        repo.remediation_commits_dir = os.path.join(self.tmpdir, "remediation-commits")
+        repo.scan(since_commit=head.parents[0].parents[0].hexsha)
+        repo.close()
+        self.assertEqual(repo.commit_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
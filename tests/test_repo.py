@@ -6,19 +6,29 @@
 # encoding=utf8
 
 import os
+import subprocess
 import tempfile
+import time
+import tracemalloc
 import unittest
 from unittest.mock import Mock, patch, MagicMock, call
 import shutil
 from pathlib import Path
+from datetime import datetime, timezone
 
 import git
 
-from contrib_check.repo import Repo
-from contrib_check.commit import Commit
+from contrib_check.repo import Repo, RepoTimeout, clone_bare
+from contrib_check.checks import DcoCheck
+from contrib_check.commit import Commit, CommitRecord
+from contrib_check.identity import IdentityIndex
+from contrib_check.progress import ScanProgress
+from contrib_check.results import ScanFailure
+
+from .gitfixtures import make_git_repo
 
 def _make_repo_github(url="https://github.com/foo/bar"):
-    with patch('git.Repo.clone_from') as mock_clone:
+    with patch('contrib_check.repo.clone_bare') as mock_clone:
         # 1. Setup the basic repo object mock
         mock_repo_inst = MagicMock()
         mock_clone.return_value = mock_repo_inst
@@ -98,7 +108,7 @@ class TestRepoLoadRemediationCommits(unittest.TestCase):
         mock_git_commit.parents = [1]
 
         self.repo.git_repo_object = Mock()
-        self.repo.git_repo_object.head.commit.tree.__getitem__ = Mock(side_effect=KeyError)
+        self.repo.read_blob = Mock(return_value=None)
         self.repo.git_repo_object.iter_commits.return_value = [mock_git_commit]
 
         with patch.object(Commit, 'is_remediation_commit', return_value=True):
@@ -108,10 +118,10 @@ class TestRepoLoadRemediationCommits(unittest.TestCase):
 
         # integration-style: let a real Commit run (no dco.yml → no remediations)
         self.repo.git_repo_object.iter_commits.return_value = [mock_git_commit]
-        self.repo.remediations = []
+        self.repo.remediations = set()
         self.repo.load_remediation_commits()
         # No dco.yml config → is_remediation_commit returns False → remediations stays empty
-        self.assertEqual(self.repo.remediations, [])
+        self.assertEqual(self.repo.remediations, set())
 
 class TestRepoScan(unittest.TestCase):
 
@@ -119,7 +129,7 @@ class TestRepoScan(unittest.TestCase):
         self.repo = _make_repo_github()
 
     def tearDown(self):
-        for f in ["foo-bar.csv"]:
+        for f in ["foo-bar.csv", "foo-bar-summary.json"]:
             if os.path.isfile(f):
                 os.remove(f)
         import shutil
@@ -136,22 +146,294 @@ class TestRepoScan(unittest.TestCase):
         mock_git_commit.authored_datetime = "2024-01-01"
 
         self.repo.git_repo_object = Mock()
-        self.repo.git_repo_object.head.commit.tree.__getitem__ = Mock(side_effect=KeyError)
+        self.repo.read_blob = Mock(return_value=None)
         self.repo.git_repo_object.iter_commits.return_value = [mock_git_commit]
         self.repo.git_repo_object.git.rev_parse.return_value = "aabbccd"
         self.repo.past_signoffs = []
-        self.repo.remediations = []
+        self.repo.remediations = set()
         self.repo.csv_filename = "foo-bar.csv"
         self.repo.scan()
 
-        # flush the still-open csv writer before reading
-        self.repo._Repo__csvfileref.flush()
-
         with open("foo-bar.csv") as f:
             content = f.read()
         self.assertIn("no signoff", content)
         self.assertIn("dco", content)
 
+class TestRepoBlobs(unittest.TestCase):
+
+    DCO_YML = "allowRemediationCommits:\n  individual: true\n"
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        files = {
+            ".github/dco.yml": self.DCO_YML,
+            "dco-signoffs/jane.txt": "I, Jane hereby sign-off-by all of my past commits\n\nabc123 commit",
+            "dco-signoffs/nested/bob.txt": "I, Bob hereby sign-off-by all of my past commits",
+        }
+        source = make_git_repo(os.path.join(self.tmpdir, "source"), 3, signed_every=1, files=files)
+        # a bare clone has no worktree at all, so everything has to come from the object database
+        bare = os.path.join(self.tmpdir, "bare.git")
+        git.Repo.clone_from(source, bare, bare=True)
+        self.repo = Repo(bare)
+        self.repo.output_dir = Path(self.tmpdir)
+
+    def tearDown(self):
+        self.repo.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_read_blob(self):
+        self.assertEqual(self.repo.read_blob(".github/dco.yml"), self.DCO_YML.encode())
+        self.assertIsNone(self.repo.read_blob("no/such/file"))
+
+    def test_remediation_config_from_bare_repo(self):
+        self.repo.scan()
+        self.assertEqual(self.repo.remediation_config, (True, False))
+
+    def test_load_past_signoffs_from_bare_repo(self):
+        self.repo.load_past_signoffs("dco-signoffs, dco_signoffs")
+        self.assertEqual(len(self.repo.past_signoffs), 2)
+        self.assertTrue(any(b"abc123" in signoff for signoff in self.repo.past_signoffs))
+
+class TestRepoErrorLogging(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.repo = Repo(make_git_repo(os.path.join(self.tmpdir, "repo"), 10, signed_every=2))
+        self.repo.output_dir = Path(self.tmpdir)
+        self.repo.remediation_commits_dir = os.path.join(self.tmpdir, "remediation-commits")
+
+    def tearDown(self):
+        self.repo.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_summary_logged_per_repo_by_default(self):
+        with self.assertLogs(level='ERROR') as logs:
+            self.repo.scan()
+        self.assertEqual(logs.output, ["ERROR:root:Found 5 commits with error 'dco' out of 10 scanned in repo repo"])
+
+    def test_log_each_error(self):
+        self.repo.log_each_error = True
+        with self.assertLogs(level='ERROR') as logs:
+            self.repo.scan()
+        self.assertEqual(len(logs.output), 6)
+
+class TestRepoScanMemory(unittest.TestCase):
+
+    # Memory ceiling for a scan, independent of how many commits are in the history
+    PEAK_CEILING = 1024 * 1024
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _scan_peak(self, commit_count):
+        path = make_git_repo(os.path.join(self.tmpdir, f"repo{commit_count}"), commit_count, signed_every=1, message_padding=2000)
+        repo = Repo(path)
+        repo.output_dir = Path(self.tmpdir)
+        tracemalloc.start()
+        try:
+            repo.scan()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            repo.close()
+
+    def test_scan_memory_does_not_grow_with_history(self):
+        small_peak = self._scan_peak(100)
+        large_peak = self._scan_peak(2000)
+        self.assertLess(large_peak, self.PEAK_CEILING)
+        self.assertLess(large_peak, small_peak * 2)
+
+    def test_scan_uses_compact_commit_records(self):
+        path = make_git_repo(os.path.join(self.tmpdir, "repo"), 3, signed_every=1)
+        repo = Repo(path)
+        repo.output_dir = Path(self.tmpdir)
+        with patch.object(DcoCheck, 'outcomes', autospec=True, side_effect=DcoCheck.outcomes) as mock_check:
+            repo.scan()
+        records = mock_check.call_args.args[1]
+        self.assertEqual(len(records), 3)
+        for record in records:
+            self.assertIsInstance(record, CommitRecord)
+        self.assertFalse(hasattr(records[0], '__dict__'))
+        repo.close()
+
+class TestRepoScanProgress(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.repo = Repo(make_git_repo(os.path.join(self.tmpdir, "repo"), 25, signed_every=1))
+        self.repo.output_dir = Path(self.tmpdir)
+
+    def tearDown(self):
+        self.repo.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    @patch('alive_progress.alive_bar')
+    def test_scan_bar_sized_from_rev_list_count(self, mock_alive_bar):
+        self.repo.scan(progress=ScanProgress(enabled=True))
+        mock_alive_bar.assert_called_once_with(25, manual=False, title="Scanning repo")
+
+    @patch('alive_progress.alive_bar')
+    def test_no_count_when_progress_disabled(self, mock_alive_bar):
+        with patch.object(git.cmd.Git, '_call_process', autospec=True, side_effect=git.cmd.Git._call_process) as mock_call:
+            self.repo.scan(progress=ScanProgress(enabled=False))
+        self.assertFalse([c for c in mock_call.call_args_list if c.kwargs.get('count')])
+        mock_alive_bar.assert_not_called()
+
+class TestRepoParallelScan(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        path = make_git_repo(
+            os.path.join(self.tmpdir, "repo"), 400, signed_every=3,
+            files={".github/dco.yml": "allowRemediationCommits:\n  individual: true\n"}
+        )
+        shas = subprocess.run(["git", "rev-list", "--reverse", "HEAD"], cwd=path, capture_output=True, text=True, check=True).stdout.split()
+        # commit 4 is covered by a past signoff, commit 1 by a remediation commit from its author
+        os.makedirs(os.path.join(path, "dco-signoffs"))
+        with open(os.path.join(path, "dco-signoffs", "dev4.txt"), "w") as fh:
+            fh.write(f"{shas[4]} commit 4\n")
+        subprocess.run(["git", "add", "dco-signoffs"], cwd=path, check=True)
+        subprocess.run(
+            ["git", "-c", "user.name=Dev 1", "-c", "user.email=dev1@example.com", "commit", "-q",
+             "--author", "Dev 1 <dev1@example.com>",
+             "-m", f"Remediation\n\nI, Dev 1 <dev1@example.com>, hereby add my Signed-off-by to this commit: {shas[1][:7]}\n\nSigned-off-by: Dev 1 <dev1@example.com>"],
+            cwd=path, check=True
+        )
+        self.path = path
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _scan(self, jobs):
+        output_dir = os.path.join(self.tmpdir, f"out{jobs}")
+        os.makedirs(output_dir)
+        repo = Repo(self.path)
+        repo.parallel_chunk_size = 50
+        repo.remediation_commits_dir = os.path.join(output_dir, "remediation-commits")
+        repo.load_past_signoffs()
+        repo.scan(output_dir=Path(output_dir), jobs=jobs)
+        repo.close()
+        with open(os.path.join(output_dir, repo.csv_filename)) as fh:
+            return fh.read(), repo.error_counts
+
+    def test_parallel_scan_matches_serial(self):
+        serial_output, serial_counts = self._scan(1)
+        parallel_output, parallel_counts = self._scan(3)
+        self.assertEqual(serial_counts, {'dco': 264})
+        self.assertEqual(parallel_counts, serial_counts)
+        self.assertEqual(parallel_output, serial_output)
+
+class TestRepoScanWindow(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        path = make_git_repo(
+            os.path.join(self.tmpdir, "repo"), 20, signed_every=4,
+            files={".github/dco.yml": "allowRemediationCommits:\n  individual: true\n"}
+        )
+        self.shas = subprocess.run(["git", "rev-list", "--reverse", "HEAD"], cwd=path, capture_output=True, text=True, check=True).stdout.split()
+        # an unsigned merge of a signed feature branch, then a remediation of commit 1 by its author
+        identity = ["-c", "user.name=Dev 9", "-c", "user.email=dev9@example.com"]
+        subprocess.run(["git", "checkout", "-q", "-b", "feature"], cwd=path, check=True)
+        subprocess.run(["git", *identity, "commit", "-q", "--allow-empty", "-m", "Feature\n\nSigned-off-by: Dev 9 <dev9@example.com>"], cwd=path, check=True)
+        subprocess.run(["git", "checkout", "-q", "main"], cwd=path, check=True)
+        subprocess.run(["git", *identity, "merge", "-q", "--no-ff", "-m", "Merge feature", "feature"], cwd=path, check=True)
+        subprocess.run(
+            ["git", "-c", "user.name=Dev 1", "-c", "user.email=dev1@example.com", "commit", "-q", "--allow-empty",
+             "-m", f"Remediation\n\nI, Dev 1 <dev1@example.com>, hereby add my Signed-off-by to this commit: {self.shas[1][:7]}\n\nSigned-off-by: Dev 1 <dev1@example.com>"],
+            cwd=path, check=True
+        )
+        self.merge_sha = subprocess.run(["git", "rev-parse", "HEAD^"], cwd=path, capture_output=True, text=True, check=True).stdout.strip()
+        self.path = path
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _scan(self, **kwargs):
+        repo = Repo(self.path)
+        repo.output_dir = Path(self.tmpdir)
+        repo.remediation_commits_dir = os.path.join(self.tmpdir, "remediation-commits")
+        with patch.object(Commit, 'is_remediation_commit', autospec=True, side_effect=Commit.is_remediation_commit) as mock_is_remediation:
+            repo.scan(**kwargs)
+        repo.close()
+        with open(os.path.join(self.tmpdir, repo.csv_filename)) as fh:
+            return repo, fh.read(), mock_is_remediation.call_count
+
+    def test_merges_never_read(self):
+        repo, csv_content, remediation_candidates = self._scan()
+        self.assertEqual(repo.commit_count, 22)
+        self.assertEqual(repo.error_counts, {'dco': 14})
+        self.assertNotIn(self.merge_sha, csv_content)
+        # only the commit saying 'hereby' is handed to Python in the remediation pass
+        self.assertEqual(remediation_candidates, 1)
+
+    def test_author_filter(self):
+        repo, csv_content, remediation_candidates = self._scan(authors=["dev1@"])
+        self.assertEqual(repo.commit_count, 5)
+        self.assertEqual(repo.error_counts, {'dco': 2})
+        self.assertNotIn(self.shas[1], csv_content)
+
+    def test_until_date_still_sees_later_remediations(self):
+        until = datetime.fromtimestamp(1600000000 + 9 * 60, timezone.utc)
+        repo, csv_content, remediation_candidates = self._scan(until_date=until)
+        self.assertEqual(repo.commit_count, 10)
+        self.assertEqual(repo.error_counts, {'dco': 6})
+        self.assertNotIn(self.shas[1], csv_content)
+
+    def test_no_remediation_pass_without_config(self):
+        repo = Repo(self.path)
+        repo.remediation_config = (False, False)
+        with patch.object(repo.git_repo_object, 'iter_commits') as mock_iter_commits:
+            repo.load_remediation_commits()
+        repo.close()
+        mock_iter_commits.assert_not_called()
+
+class TestRepoTimeouts(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.source = make_git_repo(os.path.join(self.tmpdir, "source"), 10, signed_every=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_clone_bare(self):
+        cloned = clone_bare(self.source, os.path.join(self.tmpdir, "clone.git"), timeout=30)
+        self.assertTrue(cloned.bare)
+        self.assertEqual(len(list(cloned.iter_commits())), 10)
+
+    def test_hung_clone_killed(self):
+        start_time = time.monotonic()
+        with self.assertRaises(RepoTimeout):
+            # an upload-pack that never answers stands in for a stalled remote
+            clone_bare(f"file://{self.source}", os.path.join(self.tmpdir, "clone.git"), timeout=0.5, upload_pack="sleep 30; git-upload-pack")
+        self.assertLess(time.monotonic() - start_time, 10)
+
+    def test_scan_timeout_discards_output(self):
+        repo = Repo(self.source)
+        repo.output_dir = Path(self.tmpdir)
+        repo.remediation_commits_dir = self.tmpdir
+        repo.timeout_check_interval = 2
+        with self.assertRaises(RepoTimeout):
+            repo.scan(timeout=1e-9)
+        repo.close()
+        self.assertEqual(os.listdir(self.tmpdir), ["source"])
+
+    def test_hung_history_walk_killed(self):
+        path = make_git_repo(os.path.join(self.tmpdir, "remediable"), 10, files={ ".github/dco.yml": "allowRemediationCommits:\n  individual: true\n" })
+        repo = Repo(path)
+        # a rev-list that never answers stands in for the remediation walk over a huge history
+        hung = lambda git_cmd, *args, kill_after_timeout=None, **kwargs: git_cmd.execute(["sleep", "30"], kill_after_timeout=kill_after_timeout)
+        start_time = time.monotonic()
+        with patch.object(git.Git, 'rev_list', hung, create=True), self.assertRaises(RepoTimeout):
+            list(repo.iter_scan(timeout=0.5, progress=ScanProgress(enabled=False)))
+        self.assertLess(time.monotonic() - start_time, 10)
+        repo.close()
+
+
 class TestRepoWriteIndividualRemediationCommit(unittest.TestCase):
 
     def setUp(self):
@@ -161,6 +443,8 @@ class TestRepoWriteIndividualRemediationCommit(unittest.TestCase):
         self.repo.name = "myrepo"
         self.repo.git_repo_object = Mock()
         self.repo.git_repo_object.git.rev_parse.return_value = "abc1234"
+        # no .mailmap, rather than starting cat-file against the Mock's git dir
+        self.repo.identities = IdentityIndex.from_mailmap(None)
 
     def tearDown(self):
         import shutil
@@ -169,15 +453,12 @@ class TestRepoWriteIndividualRemediationCommit(unittest.TestCase):
             os.remove("foo-bar.csv")
 
     def _make_commit_obj(self, hexsha="fullhash", author_name="Alice", author_email="alice@example.com"):
-        commit = Mock()
-        commit.git_commit_object.hexsha = hexsha
-        commit.git_commit_object.author.name = author_name
-        commit.git_commit_object.author.email = author_email
-        return commit
+        return ScanFailure("myrepo", hexsha, "msg", author_name, author_email, "2024-01-01", "dco", "The commit did not have a DCO Signoff")
 
     def test_creates_new_remediation_file(self):
         commit = self._make_commit_obj()
         self.repo.write_individual_remediation_commit(commit)
+        self.repo.finalize_output()
 
         expected = os.path.join(self.repo.remediation_commits_dir, "myrepo-Alice.txt")
         self.assertTrue(os.path.isfile(expected))
@@ -192,6 +473,7 @@ class TestRepoWriteIndividualRemediationCommit(unittest.TestCase):
         self.repo.git_repo_object.git.rev_parse.side_effect = ["short1", "short2"]
         self.repo.write_individual_remediation_commit(commit1)
         self.repo.write_individual_remediation_commit(commit2)
+        self.repo.finalize_output()
 
         expected = os.path.join(self.repo.remediation_commits_dir, "myrepo-Alice.txt")
         with open(expected) as f:
@@ -199,6 +481,19 @@ class TestRepoWriteIndividualRemediationCommit(unittest.TestCase):
         self.assertIn("short1", content)
         self.assertIn("short2", content)
 
+    def test_unfinished_output_discarded_on_close(self):
+        expected = os.path.join(self.repo.remediation_commits_dir, "myrepo-Alice.txt")
+        os.makedirs(self.repo.remediation_commits_dir)
+        with open(expected, 'w') as f:
+            f.write("from the last complete run")
+
+        self.repo.write_individual_remediation_commit(self._make_commit_obj())
+        self.repo.close()
+
+        with open(expected) as f:
+            self.assertEqual(f.read(), "from the last complete run")
+        self.assertEqual(os.listdir(self.repo.remediation_commits_dir), ["myrepo-Alice.txt"])
+
 class TestRepoBranchCoverage(unittest.TestCase):
 
     def setUp(self):
@@ -270,7 +565,7 @@ class TestRepoBranchCoverage(unittest.TestCase):
         repo.error_types['custom'] = 'Some alternative issue'
 
         with patch.object(repo, 'write_individual_remediation_commit') as mock_write_priors:
-            repo.write_error(self.mock_commit_obj, 'custom')
+            repo.write_error(ScanFailure(repo.name, "abcdef1234567890", "Fixing a bad bug", "John Mertic", "john@example.com", "2024-01-01", 'custom', 'Some alternative issue'))
             # Verify the DCO-specific file write block was bypassed
             mock_write_priors.assert_not_called()
 
@@ -280,11 +575,13 @@ class TestRepoBranchCoverage(unittest.TestCase):
 
     @patch('git.Repo')
     @patch('contrib_check.repo.Commit')
-    def test_load_remediation_commits_true_branch(self, mock_commit_class, mock_git_repo):
+    # a Mock git dir has no objects for cat-file to read dco.yml or .mailmap from
+    @patch.object(Repo, 'read_blob', return_value=None)
+    def test_load_remediation_commits_true_branch(self, mock_read_blob, mock_commit_class, mock_git_repo):
         mock_commit_instance = mock_commit_class.return_value
         mock_commit_instance.is_remediation_commit.return_value = True
         mock_commit_instance.remediations = ["remediation_alpha"]
-        mock_git_repo.return_value.iter_commits.return_value = [MagicMock()]
+        mock_git_repo.return_value.git.rev_list.return_value = "abcdef1234567890\n"
 
         repo = Repo(self.test_dir)
         repo.load_remediation_commits()
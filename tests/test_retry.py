@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+
+import unittest
+from unittest.mock import Mock, patch
+
+from contrib_check.retry import backoff_delay, retry_call
+
+class TestRetry(unittest.TestCase):
+
+    def test_backoff_delay_doubles_up_to_max(self):
+        for attempt, delay in [(0, 1), (1, 2), (2, 4), (10, 60)]:
+            self.assertGreaterEqual(backoff_delay(attempt), delay / 2)
+            self.assertLessEqual(backoff_delay(attempt), delay)
+
+    @patch('time.sleep')
+    def test_retries_until_success(self, mock_sleep):
+        func = Mock(side_effect=[OSError("reset"), OSError("reset"), "done"])
+        with self.assertLogs(level='WARNING'):
+            self.assertEqual(retry_call(func, attempts=3), "done")
+        self.assertEqual(func.call_count, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    @patch('time.sleep')
+    def test_last_failure_raised(self, mock_sleep):
+        func = Mock(side_effect=OSError("reset"))
+        with self.assertRaises(OSError), self.assertLogs(level='WARNING'):
+            retry_call(func, attempts=2)
+        self.assertEqual(func.call_count, 2)
+
+    @patch('time.sleep')
+    def test_other_errors_not_retried(self, mock_sleep):
+        func = Mock(side_effect=ValueError("bad"))
+        with self.assertRaises(ValueError):
+            retry_call(func, attempts=3, retry_on=(OSError,))
+        self.assertEqual(func.call_count, 1)
+        mock_sleep.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+
+import unittest
+
+from contrib_check.schedule import estimate_cost, longest_first, predict_makespan
+
+class TestSchedule(unittest.TestCase):
+
+    def test_estimate_prefers_previous_commit_count(self):
+        self.assertGreater(estimate_cost(size_kb=10, commit_count=100000), estimate_cost(size_kb=1000000, commit_count=10))
+
+    def test_estimate_falls_back_to_size(self):
+        self.assertGreater(estimate_cost(size_kb=100000), estimate_cost(size_kb=10))
+        self.assertGreater(estimate_cost(), 0)
+
+    def test_longest_first_is_stable(self):
+        self.assertEqual(longest_first(["a", "bbb", "c", "dd"], len), ["bbb", "dd", "a", "c"])
+
+    def test_predict_makespan(self):
+        self.assertEqual(predict_makespan([5, 4, 3, 3, 3], 2), 10)
+        # the same jobs with the big one last are worse
+        self.assertEqual(predict_makespan([3, 3, 3, 4, 5], 2), 11)
+        self.assertEqual(predict_makespan([], 4), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
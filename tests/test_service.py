@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from unittest.mock import patch
+
+from contrib_check.commit import Commit
+from contrib_check.service import NULL_SHA, ScanService, make_server
+
+from .gitfixtures import make_git_repo
+
+class TestScanService(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = make_git_repo(
+            os.path.join(self.tmpdir, "repo"), 50, signed_every=2,
+            files={".github/dco.yml": "allowRemediationCommits:\n  individual: true\n"}
+        )
+        self.service = ScanService({ 'dco': True })
+        self.server = make_server(self.service, port=0)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={ 'poll_interval': 0.05 }, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.service.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _git(self, *args) -> str:
+        return subprocess.run(["git", *args], cwd=self.path, capture_output=True, text=True, check=True).stdout.strip()
+
+    def _commit(self, message: str, author: str = "Dev 1 <dev1@example.com>", files: dict | None = None) -> str:
+        for filename, content in (files or {}).items():
+            os.makedirs(os.path.dirname(os.path.join(self.path, filename)) or self.path, exist_ok=True)
+            with open(os.path.join(self.path, filename), "w") as fh:
+                fh.write(content)
+            self._git("add", filename)
+        name, email = author[:-1].split(" <")
+        self._git("-c", f"user.name={name}", "-c", f"user.email={email}", "commit", "-q", "--allow-empty", "--author", author, "-m", message)
+        return self._git("rev-parse", "HEAD")
+
+    def _post(self, body) -> tuple[int, dict]:
+        request = urllib.request.Request(f"{self.url}/push", data=json.dumps(body).encode(), headers={ 'Content-Type': "application/json" })
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, json.load(response)
+        except urllib.error.HTTPError as e:
+            return e.code, json.load(e)
+
+    def _push(self, before: str, after: str) -> dict:
+        status, result = self._post({ 'repo': self.path, 'before': before, 'after': after })
+        self.assertEqual(status, 200, result)
+        return result
+
+    def test_only_pushed_commits_checked(self):
+        before = self._git("rev-parse", "HEAD")
+        self._commit("Unsigned change")
+        after = self._commit("Signed change\n\nSigned-off-by: Dev 1 <dev1@example.com>")
+
+        result = self._push(before, after)
+        self.assertEqual(result['commits'], 2)
+        self.assertEqual(result['errors'], { 'dco': 1 })
+        self.assertEqual(result['failures'][0]['message'], "Unsigned change\n")
+        self.assertEqual(result['failures'][0]['author_email'], "dev1@example.com")
+        self.assertIn('milliseconds', result)
+
+    def test_repo_loaded_once_and_remediations_indexed_as_pushed(self):
+        head = self._git("rev-parse", "HEAD")
+        with patch.object(Commit, 'read_remediation_commit_config', wraps=Commit.read_remediation_commit_config) as mock_config:
+            unsigned = self._commit("Unsigned change")
+            self._push(head, unsigned)
+            remediations = self.service.status()['repos'][self.path]['remediations']
+            remediation = self._commit(
+                f"Remediation\n\nI, Dev 1 <dev1@example.com>, hereby add my Signed-off-by to this commit: {unsigned}\n\n"
+                "Signed-off-by: Dev 1 <dev1@example.com>"
+            )
+            result = self._push(unsigned, remediation)
+
+        # dco.yml is read when the repo is loaded, and not again for pushes that don't change it
+        self.assertEqual(mock_config.call_count, 1)
+        self.assertEqual(result['errors'], {})
+        status = self.service.status()
+        self.assertEqual(status['pushes'], 2)
+        self.assertEqual(status['repos'][self.path]['remediations'], remediations + 1)
+
+    def test_signoffs_reloaded_when_pushed(self):
+        main = self._git("rev-parse", "HEAD")
+        # an unsigned commit on a branch, and a past signoff for it pushed to the default branch first
+        self._git("checkout", "-q", "-b", "feature")
+        unsigned = self._commit("Unsigned change")
+        self._git("checkout", "-q", "main")
+        self._push(main, main)
+        signoffs = self._commit("Add past signoffs\n\nSigned-off-by: Dev 1 <dev1@example.com>", files={ "dco-signoffs/dev1.txt": f"{unsigned} Unsigned change\n" })
+        self.assertEqual(self._push(main, signoffs)['errors'], {})
+
+        result = self._push(NULL_SHA, unsigned)
+        self.assertEqual(result['commits'], 1)
+        self.assertEqual(result['errors'], {})
+
+    def test_new_and_deleted_branches(self):
+        self._git("checkout", "-q", "-b", "feature")
+        self._commit("Unsigned change")
+        after = self._commit("Another unsigned change")
+        self._git("checkout", "-q", "main")
+        # only the branch's own commits are checked, not the history it shares with the default branch
+        self.assertEqual(self._push(NULL_SHA, after)['commits'], 2)
+        self.assertEqual(self._push(after, NULL_SHA)['commits'], 0)
+
+    def test_unknown_before_checks_all_of_after(self):
+        after = self._commit("Unsigned change")
+        # force pushed over a commit that never reached this clone
+        with self.assertLogs(level='WARNING'):
+            result = self._push("e" * 40, after)
+        self.assertEqual(result['commits'], 51)
+        self.assertEqual(result['errors'], { 'dco': 26 })
+
+    def test_github_webhook_payload(self):
+        before = self._git("rev-parse", "HEAD")
+        after = self._commit("Unsigned change")
+        status, result = self._post({ 'ref': "refs/heads/main", 'before': before, 'after': after, 'repository': { 'html_url': self.path } })
+        self.assertEqual((status, result['errors']), (200, { 'dco': 1 }))
+
+    def test_bad_requests(self):
+        self.assertEqual(self._post({ 'repo': self.path })[0], 400)
+        self.assertEqual(self._post({ 'repo': self.path, 'before': NULL_SHA, 'after': "f" * 40 })[0], 422)
+        self.assertEqual(self._post({ 'repo': os.path.join(self.tmpdir, "missing"), 'before': NULL_SHA, 'after': "f" * 40 })[0], 422)
+        with urllib.request.urlopen(f"{self.url}/status") as response:
+            self.assertEqual(json.load(response)['pushes'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
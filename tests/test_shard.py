@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+
+import csv
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from contrib_check.main import main
+from contrib_check.org import OrgRepo
+from contrib_check.shard import merge_shards, parse_shard, shard_of
+
+from .gitfixtures import make_git_repo
+
+def _run_shard(repo_paths, output_dir, shard):
+    # runs in its own process, standing in for one machine of a sharded run
+    args = ['--org', 'my-org', '-o', output_dir, '--logfile', os.path.join(output_dir, 'debug.log')]
+    if shard:
+        args += ['--shard', shard]
+    with patch('contrib_check.org.Org') as mock_org_class:
+        mock_org_class.return_value.repos = [ OrgRepo(os.path.basename(path), path) for path in repo_paths ]
+        main(args)
+
+class TestShard(unittest.TestCase):
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for bad in ["0/4", "5/4", "2", "a/b"]:
+            with self.assertRaises(ValueError):
+                parse_shard(bad)
+
+    def test_shards_partition_repos(self):
+        names = [f"repo{i}" for i in range(200)]
+        shards = [ [name for name in names if shard_of(name, 4) == index] for index in range(1, 5) ]
+        self.assertEqual(sorted(sum(shards, [])), sorted(names))
+        self.assertTrue(all(shards))
+        # every process has to agree on where a repo goes
+        self.assertEqual([shard_of(name, 4) for name in names], [shard_of(name, 4) for name in names])
+
+
+class TestMergeShards(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _write(self, path, content):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as fh:
+            fh.write(content)
+
+    def test_duplicates_dropped(self):
+        shard1 = os.path.join(self.tmpdir, "shard1")
+        shard2 = os.path.join(self.tmpdir, "shard2")
+        row = '"bar","abc","multi\nline message","Dev","dev@example.com","2024-01-01","dco","msg"\n'
+        other = '"bar","def","other","Dev","dev@example.com","2024-01-02","dco","msg"\n'
+        self._write(os.path.join(shard1, "bar.csv"), row)
+        self._write(os.path.join(shard2, "bar.csv"), row + other)
+        header = "DCO Remediation Commit for Dev <dev@example.com>\n\n"
+        self._write(os.path.join(shard1, "remediation-commits", "bar-Dev.txt"), header + "I, Dev: abc\n")
+        self._write(os.path.join(shard2, "remediation-commits", "bar-Dev.txt"), header + "I, Dev: abc\nI, Dev: def\n")
+        self._write(os.path.join(shard1, "contrib-check-journal.jsonl"),
+                    json.dumps({ 'repo': "bar", 'completed_at': "2024-01-01", 'commits': 5, 'errors': { 'dco': 1 } }) + '\n')
+        self._write(os.path.join(shard2, "contrib-check-journal.jsonl"),
+                    json.dumps({ 'repo': "bar", 'completed_at': "2024-01-02", 'commits': 6, 'errors': { 'dco': 2 } }) + '\n')
+
+        out = os.path.join(self.tmpdir, "out")
+        metrics = merge_shards([shard1, shard2], out)
+
+        with open(os.path.join(out, "bar.csv"), newline='') as fh:
+            rows = list(csv.reader(fh))
+        self.assertEqual([row[1] for row in rows], ["abc", "def"])
+        self.assertEqual(rows[0][2], "multi\nline message")
+        with open(os.path.join(out, "remediation-commits", "bar-Dev.txt")) as fh:
+            self.assertEqual(fh.read(), header + "I, Dev: abc\nI, Dev: def\n")
+        self.assertEqual(metrics, { 'shards': 2, 'repos': 1, 'commits': 6, 'errors': { 'dco': 2 }, 'seconds': 0.0 })
+
+    def test_shard_processes_merge_to_unsharded_result(self):
+        repo_paths = [ make_git_repo(os.path.join(self.tmpdir, "repos", f"repo{i}"), 5 + i, signed_every=2) for i in range(6) ]
+        context = multiprocessing.get_context('fork')
+        output_dirs = {}
+        for shard in [None, "1/2", "2/2"]:
+            output_dirs[shard] = os.path.join(self.tmpdir, (shard or "all").replace('/', '-of-'))
+            os.makedirs(output_dirs[shard])
+        processes = [ context.Process(target=_run_shard, args=(repo_paths, output_dir, shard)) for shard, output_dir in output_dirs.items() ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(60)
+            self.assertEqual(process.exitcode, 0)
+
+        # each shard scanned only its own repos
+        shard_csvs = [ set(name for name in os.listdir(output_dirs[shard]) if name.endswith('.csv')) for shard in ["1/2", "2/2"] ]
+        self.assertFalse(shard_csvs[0] & shard_csvs[1])
+
+        merged = os.path.join(self.tmpdir, "merged")
+        main(['merge', output_dirs["1/2"], output_dirs["2/2"], '-o', merged])
+
+        unsharded = output_dirs[None]
+        for name in os.listdir(unsharded):
+            if name.endswith('.csv'):
+                with open(os.path.join(unsharded, name)) as expected, open(os.path.join(merged, name)) as actual:
+                    self.assertEqual(actual.read(), expected.read())
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(merged, "remediation-commits"))),
+            sorted(os.listdir(os.path.join(unsharded, "remediation-commits")))
+        )
+        with open(os.path.join(merged, "contrib-check-metrics.json")) as fh:
+            metrics = json.load(fh)
+        self.assertEqual(metrics['repos'], 6)
+        self.assertEqual(metrics['commits'], sum(5 + i for i in range(6)))
+        # the per-author summary of the merged shards is the one the unsharded run kept
+        with open(os.path.join(unsharded, "contrib-check-summary.json")) as expected, open(os.path.join(merged, "contrib-check-summary.json")) as actual:
+            expected_summary = json.load(expected)
+            self.assertEqual(json.load(actual), expected_summary)
+        self.assertEqual(len(expected_summary['repos']), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
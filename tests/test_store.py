@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+
+import os
+import io
+import sqlite3
+import tempfile
+import shutil
+import unittest
+from unittest.mock import patch
+
+from contrib_check.store import ResultsStore
+from contrib_check.main import main
+
+class TestResultsStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmpdir, "results.db")
+        self.store = ResultsStore(self.db_path, batch_size=2)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _scan_repo(self, name, failures):
+        repo_id = self.store.start_repo(name, f"https://github.com/foo/{name}")
+        for hexsha, email in failures:
+            self.store.add_commit(repo_id, hexsha, email.split('@')[0], email, "2024-01-01")
+            self.store.add_failure(repo_id, hexsha, email.split('@')[0], email, 'dco')
+        self.store.finish_repo(repo_id, len(failures))
+        return repo_id
+
+    def test_batches_rows_until_batch_size(self):
+        repo_id = self.store.start_repo("bar")
+        self.store.add_commit(repo_id, "a" * 40, "Dev", "dev@example.com", "2024-01-01")
+        with sqlite3.connect(self.db_path) as connection:
+            self.assertEqual(connection.execute("SELECT COUNT(*) FROM commits").fetchone()[0], 0)
+        self.store.add_commit(repo_id, "b" * 40, "Dev", "dev@example.com", "2024-01-01")
+        with sqlite3.connect(self.db_path) as connection:
+            self.assertEqual(connection.execute("SELECT COUNT(*) FROM commits").fetchone()[0], 2)
+
+    def test_authors_query_across_repos(self):
+        self._scan_repo("bar", [("a" * 40, "dev@example.com"), ("b" * 40, "other@example.com")])
+        self._scan_repo("baz", [("c" * 40, "dev@example.com")])
+        columns, rows = self.store.query('authors')
+        self.assertEqual(columns, ['author_email', 'author_name', 'failures', 'repos'])
+        self.assertEqual(rows[0], ('dev@example.com', 'dev', 2, 2))
+        self.assertEqual(rows[1], ('other@example.com', 'other', 1, 1))
+
+    def test_only_latest_scan_of_repo_is_queried(self):
+        self._scan_repo("bar", [("a" * 40, "dev@example.com")])
+        self._scan_repo("bar", [])
+        _, rows = self.store.query('authors')
+        self.assertEqual(rows, [])
+        _, rows = self.store.query('repos')
+        self.assertEqual(rows[0][0], 'bar')
+        self.assertEqual(rows[0][2], 0)
+
+    def test_failures_query_filters(self):
+        self._scan_repo("bar", [("a" * 40, "dev@example.com"), ("b" * 40, "other@example.com")])
+        _, rows = self.store.query('failures', author="other@example.com")
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0][1], "b" * 40)
+
+    def test_commit_counts_from_latest_scan(self):
+        self._scan_repo("bar", [("a" * 40, "dev@example.com")])
+        self._scan_repo("bar", [("a" * 40, "dev@example.com"), ("b" * 40, "dev@example.com")])
+        self._scan_repo("baz", [])
+        self.assertEqual(self.store.commit_counts(), { "bar": 2, "baz": 0 })
+
+    def test_unknown_query(self):
+        with self.assertRaises(ValueError):
+            self.store.query('nope')
+
+    def test_query_subcommand(self):
+        self._scan_repo("bar", [("a" * 40, "dev@example.com")])
+        self.store.close()
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            main(['query', 'authors', '--db', self.db_path])
+        self.assertIn("author_email,author_name,failures,repos", stdout.getvalue())
+        self.assertIn("dev@example.com,dev,1,1", stdout.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from contrib_check.commit import CommitAuthor, CommitRecord
+from contrib_check.repo import Repo
+from contrib_check.summary import ScanSummary, summarize_journal
+
+from .gitfixtures import make_git_repo
+
+def _record(email, when, name="Dev"):
+    return CommitRecord("a" * 40, "msg", CommitAuthor(name, email), when, ("b" * 40,))
+
+class TestScanSummary(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_counts_and_failure_dates(self):
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        # the same instant in another timezone still sorts by UTC
+        records = [
+            _record("dev@example.com", start),
+            _record("Dev@Example.com", (start + timedelta(days=2)).astimezone(timezone(timedelta(hours=-8)))),
+            _record("dev@example.com", start - timedelta(days=1)),
+            _record("other@example.com", start),
+        ]
+        summary = ScanSummary()
+        summary.add("repo", records, { 'dco': ['unsigned', 'unsigned', 'signed-off', 'remediated'] }, [True, True, False, False])
+
+        self.assertEqual(summary.repos, { 'repo': { 'commits': 4, 'outcomes': { 'dco': { 'unsigned': 2, 'signed-off': 1, 'remediated': 1 } } } })
+        author = summary.authors['dev@example.com']
+        self.assertEqual(author['commits'], 3)
+        self.assertEqual(author['outcomes'], { 'dco': { 'unsigned': 2, 'signed-off': 1 } })
+        self.assertEqual((author['first_failure'], author['last_failure']), ("2024-01-01T00:00:00+00:00", "2024-01-03T00:00:00+00:00"))
+        self.assertIsNone(summary.authors['other@example.com']['first_failure'])
+
+    def test_merge_of_parts_equals_whole(self):
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        records = [ _record(f"dev{i % 3}@example.com", start + timedelta(days=i)) for i in range(30) ]
+        outcomes = { 'dco': [ 'unsigned' if i % 2 else 'signed-off' for i in range(30) ] }
+        failed = [ bool(i % 2) for i in range(30) ]
+
+        whole = ScanSummary()
+        whole.add("repo", records, outcomes, failed)
+        merged = ScanSummary()
+        for start_index in range(0, 30, 7):
+            part = ScanSummary()
+            part.add("repo", records[start_index:start_index + 7], { 'dco': outcomes['dco'][start_index:start_index + 7] }, failed[start_index:start_index + 7])
+            merged.merge(part)
+        self.assertEqual((merged.repos, merged.authors), (whole.repos, whole.authors))
+
+    def test_write_and_summarize_journal(self):
+        summary = ScanSummary()
+        summary.add("repo", [_record("dev@example.com", "2024-01-01")], { 'dco': ['unsigned'] }, [True])
+        summary.write(os.path.join(self.tmpdir, "repo-summary.json"))
+        entries = [ { 'repo': "a", 'summary': "repo-summary.json" }, { 'repo': "b", 'summary': "repo-summary.json" }, { 'repo': "c" } ]
+        org_summary = summarize_journal(entries, self.tmpdir)
+        self.assertEqual(org_summary.authors['dev@example.com']['outcomes'], { 'dco': { 'unsigned': 2 } })
+
+
+class TestRepoSummary(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        path = make_git_repo(
+            os.path.join(self.tmpdir, "repo"), 200, signed_every=3,
+            files={".github/dco.yml": "allowRemediationCommits:\n  individual: true\n"}
+        )
+        shas = subprocess.run(["git", "rev-list", "--reverse", "HEAD"], cwd=path, capture_output=True, text=True, check=True).stdout.split()
+        # commit 4 is covered by a past signoff, commit 1 by a remediation commit from its author
+        os.makedirs(os.path.join(path, "dco-signoffs"))
+        with open(os.path.join(path, "dco-signoffs", "dev4.txt"), "w") as fh:
+            fh.write(f"{shas[4]} commit 4\n")
+        subprocess.run(["git", "add", "dco-signoffs"], cwd=path, check=True)
+        subprocess.run(
+            ["git", "-c", "user.name=Dev 1", "-c", "user.email=dev1@example.com", "commit", "-q",
+             "--author", "Dev 1 <dev1@example.com>",
+             "-m", f"Remediation\n\nI, Dev 1 <dev1@example.com>, hereby add my Signed-off-by to this commit: {shas[1][:7]}\n\nSigned-off-by: Dev 1 <dev1@example.com>"],
+            cwd=path, check=True
+        )
+        self.path = path
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _scan(self, jobs):
+        output_dir = os.path.join(self.tmpdir, f"out{jobs}")
+        os.makedirs(output_dir)
+        repo = Repo(self.path)
+        repo.parallel_chunk_size = 50
+        repo.remediation_commits_dir = os.path.join(output_dir, "remediation-commits")
+        repo.load_past_signoffs()
+        repo.scan(output_dir=Path(output_dir), jobs=jobs)
+        repo.close()
+        with open(os.path.join(output_dir, repo.summary_file)) as fh:
+            return json.load(fh)
+
+    def test_summary_written_next_to_csv(self):
+        summary = self._scan(1)
+        self.assertEqual(summary['repos'], { 'repo': { 'commits': 201, 'outcomes': { 'dco': {
+            'signed-off': 68, 'past-signed': 1, 'remediated': 1, 'unsigned': 131
+        } } } })
+        dev1 = summary['authors']['dev1@example.com']
+        self.assertEqual(dev1['outcomes']['dco'], { 'signed-off': 14, 'remediated': 1, 'unsigned': 26 })
+        # commit 1 was remediated, so Dev 1's first commit still owing a signoff is commit 11
+        self.assertEqual(dev1['first_failure'], datetime.fromtimestamp(1600000000 + 11 * 60, timezone.utc).isoformat())
+
+    def test_parallel_summary_matches_serial(self):
+        self.assertEqual(self._scan(3), self._scan(1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+#
+# Copyright this project and it's contributors
+# SPDX-License-Identifier: Apache-2.0
+#
+# encoding=utf8
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from contrib_check.repo import Repo
+from contrib_check.workspace import CloneWorkspace, parse_size, _host
+
+class TestParseSize(unittest.TestCase):
+
+    def test_sizes(self):
+        self.assertEqual(parse_size("1024"), 1024)
+        self.assertEqual(parse_size("500M"), 500 * 2**20)
+        self.assertEqual(parse_size("1.5g"), int(1.5 * 2**30))
+        self.assertEqual(parse_size("2GiB"), 2 * 2**30)
+        with self.assertRaises(ValueError):
+            parse_size("lots")
+
+
+class TestCloneWorkspace(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_clones_wait_for_budget(self):
+        workspace = CloneWorkspace(self.tmpdir, budget=100)
+        first = workspace.allocate("first", 80)
+        allocated = threading.Event()
+        second = []
+        thread = threading.Thread(target=lambda: (second.append(workspace.allocate("second", 50)), allocated.set()))
+        thread.start()
+
+        self.assertFalse(allocated.wait(0.2))
+        first.cleanup()
+        self.assertTrue(allocated.wait(5))
+        thread.join()
+        self.assertFalse(os.path.exists(first.name))
+        self.assertEqual(workspace.used, 50)
+        # a clone bigger than the whole budget still goes ahead once it has the workspace to itself
+        second[0].cleanup()
+        huge = workspace.allocate("huge", 1000)
+        self.assertTrue(os.path.isdir(huge.name))
+        workspace.close()
+
+    def test_measured_size_replaces_estimate(self):
+        workspace = CloneWorkspace(self.tmpdir, budget=10000)
+        clone = workspace.allocate("repo", 5000)
+        with open(os.path.join(clone.name, "pack"), "wb") as fh:
+            fh.write(b"x" * 300)
+        self.assertEqual(clone.measure(), 300)
+        self.assertEqual(workspace.used, 300)
+        clone.cleanup()
+        clone.cleanup()
+        self.assertEqual(workspace.used, 0)
+        workspace.close()
+
+    def test_close_removes_run_directory(self):
+        workspace = CloneWorkspace(self.tmpdir)
+        clone = workspace.allocate("org/repo")
+        self.assertTrue(clone.name.startswith(workspace.path))
+        workspace.close()
+        self.assertEqual(os.listdir(self.tmpdir), [])
+
+    def test_directories_of_dead_runs_swept(self):
+        dead_pid = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True, check=True).stdout.strip()
+        dead = os.path.join(self.tmpdir, f"contrib-check-{_host()}-{dead_pid}-abc")
+        alive = os.path.join(self.tmpdir, f"contrib-check-{_host()}-{os.getpid()}-abc")
+        other_host = os.path.join(self.tmpdir, f"contrib-check-elsewhere-{dead_pid}-abc")
+        unrelated = os.path.join(self.tmpdir, "something-else")
+        for path in (dead, alive, other_host, unrelated):
+            os.makedirs(os.path.join(path, "repo"))
+
+        workspace = CloneWorkspace(self.tmpdir)
+        self.assertFalse(os.path.exists(dead))
+        for path in (alive, other_host, unrelated, workspace.path):
+            self.assertTrue(os.path.isdir(path))
+        workspace.close()
+
+
+class TestRepoInWorkspace(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.workspace = CloneWorkspace(self.tmpdir, budget=2**20)
+
+    def tearDown(self):
+        self.workspace.close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _fake_clone(self, url, path, *args):
+        with open(os.path.join(path, "pack"), "wb") as fh:
+            fh.write(b"x" * 4096)
+        return MagicMock()
+
+    def test_clone_made_and_removed_in_workspace(self):
+        with patch('contrib_check.repo.clone_bare', side_effect=self._fake_clone) as mock_clone:
+            repo = Repo("https://github.com/foo/bar", clone_progress=False, workspace=self.workspace, size=100)
+        clone_dir = mock_clone.call_args.args[1]
+        self.assertEqual(os.path.dirname(clone_dir), self.workspace.path)
+        self.assertEqual(self.workspace.used, 4096)
+        repo.close()
+        self.assertFalse(os.path.exists(clone_dir))
+        self.assertEqual(self.workspace.used, 0)
+
+    def test_failed_clone_returns_its_share(self):
+        with patch('contrib_check.repo.clone_bare', side_effect=TimeoutError("clone took too long")):
+            with self.assertRaises(TimeoutError):
+                Repo("https://github.com/foo/bar", clone_progress=False, workspace=self.workspace, size=100)
+        self.assertEqual(self.workspace.used, 0)
+        self.assertEqual(os.listdir(self.workspace.path), [])
+
+
+if __name__ == '__main__':
+    unittest.main()